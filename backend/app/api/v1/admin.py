@@ -1,41 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Iterator, Optional
 
-from app.core.db import get_db
-from app.api.v1.auth import get_current_user  # reuse your bearer dependency
-from app.models.appointments import Appointment
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.db import ReadSessionLocal
+from app.core.serialization import dumps
+from app.api.v1.auth import get_current_admin
+from app.models.appointments import AppointmentStatus, ClinicType
 from app.models.users import User
+from app.repositories import appointments_repo
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
 
+ADMIN_FEED_MAX_LIMIT = 5000
+
+
+def _feed_row(row) -> dict:
+    return {
+        "id": row.id,
+        "full_name": row.full_name,
+        "email": row.email,
+        "phone": row.phone,
+        "clinic": row.clinic.value,
+        "service_required": row.service_required.value,
+        "preferred_date": row.preferred_date,
+        "preferred_time": row.preferred_time,
+        "scheduled_at": row.scheduled_at.isoformat() if row.scheduled_at else None,
+        "status": row.status.value,
+        "payment_reference": row.payment_reference,
+        "created_at": row.created_at.isoformat(),
+        "user": None if row.user_id is None else {
+            "id": row.user_id,
+            "full_name": row.user_full_name,
+            "email": row.user_email,
+        },
+    }
+
+
+def _stream_feed(limit: int, **filters) -> Iterator[bytes]:
+    """
+    Emit {"items": [...], "next_cursor": ...} one row at a time.
+
+    A plain generator: Starlette iterates it in the threadpool, so the DB
+    reads stay off the event loop. It owns its session because the response
+    body outlives the request's dependencies.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield b'{"items":['
+        last = None
+        sent = 0
+        for row in appointments_repo.admin_feed(db, limit=limit, **filters):
+            if sent == limit:
+                # The extra (limit + 1)th row only tells us another page exists
+                yield b'],"next_cursor":' + dumps(appointments_repo.encode_cursor(last)) + b"}"
+                return
+            yield (b"," if sent else b"") + dumps(_feed_row(row))
+            last = row
+            sent += 1
+        yield b'],"next_cursor":null}'
+    finally:
+        db.close()
+
+
 @router.get("/appointments")
 async def list_appointments_with_users(
-    db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),  # TODO: add role check later
+    status: Optional[AppointmentStatus] = None,
+    clinic: Optional[ClinicType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(appointments_repo.DEFAULT_PAGE_SIZE, ge=1, le=ADMIN_FEED_MAX_LIMIT),
+    _admin: User = Depends(get_current_admin),
 ):
     """
-    Admin view: list all appointments joined with user info.
-    (We keep response untyped/dict for speed; can add a pydantic model later.)
+    Admin feed: appointments (including guest bookings) with their booking user.
+
+    Filters by status, clinic and preferred_date range; keyset-paginated with
+    the same cursor as the other appointment lists. Only the grid's columns
+    are selected and rows are streamed as they come off the DB cursor.
     """
-    rows = (
-        db.query(Appointment, User)
-        .join(User, User.id == Appointment.created_by_user_id)
-        .order_by(Appointment.start_at.asc(), Appointment.id.asc())
-        .all()
-    )
+    if cursor:
+        try:
+            appointments_repo.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    result = []
-    for appt, user in rows:
-        result.append({
-            "id": appt.id,
-            "doctor_id": appt.doctor_id,
-            "start_at": appt.start_at,
-            "end_at": appt.end_at,
-            "reason": appt.reason,
-            "user": {
-                "id": user.id,
-                "full_name": user.full_name,
-                "email": user.email,
-            },
-        })
-    return result
+    return StreamingResponse(
+        _stream_feed(
+            limit,
+            status=status,
+            clinic=clinic,
+            date_from=date_from,
+            date_to=date_to,
+            cursor=cursor,
+        ),
+        media_type="application/json",
+    )
@@ -1,23 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Header, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Optional
+from datetime import date
+import asyncio
 import os
-import uuid
 from pathlib import Path
 
-from app.core.db import get_db
-from app.api.v1.auth import get_current_user, get_current_user_optional
-from app.schemas.appointments import AppointmentCreate, AppointmentRead, AppointmentUpdate
-from app.repositories import appointments_repo
+from app.core.db import get_db, get_read_db, run_db
+from app.core.uploads import UploadTooLarge, UnsupportedUploadType
+from app.core.availability import InvalidSlot, SlotUnavailable
+from app.core.blobstore import store_upload, is_blob_path
+from app.core.conditional import is_not_modified, not_modified, http_date, list_etag, revalidate_headers, row_etag
+from app.core.versions import current_version
+from app.core.serialization import FastJSONResponse, dumps, parse_fields
+from app.core.events import Event, appointment_events
+from app.api.v1.auth import bearer_scheme, get_current_user, get_current_user_optional, get_current_admin
+from app.schemas.appointments import AppointmentCreate, AppointmentRead, AppointmentUpdate, AppointmentPage, AppointmentStats
+from app.repositories import appointments_repo, appointment_stats_repo
 from app.models.users import User
 from app.models.appointments import AppointmentStatus
 
 router = APIRouter(prefix="/api/v1", tags=["Appointments"])
 
-# Create uploads directory if it doesn't exist
-UPLOAD_DIR = Path("uploads/payment_proofs")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Proofs are private to staff; browsers may reuse them briefly, then must revalidate (cheap 304s)
+PAYMENT_PROOF_CACHE_CONTROL = f"private, max-age={int(os.getenv('PAYMENT_PROOF_CACHE_MAX_AGE', '300'))}, must-revalidate"
+
+# Comment lines sent on idle event streams so proxies and browsers keep them open
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+PageLimit = Query(appointments_repo.DEFAULT_PAGE_SIZE, ge=1, le=appointments_repo.MAX_PAGE_SIZE)
+Fields = Query(
+    None,
+    description="Comma-separated AppointmentRead fields to return (sparse fieldset), e.g. id,full_name,status,preferred_date",
+)
+
+
+def _payment_proof_etag(path: str, stat_result: os.stat_result) -> str:
+    """Content-addressed blobs are named by their SHA-256; legacy files fall back to size + mtime."""
+    if is_blob_path(path):
+        return f'"{Path(path).stem}"'
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+async def _page(request: Request, principal_id: Optional[int], fetch, db: Session, *args, cursor: Optional[str], limit: int, fields: Optional[str]):
+    """
+    Run a paginated repository call off the event loop and return the page
+    as JSON, mapping bad cursors and unknown fields to 400.
+
+    The ETag comes from the appointments table's change counter, so an
+    unchanged list is answered with a 304 before any row is read (no ETag
+    where the table is not tracked). Rows are
+    selected as plain tuples (only the requested fields) and encoded
+    directly; the body matches AppointmentPage without validating each item.
+    """
+    version = await run_db(current_version, db, "appointments")
+    headers = {}
+    if version is not None:
+        headers = revalidate_headers(list_etag(version, request, principal_id))
+        if is_not_modified(request.headers, headers["ETag"]):
+            return not_modified(headers)
+    try:
+        names = parse_fields(fields, appointments_repo.READ_FIELDS)
+        rows, next_cursor = await run_db(fetch, db, *args, cursor=cursor, limit=limit, fields=names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(
+        {"items": [dict(zip(names, row)) for row in rows], "next_cursor": next_cursor},
+        headers=headers,
+    )
 
 
 @router.post("/appointments", response_model=AppointmentRead, status_code=201)
@@ -50,120 +103,201 @@ async def create_appointment(
         message=message
     )
     
-    # Handle file upload if provided
-    payment_proof_path = None
+    # Handle file upload if provided: stream it into the content-addressed
+    # store, where identical receipts are kept only once
+    stored_proof = None
     if payment_proof and payment_proof.filename:
-        # Create user-specific directory
-        user_dir = UPLOAD_DIR
-        if current_user:
-            user_dir = UPLOAD_DIR / f"user_{current_user.id}"
-            user_dir.mkdir(exist_ok=True)
-        
-        # Generate descriptive filename with user ID, timestamp, and session info
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_extension = Path(payment_proof.filename).suffix
-        session_id = str(uuid.uuid4())[:8]  # Short session identifier
-        
-        if current_user:
-            # Format: userId_timestamp_sessionId_appointmentProof.ext
-            descriptive_filename = f"user{current_user.id}_{timestamp}_{session_id}_appointment_proof{file_extension}"
-        else:
-            # For anonymous users (fallback)
-            descriptive_filename = f"guest_{timestamp}_{session_id}_appointment_proof{file_extension}"
-        
-        file_path = user_dir / descriptive_filename
-        
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            content = await payment_proof.read()
-            buffer.write(content)
-        
-        payment_proof_path = str(file_path)
-
-    # Create the appointment with payment proof path and user link
-    appointment = appointments_repo.create(
-        db, 
-        appointment_data, 
-        created_by_user_id=current_user.id if current_user else None, 
-        payment_proof_path=payment_proof_path
-    )
+        try:
+            stored_proof = await store_upload(payment_proof)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UnsupportedUploadType as e:
+            raise HTTPException(status_code=415, detail=str(e))
+
+    # Create the appointment with payment proof blob and user link,
+    # taking a place in the requested slot in the same transaction
+    try:
+        appointment = await run_db(
+            appointments_repo.create,
+            db, 
+            appointment_data, 
+            created_by_user_id=current_user.id if current_user else None, 
+            payment_proof=stored_proof
+        )
+    except InvalidSlot as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SlotUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     return appointment
 
 
-@router.get("/appointments", response_model=list[AppointmentRead])
+@router.get("/appointments", response_model=AppointmentPage)
 async def list_appointments(
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    fields: Optional[str] = Fields,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[AppointmentRead]:
-    """List all appointments."""
-    return appointments_repo.list_all(db)
+) -> AppointmentPage:
+    """List all appointments, newest first, one page at a time."""
+    return await _page(request, current_user.id, appointments_repo.list_all, db, cursor=cursor, limit=limit, fields=fields)
+
+
+@router.get("/appointments/stats", response_model=AppointmentStats)
+async def get_appointment_stats(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: Optional[int] = None,
+    email: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin),
+) -> AppointmentStats:
+    """Appointment counts by status, clinic, service and day (inclusive preferred_date range)."""
+    stats = await run_db(
+        appointment_stats_repo.summary,
+        db,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        user_id=user_id,
+        email=email,
+    )
+    return AppointmentStats(**stats)
+
+
+def _sse(event: Event) -> bytes:
+    return f"id: {event.id}\nevent: {event.kind}\ndata: ".encode() + dumps(event.data) + b"\n\n"
+
+
+@router.get("/appointments/events")
+async def appointment_change_events(
+    last_event_id: Optional[str] = Header(None),
+    creds: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_read_db),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of appointment changes: "created" and "updated"
+    carry the appointment (AppointmentRead fields), "deleted" carries its id.
+
+    The stream opens with a "ready" event. Reconnecting with Last-Event-ID
+    replays what was missed; when that is no longer possible a "reset" event
+    asks the client to reload its list. Idle streams get a comment line every
+    SSE_HEARTBEAT_SECONDS. Clients that fall too far behind are disconnected.
+    """
+    # Yield dependencies are only finalized once the response has finished,
+    # so Depends(get_current_admin) would hold a read connection (and its WAL
+    # snapshot) for as long as the stream is open. Check the admin and give
+    # the session back before streaming.
+    try:
+        get_current_admin(await run_db(get_current_user, creds, db))
+    finally:
+        db.close()
+
+    async def stream() -> AsyncIterator[bytes]:
+        # Subscribed only once the body is being sent: a response that never
+        # starts streaming (client gone first) leaves nothing registered
+        subscription, missed = appointment_events.subscribe(last_event_id)
+        try:
+            yield b"retry: 3000\n\n"
+            for event in missed or ():
+                yield _sse(event)
+            kind = "reset" if missed is None else "ready"
+            yield f"id: {subscription.start_id}\nevent: {kind}\ndata: {{}}\n\n".encode()
+            while True:
+                try:
+                    event = await subscription.get(SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:  # dropped as too slow, or shutting down
+                    return
+                yield _sse(event)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/appointments/{appointment_id}", response_model=AppointmentRead)
 async def get_appointment(
     appointment_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ) -> AppointmentRead:
-    """Get a specific appointment by ID."""
-    appointment = appointments_repo.get_by_id(db, appointment_id)
+    """Get a specific appointment by ID (304 while its updated_at is unchanged)."""
+    stamp = await run_db(appointments_repo.version_of, db, appointment_id)
+    if stamp is None:
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    headers = revalidate_headers(row_etag("appointment", appointment_id, stamp))
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+    appointment = await run_db(appointments_repo.get_by_id, db, appointment_id)
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
+    response.headers.update(headers)
     return appointment
 
 
-@router.get("/appointments/user/{user_id}", response_model=list[AppointmentRead])
+@router.get("/appointments/user/{user_id}", response_model=AppointmentPage)
 async def get_user_appointments(
     user_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    fields: Optional[str] = Fields,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[AppointmentRead]:
-    """Get all appointments for a specific user."""
-    return appointments_repo.get_by_user_id(db, user_id)
+) -> AppointmentPage:
+    """Get appointments for a specific user, one page at a time."""
+    return await _page(request, current_user.id, appointments_repo.get_by_user_id, db, user_id, cursor=cursor, limit=limit, fields=fields)
 
 
-@router.get("/my-appointments", response_model=list[AppointmentRead])
+@router.get("/my-appointments", response_model=AppointmentPage)
 async def get_my_appointments(
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    fields: Optional[str] = Fields,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[AppointmentRead]:
-    """Get all appointments for the current authenticated user."""
-    # Get appointments by both user_id and email for maximum coverage
-    appointments_by_user_id = appointments_repo.get_by_user_id(db, current_user.id) if current_user.id else []
-    appointments_by_email = appointments_repo.get_by_email(db, current_user.email)
-    
-    # Combine and deduplicate appointments
-    all_appointments = appointments_by_user_id + appointments_by_email
-    seen_ids = set()
-    unique_appointments = []
-    for appointment in all_appointments:
-        if appointment.id not in seen_ids:
-            seen_ids.add(appointment.id)
-            unique_appointments.append(appointment)
-    
-    return unique_appointments
+) -> AppointmentPage:
+    """Get the current user's appointments (booked by them or under their email), one page at a time."""
+    return await _page(request, current_user.id, appointments_repo.get_for_user, db, current_user.id, current_user.email, cursor=cursor, limit=limit, fields=fields)
 
 
-@router.get("/appointments/email/{email}", response_model=list[AppointmentRead])
+@router.get("/appointments/email/{email}", response_model=AppointmentPage)
 async def get_appointments_by_email(
     email: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    fields: Optional[str] = Fields,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[AppointmentRead]:
-    """Get all appointments for a specific email."""
-    return appointments_repo.get_by_email(db, email)
+) -> AppointmentPage:
+    """Get appointments for a specific email, one page at a time."""
+    return await _page(request, current_user.id, appointments_repo.get_by_email, db, email, cursor=cursor, limit=limit, fields=fields)
 
 
-@router.get("/appointments/status/{status}", response_model=list[AppointmentRead])
+@router.get("/appointments/status/{status}", response_model=AppointmentPage)
 async def get_appointments_by_status(
     status: AppointmentStatus,
-    db: Session = Depends(get_db),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = PageLimit,
+    fields: Optional[str] = Fields,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
-) -> list[AppointmentRead]:
-    """Get all appointments with a specific status."""
-    return appointments_repo.get_by_status(db, status)
+) -> AppointmentPage:
+    """Get appointments with a specific status, one page at a time."""
+    return await _page(request, current_user.id, appointments_repo.get_by_status, db, status, cursor=cursor, limit=limit, fields=fields)
 
 
 @router.put("/appointments/{appointment_id}", response_model=AppointmentRead)
@@ -174,7 +308,12 @@ async def update_appointment(
     current_user: User = Depends(get_current_user),
 ) -> AppointmentRead:
     """Update an appointment."""
-    appointment = appointments_repo.update(db, appointment_id, payload)
+    try:
+        appointment = await run_db(appointments_repo.update, db, appointment_id, payload)
+    except InvalidSlot as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SlotUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     return appointment
@@ -187,7 +326,7 @@ async def delete_appointment(
     current_user: User = Depends(get_current_user),
 ):
     """Delete an appointment."""
-    success = appointments_repo.delete(db, appointment_id)
+    success = await run_db(appointments_repo.delete, db, appointment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Appointment not found")
     return {"message": "Appointment deleted successfully"}
@@ -196,18 +335,40 @@ async def delete_appointment(
 @router.get("/appointments/{appointment_id}/payment-proof")
 async def get_payment_proof(
     appointment_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Download payment proof file for an appointment."""
-    appointment = appointments_repo.get_by_id(db, appointment_id)
+    """
+    Download payment proof file for an appointment.
+
+    Serves strong ETags (the blob's SHA-256), answers If-None-Match /
+    If-Modified-Since with 304 without opening the file, and supports byte
+    ranges for large PDFs. One DB lookup and one stat per request.
+    """
+    appointment = await run_db(appointments_repo.get_by_id, db, appointment_id)
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    
-    if not appointment.payment_proof or not os.path.exists(appointment.payment_proof):
+    if not appointment.payment_proof:
         raise HTTPException(status_code=404, detail="Payment proof not found")
-    
+
+    try:
+        stat_result = await run_in_threadpool(os.stat, appointment.payment_proof)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Payment proof not found")
+
+    headers = {
+        "ETag": _payment_proof_etag(appointment.payment_proof, stat_result),
+        "Last-Modified": http_date(stat_result.st_mtime),
+        "Cache-Control": PAYMENT_PROOF_CACHE_CONTROL,
+    }
+    if is_not_modified(request.headers, headers["ETag"], stat_result.st_mtime):
+        return not_modified(headers)
+
+    # FileResponse handles Range / If-Range using our ETag; passing stat_result avoids a second stat
     return FileResponse(
         path=appointment.payment_proof,
-        filename=f"PaymentProof_User{appointment.created_by_user_id or 'Guest'}_Appointment{appointment_id}_{appointment.preferred_date}{Path(appointment.payment_proof).suffix}"
+        filename=f"PaymentProof_User{appointment.created_by_user_id or 'Guest'}_Appointment{appointment_id}_{appointment.preferred_date}{Path(appointment.payment_proof).suffix}",
+        stat_result=stat_result,
+        headers=headers,
     )
@@ -3,19 +3,34 @@ from sqlalchemy.orm import Session
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from typing import Optional
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db, run_db
 from app.schemas.users import UserCreate, UserRead, SigninRequest, Token, GoogleSigninRequest
 from app.repositories import user_repo
 from sqlalchemy.exc import IntegrityError
-from app.core.security import create_access_token, verify_password, verify_google_token, SECRET_KEY, ALGORITHM
+from app.core.security import (
+    create_access_token, verify_google_token_async, hash_password_async, verify_and_update_password_async,
+    PasswordHasherBusy, SECRET_KEY, ALGORITHM,
+)
 from app.models.users import User
+from app.core.principal_cache import principal_cache
 
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"]) 
 
 bearer_scheme = HTTPBearer(auto_error=True)
 
-def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)) -> User:
+def _load_principal(db: Session, user_id: int) -> Optional[User]:
+    """Resolve a token subject to a User, going to the DB only on a principal-cache miss."""
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    generation = principal_cache.generation(user_id)
+    user = db.get(User, user_id)
+    if user is not None:
+        principal_cache.put(user, generation)
+    return user
+
+def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_read_db)) -> User:
     token = creds.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -24,14 +39,19 @@ def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer_scheme
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Could Not validate credentials")
-    user = db.get(User, int(sub))
+    user = _load_principal(db, int(sub))
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not bool(current_user.is_admin):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
+
 def get_current_user_optional(
     creds: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)), 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Optional[User]:
     """Get current user if token is provided, otherwise return None"""
     if not creds:
@@ -41,7 +61,7 @@ def get_current_user_optional(
         sub = payload.get("sub")
         if sub is None:
             return None
-        user = db.get(User, int(sub))
+        user = _load_principal(db, int(sub))
         return user
     except JWTError:
         return None
@@ -53,7 +73,11 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 @router.post("/signup", status_code=201, response_model=UserRead)
 async def signup(payload: UserCreate, db: Session = Depends(get_db)) -> UserRead:
     try:
-        return user_repo.create(db, payload)
+        hashed = await hash_password_async(payload.password)
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    try:
+        return await run_db(user_repo.create, db, payload, hashed_password=hashed)
     except IntegrityError as e:
         msg = str(getattr(e, "orig", e))
         if "UNIQUE constraint failed: users.email" in msg:
@@ -63,9 +87,18 @@ async def signup(payload: UserCreate, db: Session = Depends(get_db)) -> UserRead
     
 @router.post("/signin", response_model=Token)
 async def singin(payload: SigninRequest, db: Session = Depends(get_db)) -> Token:
-    user = user_repo.get_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user.hashed_password):
+    user = await run_db(user_repo.get_by_email, db, payload.email)
+    if not user or not user.hashed_password:  # Google-only accounts have no password
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await verify_and_update_password_async(payload.password, user.hashed_password)
+    except PasswordHasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Transparently upgrade hashes stored with a deprecated scheme
+        await run_db(user_repo.update_password_hash, db, user, new_hash)
     token = create_access_token(data={"sub": str(user.id)})
     return Token(access_token=token)
 
@@ -76,10 +109,11 @@ async def google_signin(payload: GoogleSigninRequest, db: Session = Depends(get_
     """
     try:
         # Verify the Google token and extract user info
-        google_user_info = verify_google_token(payload.google_token)
+        google_user_info = await verify_google_token_async(payload.google_token)
         
         # Create or update user in database
-        user = user_repo.create_or_update_google_user(
+        user = await run_db(
+            user_repo.create_or_update_google_user,
             db=db,
             google_id=google_user_info["google_id"],
             email=google_user_info["email"],
@@ -0,0 +1,40 @@
+# app/api/v1/availability.py
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.db import get_read_db, run_db
+from app.core.availability import CLINIC_SCHEDULES, MAX_AVAILABILITY_DAYS
+from app.models.appointments import ClinicType, ServiceType
+from app.repositories import availability_repo
+from app.schemas.availability import Availability
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["availability"],
+)
+
+
+@router.get("/availability", response_model=Availability)
+async def get_availability(
+    clinic: ClinicType,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    service: Optional[ServiceType] = None,
+    db: Session = Depends(get_read_db),
+) -> Availability:
+    """
+    Free appointment slots at a clinic for each day from `from` to `to`
+    (inclusive; defaults to the coming week). Public, like booking itself.
+    """
+    date_from = date_from or date.today()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days >= MAX_AVAILABILITY_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_AVAILABILITY_DAYS} days per request")
+
+    days = await run_db(availability_repo.free_slots, db, clinic, date_from, date_to, service)
+    return Availability(clinic=clinic, slot_minutes=CLINIC_SCHEDULES[clinic].slot_minutes, days=days)
@@ -0,0 +1,83 @@
+# app/api/v1/export.py
+from datetime import date
+from typing import Callable, Iterator, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.db import ReadSessionLocal
+from app.core.export import csv_chunks, gzip_chunks, ndjson_chunks
+from app.api.v1.auth import get_current_admin
+from app.models.appointments import AppointmentStatus
+from app.models.users import User
+from app.repositories import appointments_repo, patient_repo
+
+router = APIRouter(prefix="/api/v1/export", tags=["Export"])
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _stream(fetch: Callable, encode: Callable, columns: list[str], compress: bool, **filters) -> Iterator[bytes]:
+    """
+    Export body generator. Like the admin feed it is a plain generator that
+    owns its session (the body outlives the request's dependencies) and is
+    iterated in the threadpool.
+    """
+    db = ReadSessionLocal()
+    try:
+        chunks = encode(fetch(db, **filters), columns)
+        yield from (gzip_chunks(chunks) if compress else chunks)
+    finally:
+        db.close()
+
+
+def _response(body: Iterator[bytes], name: str, fmt: str, compress: bool) -> StreamingResponse:
+    filename = f"{name}-{date.today().isoformat()}.{fmt}" + (".gz" if compress else "")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if compress else MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _export_appointments(fmt: str, encode: Callable, status, date_from, date_to, gzip: bool) -> StreamingResponse:
+    columns = [column.key for column in appointments_repo.EXPORT_COLUMNS]
+    body = _stream(
+        appointments_repo.export_rows, encode, columns, gzip,
+        status=status, date_from=date_from, date_to=date_to,
+    )
+    return _response(body, "appointments", fmt, gzip)
+
+
+@router.get("/appointments.ndjson")
+async def export_appointments_ndjson(
+    status: Optional[AppointmentStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    gzip: bool = False,
+    _admin: User = Depends(get_current_admin),
+):
+    """Every matching appointment as NDJSON, oldest first, streamed in constant memory."""
+    return _export_appointments("ndjson", ndjson_chunks, status, date_from, date_to, gzip)
+
+
+@router.get("/appointments.csv")
+async def export_appointments_csv(
+    status: Optional[AppointmentStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    gzip: bool = False,
+    _admin: User = Depends(get_current_admin),
+):
+    """Every matching appointment as CSV, oldest first, streamed in constant memory."""
+    return _export_appointments("csv", csv_chunks, status, date_from, date_to, gzip)
+
+
+@router.get("/patients.csv")
+async def export_patients_csv(
+    gzip: bool = False,
+    _admin: User = Depends(get_current_admin),
+):
+    """Every patient as CSV, streamed in constant memory."""
+    body = _stream(patient_repo.export_rows, csv_chunks, ["id", "full_name", "phone_number"], gzip)
+    return _response(body, "patients", "csv", gzip)
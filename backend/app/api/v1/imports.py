@@ -0,0 +1,59 @@
+# app/api/v1/imports.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.db import get_db, run_db
+from app.core.imports import format_for, read_records, run_import
+from app.api.v1.auth import get_current_admin
+from app.models.users import User
+from app.repositories import appointments_repo, patient_repo
+from app.schemas.imports import AppointmentImport, ImportFormat, ImportReport, OnConflict
+from app.schemas.patients import PatientCreate
+
+router = APIRouter(prefix="/api/v1/import", tags=["Import"])
+
+
+def _format(file: UploadFile, fmt: Optional[str]) -> str:
+    fmt = fmt or format_for(file.filename or "")
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Cannot tell the file format; pass ?format=csv or ?format=ndjson")
+    return fmt
+
+
+def _records(file: UploadFile, fmt: Optional[str]):
+    metrics.upload_bytes.inc(file.size or 0, "import")
+    return read_records(file.file, _format(file, fmt))
+
+
+@router.post("/patients", response_model=ImportReport)
+async def import_patients(
+    file: UploadFile = File(..., description="CSV (full_name,phone_number header) or NDJSON, optionally gzipped"),
+    format: Optional[ImportFormat] = None,
+    on_conflict: OnConflict = "skip",
+    db: Session = Depends(get_db),
+    _admin: User = Depends(get_current_admin),
+):
+    """
+    Bulk-load patients. Invalid rows are reported and skipped; a phone number
+    already on file is skipped or, with on_conflict=update, renamed.
+    """
+    records = _records(file, format)
+    return await run_db(
+        run_import, db, records, PatientCreate,
+        lambda session, batch: patient_repo.bulk_write(session, batch, on_conflict),
+    )
+
+
+@router.post("/appointments", response_model=ImportReport)
+async def import_appointments(
+    file: UploadFile = File(..., description="CSV or NDJSON with the booking form's fields (plus optional status)"),
+    format: Optional[ImportFormat] = None,
+    db: Session = Depends(get_db),
+    _admin: User = Depends(get_current_admin),
+):
+    """Bulk-load past or future appointments. Invalid rows are reported and skipped."""
+    records = _records(file, format)
+    return await run_db(run_import, db, records, AppointmentImport, appointments_repo.bulk_write)
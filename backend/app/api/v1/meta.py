@@ -1,4 +1,12 @@
-from fastapi import APIRouter
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.api.v1.auth import get_current_admin
+from app.core import metrics
+from app.core.principal_cache import principal_cache
+from app.models.users import User
 
 router = APIRouter(prefix="/api/v1",tags=["Meta"])
 @router.get("/healthz")
@@ -7,4 +15,18 @@ async def get_status():
 
 @router.get("/version")
 async def get_version():
-    return {"CMS Version": "1.0.0"}
\ No newline at end of file
+    return {"CMS Version": "1.0.0"}
+
+@router.get("/cache-stats")
+async def get_cache_stats(_admin: User = Depends(get_current_admin)):
+    """Hit/miss counters for the in-process caches (admin only: they reveal how many principals are signed in)."""
+    return {"principal_cache": principal_cache.stats()}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    """Request, SQL, upload and password-hashing metrics in the Prometheus text format (METRICS_TOKEN only)."""
+    if not metrics.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Metrics are disabled: set METRICS_TOKEN")
+    if not secrets.compare_digest(authorization or "", f"Bearer {metrics.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,8 +1,10 @@
 # app/api/v1/patients.py
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db, run_db
+from app.core.conditional import is_not_modified, list_etag, not_modified, revalidate_headers, row_etag
+from app.core.versions import current_version
 from app.api.v1.auth import get_current_user
 from app.models.users import User
 from app.schemas.patients import PatientCreate, PatientRead, PatientUpdate
@@ -27,29 +29,47 @@ async def create_patient(
     current_user: User = Depends(get_current_user),
 ) -> PatientRead:
     _require_admin(current_user)
-    obj = patient_repo.create(db, payload)
+    obj = await run_db(patient_repo.create, db, payload)
     return obj
 
 
 # --- list --------------------------------------------------------------------
 @router.get("/patients", response_model=list[PatientRead])
 async def list_patients(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),  # auth required
 ) -> list[PatientRead]:
-    return patient_repo.list_all(db)
+    # 304 from the patients change counter, before any row is loaded
+    version = await run_db(current_version, db, "patients")
+    if version is not None:
+        headers = revalidate_headers(list_etag(version, request, current_user.id))
+        if is_not_modified(request.headers, headers["ETag"]):
+            return not_modified(headers)
+        response.headers.update(headers)
+    return await run_db(patient_repo.list_all, db)
 
 
 # --- get one -----------------------------------------------------------------
 @router.get("/patients/{patient_id}", response_model=PatientRead)
 async def get_patient(
     patient_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),  # auth required
 ) -> PatientRead:
-    obj = patient_repo.get_by_id(db, patient_id)
+    stamp = await run_db(patient_repo.version_of, db, patient_id)
+    if stamp is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    headers = revalidate_headers(row_etag("patient", patient_id, stamp))
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+    obj = await run_db(patient_repo.get_by_id, db, patient_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Patient not found")
+    response.headers.update(headers)
     return obj
 
 
@@ -57,10 +77,10 @@ async def get_patient(
 @router.get("/patients/search/", response_model=list[PatientRead])
 async def search_patients(
     query: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),  # auth required
 ) -> list[PatientRead]:
-    return patient_repo.search(db, query)
+    return await run_db(patient_repo.search, db, query)
 
 
 # --- update (partial) --------------------------------------------------------
@@ -72,11 +92,11 @@ async def update_patient(
     current_user: User = Depends(get_current_user),
 ) -> PatientRead:
     _require_admin(current_user)
-    existing = patient_repo.get_by_id(db, patient_id)
+    existing = await run_db(patient_repo.get_by_id, db, patient_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    updated = patient_repo.update(db, patient_id, payload)
+    updated = await run_db(patient_repo.update, db, patient_id, payload)
     return updated
 
 
@@ -88,9 +108,9 @@ async def delete_patient(
     current_user: User = Depends(get_current_user),
 ) -> Response:
     _require_admin(current_user)
-    existing = patient_repo.get_by_id(db, patient_id)
+    existing = await run_db(patient_repo.get_by_id, db, patient_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    patient_repo.delete(db, patient_id)
+    await run_db(patient_repo.delete, db, patient_id)
     return Response(status_code=204)
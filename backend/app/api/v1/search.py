@@ -0,0 +1,40 @@
+# app/api/v1/search.py
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.db import get_read_db, run_db
+from app.core import search_index
+from app.api.v1.auth import get_current_admin
+from app.models.users import User
+from app.repositories import search_repo
+from app.schemas.search import SearchKind, SearchPage
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["search"],
+)
+
+
+@router.get("/search", response_model=SearchPage)
+async def search(
+    q: str = Query(..., min_length=search_index.MIN_QUERY_LENGTH, max_length=200),
+    kind: Optional[SearchKind] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(search_repo.DEFAULT_PAGE_SIZE, ge=1, le=search_repo.MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+    current_admin: User = Depends(get_current_admin),
+) -> SearchPage:
+    """
+    Ranked search over patients (name, phone) and appointments (name, email,
+    phone, payment reference, message). Every word of 3+ characters must
+    match, anywhere inside a field. Admin only.
+    """
+    if not search_index.is_enabled():
+        raise HTTPException(status_code=503, detail="Search is not available on this database")
+    try:
+        items, next_cursor = await run_db(search_repo.search, db, q, kind, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,169 @@
+"""
+Clinic schedules: opening hours, slot length and per-slot capacity.
+
+Each clinic has a weekly timetable cut into fixed-length slots. Every slot
+can hold a number of bookings per service, counted separately for each
+service: by default three general consultations and one of each surgery
+consult, side by side. The defaults mirror the
+timetables published on the booking page. They can be overridden with
+CLINIC_SCHEDULES, a JSON object keyed by clinic value, e.g.
+
+    {"clinic_a": {"hours": {"mon": ["16:00", "18:00"], "sat": ["10:00", "14:00"]},
+                  "slot_minutes": 20,
+                  "capacity": {"general_consultation": 4}}}
+
+Keys left out of an override keep their defaults. Clinic times are local to
+the clinic's timezone (CLINIC_TIMEZONE by default, or "timezone" in an
+override); scheduled_at_for() turns them into the UTC instant stored on
+appointments. Occupancy, meaning how many bookings each slot already holds,
+lives in the slot_occupancy table (see availability_repo).
+"""
+import json
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.models.appointments import ClinicType, ServiceType
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MAX_AVAILABILITY_DAYS = int(os.getenv("MAX_AVAILABILITY_DAYS", "31"))
+CLINIC_TIMEZONE = os.getenv("CLINIC_TIMEZONE", "Asia/Karachi")
+
+
+class InvalidSlot(ValueError):
+    """The requested time is not a bookable slot (clinic closed, or off the slot grid)."""
+
+
+class SlotUnavailable(ValueError):
+    """The slot is bookable but already holds its full capacity for the service."""
+
+
+@dataclass(frozen=True)
+class ClinicSchedule:
+    hours: dict[str, tuple[str, str]]  # weekday -> (open, close) as HH:MM; missing days are closed
+    slot_minutes: int = 30
+    capacity: dict[ServiceType, int] = field(default_factory=dict)
+    default_capacity: int = 1  # for services not listed in capacity
+    timezone: str = CLINIC_TIMEZONE
+
+    def slots_on(self, day: date) -> list[str]:
+        """Start times (HH:MM) of every slot on a day; the last slot ends by closing time."""
+        opening = self.hours.get(WEEKDAYS[day.weekday()])
+        if opening is None:
+            return []
+        start = datetime.strptime(opening[0], "%H:%M")
+        close = datetime.strptime(opening[1], "%H:%M")
+        step = timedelta(minutes=self.slot_minutes)
+        slots = []
+        while start + step <= close:
+            slots.append(start.strftime("%H:%M"))
+            start += step
+        return slots
+
+    def capacity_for(self, service: ServiceType) -> int:
+        return self.capacity.get(service, self.default_capacity)
+
+
+_CONSULTATION_CAPACITY = {ServiceType.GENERAL_CONSULTATION: 3}
+
+DEFAULT_SCHEDULES: dict[ClinicType, ClinicSchedule] = {
+    ClinicType.CLINIC_A: ClinicSchedule(
+        hours={"mon": ("16:00", "18:00"), "tue": ("16:00", "18:00"), "wed": ("16:00", "18:00")},
+        capacity=_CONSULTATION_CAPACITY,
+    ),
+    ClinicType.CLINIC_B: ClinicSchedule(
+        hours={"thu": ("11:00", "13:00")},
+        capacity=_CONSULTATION_CAPACITY,
+    ),
+}
+
+
+def load_schedules(raw: Optional[str]) -> dict[ClinicType, ClinicSchedule]:
+    """
+    Apply a CLINIC_SCHEDULES JSON override on top of DEFAULT_SCHEDULES.
+
+    Raises:
+        ValueError: If the JSON names an unknown clinic, weekday or service
+    """
+    schedules = dict(DEFAULT_SCHEDULES)
+    if not raw:
+        return schedules
+    for clinic_value, override in json.loads(raw).items():
+        clinic = ClinicType(clinic_value)
+        changes = {}
+        if "hours" in override:
+            unknown = set(override["hours"]) - set(WEEKDAYS)
+            if unknown:
+                raise ValueError(f"Unknown weekday(s) in CLINIC_SCHEDULES: {sorted(unknown)}")
+            changes["hours"] = {day: tuple(span) for day, span in override["hours"].items() if span}
+        if "slot_minutes" in override:
+            changes["slot_minutes"] = int(override["slot_minutes"])
+        if "capacity" in override:
+            changes["capacity"] = {ServiceType(s): int(n) for s, n in override["capacity"].items()}
+        if "default_capacity" in override:
+            changes["default_capacity"] = int(override["default_capacity"])
+        if "timezone" in override:
+            ZoneInfo(override["timezone"])  # fail fast on unknown zones
+            changes["timezone"] = override["timezone"]
+        schedules[clinic] = replace(schedules[clinic], **changes)
+    return schedules
+
+
+CLINIC_SCHEDULES = load_schedules(os.getenv("CLINIC_SCHEDULES"))
+
+
+def check_slot(clinic: ClinicType, service: ServiceType, day: str, time: str) -> int:
+    """
+    Make sure a booking falls on one of the clinic's slots.
+
+    Returns:
+        int: The slot's capacity for the service
+
+    Raises:
+        InvalidSlot: If the clinic is closed then or the time is off the slot grid
+    """
+    schedule = CLINIC_SCHEDULES[clinic]
+    slots = schedule.slots_on(date.fromisoformat(day))
+    if not slots:
+        raise InvalidSlot(f"{clinic.value} is closed on {day}")
+    if time not in slots:
+        raise InvalidSlot(f"{time} is not an appointment slot at {clinic.value} on {day} (slots: {', '.join(slots)})")
+    return schedule.capacity_for(service)
+
+
+def scheduled_at_for(clinic: ClinicType, preferred_date: str, preferred_time: str) -> tuple[datetime, date]:
+    """
+    Normalize a booking's local date and time strings.
+
+    Returns:
+        tuple[datetime, date]: The naive UTC instant, and the clinic-local day
+
+    Raises:
+        ValueError: If the date or time does not parse
+    """
+    local_day = date.fromisoformat(preferred_date)
+    local_time = datetime.strptime(preferred_time.strip(), "%H:%M").time()  # accepts "9:30" as well as "09:30"
+    local = datetime.combine(local_day, local_time, tzinfo=ZoneInfo(CLINIC_SCHEDULES[clinic].timezone))
+    return local.astimezone(ZoneInfo("UTC")).replace(tzinfo=None), local_day
+
+
+def utc_bounds(date_from: Optional[date], date_to: Optional[date]) -> tuple[Optional[datetime], Optional[datetime]]:
+    """
+    A naive-UTC [start, end) range on scheduled_at that covers the local days
+    date_from..date_to at every clinic, so a day filter can use the
+    scheduled_at index. The range may be slightly wider than the days when
+    clinics sit in different timezones; filter on scheduled_date for exactness.
+    """
+    zones = {ZoneInfo(schedule.timezone) for schedule in CLINIC_SCHEDULES.values()}
+    utc = ZoneInfo("UTC")
+    start = end = None
+    if date_from is not None:
+        start = min(datetime.combine(date_from, datetime.min.time(), tzinfo=z).astimezone(utc) for z in zones)
+        start = start.replace(tzinfo=None)
+    if date_to is not None:
+        next_day = date_to + timedelta(days=1)
+        end = max(datetime.combine(next_day, datetime.min.time(), tzinfo=z).astimezone(utc) for z in zones)
+        end = end.replace(tzinfo=None)
+    return start, end
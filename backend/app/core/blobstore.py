@@ -0,0 +1,131 @@
+"""
+Content-addressed storage for payment proofs.
+
+Every file is stored once under its SHA-256, fanned out over two directory
+levels so no single directory grows huge:
+
+    uploads/payment_proofs/objects/ab/cd/abcd…<sha256>.pdf
+
+The extension is kept so the descriptive download name and media type can
+still be derived from the stored path. Which appointments use a blob is
+tracked by the payment_proof_blobs table (see payment_proof_repo); this
+module only deals with files.
+"""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.uploads import StoredUpload, receive_upload, extension_for, PAYMENT_PROOF_MAX_BYTES
+
+BLOB_DIR = Path(os.getenv("PAYMENT_PROOF_BLOB_DIR", "uploads/payment_proofs/objects"))
+TEMP_DIR = BLOB_DIR / "tmp"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(sha256: str, extension: str) -> Path:
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / f"{sha256}{extension}"
+
+
+def _place(temp_path: Path, dest: Path) -> None:
+    """Move a finished temp file into the store; identical content already stored wins."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if _touch(dest):
+        temp_path.unlink(missing_ok=True)
+    else:
+        os.replace(temp_path, dest)
+
+
+def _touch(dest: Path) -> bool:
+    """
+    Refresh a stored blob's mtime so garbage collection leaves a blob that is
+    being reused alone. False if it is not there (or garbage collection moved
+    it aside meanwhile): the caller stores its own copy instead.
+    """
+    try:
+        os.utime(dest)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+async def store_upload(upload: UploadFile, max_bytes: int = PAYMENT_PROOF_MAX_BYTES) -> StoredUpload:
+    """
+    Stream an upload into the store and return its blob location.
+
+    Raises:
+        UploadTooLarge / UnsupportedUploadType: See receive_upload
+    """
+    received = await receive_upload(upload, TEMP_DIR, max_bytes)
+    dest = blob_path(received.sha256, extension_for(received.content_type))
+    await run_in_threadpool(_place, received.path, dest)
+    received.path = dest
+    return received
+
+
+def hash_file(path: Path) -> tuple[str, int]:
+    """SHA-256 hex digest and size of a file on disk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def import_file(src: Path, sha256: str, extension: str) -> Path:
+    """
+    Copy an existing file into the store (hard link when possible). The source
+    is left in place so the caller can delete it only after its DB change commits.
+    """
+    dest = blob_path(sha256, extension)
+    if _touch(dest):
+        return dest
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    temp = TEMP_DIR / f"{sha256}.import"
+    temp.unlink(missing_ok=True)
+    try:
+        os.link(src, temp)
+    except OSError:
+        shutil.copyfile(src, temp)
+    os.replace(temp, dest)
+    return dest
+
+
+def is_blob_path(path: Optional[str]) -> bool:
+    return bool(path) and Path(path).is_relative_to(BLOB_DIR)
+
+
+def modified_at(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def trash_blob(path: str) -> Optional[Path]:
+    """
+    Move a blob aside before deleting it (None if it is already gone). An
+    upload of the same bytes racing with this either touched the blob first,
+    and the moved file keeps that mtime, or finds it missing and stores a copy.
+    """
+    trash = Path(f"{path}.trash")
+    try:
+        os.replace(path, trash)
+    except FileNotFoundError:
+        return None
+    return trash
+
+
+def restore_blob(trash: Path, path: str) -> None:
+    """Undo trash_blob(), unless an upload has stored the same bytes there since."""
+    if Path(path).exists():
+        trash.unlink(missing_ok=True)
+    else:
+        os.replace(trash, path)
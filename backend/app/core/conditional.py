@@ -0,0 +1,85 @@
+"""
+Conditional GET helpers (RFC 9110 validators).
+
+Routes compute a validator (ETag and, optionally, a Last-Modified time)
+cheaply and call is_not_modified() before doing any expensive work; on a
+match they return not_modified() instead of a body.
+
+API lists and details are marked REVALIDATE: browsers keep them but check
+every time, which turns the admin pages' re-fetches into 304s while
+nothing has changed. Lists use a table's change counter (see
+app.core.versions) and details use the row's updated_at. A list whose
+table has no counter gets no validator and is always sent in full.
+"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+REVALIDATE = "private, no-cache"
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (as GET requires)."""
+    if if_none_match.strip() == "*":
+        return True
+    ours = _opaque(etag)
+    return any(_opaque(candidate) == ours for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    True if the client's cached copy is still current.
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it, and only when a modification time is known.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def not_modified(headers: Mapping[str, str]) -> Response:
+    """304 carrying the same validators and cache headers as a full response would."""
+    return Response(status_code=304, headers=dict(headers))
+
+
+def list_etag(version: int, request: Request, principal_id: Optional[int]) -> str:
+    """
+    Weak ETag for a list response: the table's change counter, plus a digest
+    of the URL and the caller (some lists depend on who asks, and a browser
+    shared by two accounts must not revalidate one's copy for the other).
+    """
+    scope = f"{principal_id}|{request.url.path}?{request.url.query}".encode()
+    return f'W/"{version:x}-{hashlib.blake2b(scope, digest_size=8).hexdigest()}"'
+
+
+def row_etag(kind: str, row_id: int, stamp: str) -> str:
+    """Weak ETag for one row from its updated_at (see the repositories' version_of)."""
+    return f'W/"{kind}-{row_id}-{hashlib.blake2b(stamp.encode(), digest_size=8).hexdigest()}"'
+
+
+def revalidate_headers(etag: str) -> dict[str, str]:
+    """Validator and cache headers shared by a full response and its 304."""
+    return {"ETag": etag, "Cache-Control": REVALIDATE, "Vary": "Authorization"}
@@ -1,13 +1,159 @@
-from sqlalchemy import create_engine
+import os
+import time
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateColumn
+from starlette.concurrency import run_in_threadpool
+
+from app.core import metrics, slow_queries
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cms.db")
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+# sqlite:// and sqlite:///:memory: (as in tests): every connection would open its own empty database
+IN_MEMORY = IS_SQLITE and make_url(DATABASE_URL).database in (None, "", ":memory:")
+
+# Connection pools (write pool serves POST/PUT/DELETE, read pool serves GETs)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", "20"))
+
+# SQLite tuning, applied to every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))        # 64 MiB page cache
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MiB
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+
+def _create_engine(pool_size: int, max_overflow: int) -> Engine:
+    # check_same_thread=False: a request's session may be used from several
+    # threadpool workers (one at a time) when DB calls go through run_db().
+    connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+    if IN_MEMORY:
+        # One connection shared by every session, so they all see the same database
+        return create_engine(DATABASE_URL, connect_args=connect_args, poolclass=StaticPool)
+    return create_engine(
+        DATABASE_URL,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")  # readers no longer block behind writers
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _configure_sqlite(engine: Engine, read_only: bool) -> None:
+    if engine.dialect.name != "sqlite":
+        return
+    if IN_MEMORY:
+        # Every session shares the one connection, so they cannot each hold
+        # their own transaction: leave BEGIN to pysqlite, as plain tests expect
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # Take over transaction control from pysqlite so we can choose the BEGIN mode
+        dbapi_connection.isolation_level = None
+        _apply_sqlite_pragmas(dbapi_connection, read_only)
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        # Writers grab the write lock up front (and wait up to busy_timeout for it)
+        # instead of failing with "database is locked" when upgrading a read lock.
+        conn.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def _instrument_queries(engine: Engine) -> None:
+    # Query count and time per request (app.core.metrics) and the slow-query log (app.core.slow_queries)
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
 
-DATABASE_URL = "sqlite:///./cms.db"
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        if metrics.METRICS_ENABLED:
+            metrics.record_query(seconds)
+        if slow_queries.is_slow(seconds):
+            slow_queries.record(cursor.connection, statement, parameters, executemany, seconds)
+
+
+engine = _create_engine(DB_POOL_SIZE, DB_MAX_OVERFLOW)
+# An in-memory database exists only on the write engine's connection: reads share it
+read_engine = engine if IN_MEMORY else _create_engine(DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
+_configure_sqlite(engine, read_only=False)
+if read_engine is not engine:
+    _configure_sqlite(read_engine, read_only=True)
+if metrics.METRICS_ENABLED or slow_queries.ENABLED:
+    for bind in {engine, read_engine}:
+        _instrument_queries(bind)
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+T = TypeVar("T")
+
+
+def create_missing_indexes(bind: Engine = engine) -> None:
+    """
+    create_all() skips tables that already exist, so indexes added to a model
+    later never reach existing databases. Create any that are missing.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def add_missing_columns(bind: Engine = engine) -> list[str]:
+    """
+    ALTER TABLE ... ADD COLUMN for model columns an existing table lacks.
+    Only nullable columns can be added this way (SQLite needs a default
+    otherwise); existing rows get NULL until a backfill fills them.
+
+    Returns:
+        list[str]: "table.column" for every column added
+    """
+    added = []
+    existing_tables = set(inspect(bind).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        # Check inside the write transaction so concurrent workers cannot both add a column
+        with bind.begin() as conn:
+            present = {column["name"] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present:
+                    ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                    added.append(f"{table.name}.{column.name}")
+    return added
+
 
 def get_db():
     db = SessionLocal()
@@ -15,6 +161,22 @@ def get_db():
         yield db
     finally:
         db.close()
-        
-        
 
+
+def get_read_db():
+    """Session from the read-only (query_only) pool, for GET endpoints."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking repository call in the threadpool so async route handlers
+    never block the event loop on a query or commit.
+
+    Usage: `await run_db(appointments_repo.list_all, db, cursor=cursor)`
+    """
+    return await run_in_threadpool(fn, *args, **kwargs)
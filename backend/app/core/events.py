@@ -0,0 +1,153 @@
+"""
+In-process pub/sub for live appointment changes, served as Server-Sent Events.
+
+Repositories publish after committing (from threadpool workers); each SSE
+connection is a Subscription with a bounded asyncio queue on the event loop.
+Delivery never blocks a publisher: a subscriber whose queue is full is
+dropped (its stream ends and the browser reconnects), so one slow client
+cannot hold up the others or grow memory without bound.
+
+The last EVENTS_RING_SIZE events stay in a ring buffer. A client that
+reconnects with Last-Event-ID gets what it missed from there; if that is no
+longer possible (too far behind, or the id comes from before a restart) it
+gets a "reset" event and should reload the list.
+
+Event ids are "<epoch>-<seq>", where the epoch identifies this process. The
+broker is per process: with several workers each one only sees its own
+writes, so run the SSE endpoint on a single worker (or put a shared bus
+behind publish()).
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+EVENTS_RING_SIZE = int(os.getenv("EVENTS_RING_SIZE", "1000"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    seq: int
+    kind: str
+    data: Any
+
+
+class Subscription:
+    def __init__(self, broker: "EventBroker", loop: asyncio.AbstractEventLoop, queue_size: int):
+        self._broker = broker
+        self._loop = loop
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+        self.start_id = ""  # id of the newest event when subscribing: where this stream picks up
+
+    def _offer(self, event: Optional[Event]) -> None:
+        # Runs on the subscriber's loop. None closes the stream.
+        if self.dropped:
+            return
+        if event is not None:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except asyncio.QueueFull:
+                self._broker.drops += 1
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def deliver(self, event: Optional[Event]) -> None:
+        """Hand an event over from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:  # loop already closed
+            pass
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """
+        Next event, or None once the subscription is closed or dropped.
+
+        Raises:
+            asyncio.TimeoutError: If nothing arrives within timeout (time for a heartbeat)
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self, ring_size: int, queue_size: int):
+        self.epoch = format(time.time_ns() // 1000, "x")
+        self.queue_size = queue_size
+        self._ring: "deque[Event]" = deque(maxlen=ring_size)
+        self._subscribers: set[Subscription] = set()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.published = 0
+        self.drops = 0
+
+    def publish(self, kind: str, data: Any) -> Event:
+        """Record an event and fan it out to every subscriber. Safe to call from any thread."""
+        with self._lock:
+            self._seq += 1
+            event = Event(f"{self.epoch}-{self._seq}", self._seq, kind, data)
+            self._ring.append(event)
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> tuple[Subscription, Optional[list[Event]]]:
+        """
+        Register a subscriber on the running event loop.
+
+        Returns:
+            tuple: The subscription, and the events to replay after
+            last_event_id (empty when there is none to resume from), or None
+            when they can no longer be replayed and the client must reload
+        """
+        subscription = Subscription(self, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            # Registered under the lock, so no event falls between the replay and the live queue
+            self._subscribers.add(subscription)
+            subscription.start_id = f"{self.epoch}-{self._seq}"
+            return subscription, self._missed(last_event_id)
+
+    def _missed(self, last_event_id: Optional[str]) -> Optional[list[Event]]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq >= self._seq:
+            return []
+        if not self._ring or self._ring[0].seq > seq + 1:
+            return None  # fell out of the ring buffer
+        return [event for event in self._ring if event.seq > seq]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def close_all(self) -> None:
+        """End every open stream (at application shutdown)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.deliver(None)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+appointment_events = EventBroker(EVENTS_RING_SIZE, EVENTS_QUEUE_SIZE)
@@ -0,0 +1,84 @@
+"""
+Streaming encoders for bulk exports.
+
+Each encoder turns an iterable of DB rows into an iterator of byte chunks.
+Rows are grouped, CHUNK_ROWS at a time, so a sync generator served by
+StreamingResponse pays one threadpool hop per chunk rather than per row.
+Only one chunk is held in memory at a time, however many rows there are.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, Sequence
+
+CHUNK_ROWS = 1000
+# Spreadsheets read a cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _plain(value):
+    """JSON/CSV-friendly form of a column value."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    """
+    CSV form of a column value. Text from the public booking form could hold
+    a formula (=HYPERLINK(...)) that Excel would run, so text cells that
+    start like one are quoted with a leading apostrophe.
+    """
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def ndjson_chunks(rows: Iterable, columns: Sequence[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """One JSON object per line (application/x-ndjson)."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({name: _plain(value) for name, value in zip(columns, row)}, separators=(",", ":")))
+        if len(lines) == chunk_rows:
+            yield ("\n".join(lines) + "\n").encode()
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def csv_chunks(rows: Iterable, columns: Sequence[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    RFC 4180 CSV with a header row. Starts with a UTF-8 BOM so Excel detects
+    the encoding; cells that would read as formulas are neutralized (_csv_cell).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        pending += 1
+        if pending == chunk_rows:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a chunk stream into a single gzip member, incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
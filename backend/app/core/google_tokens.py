@@ -0,0 +1,143 @@
+"""
+Google ID-token verification with a cached signing-cert set.
+
+google.oauth2.id_token.verify_oauth2_token downloads Google's certs on every
+call. GoogleTokenVerifier instead:
+- reuses one pooled requests.Session for the cert endpoint,
+- caches the certs for the max-age Google sends in Cache-Control (minus Age),
+- refreshes them in a background thread shortly before they expire, so
+  sign-ins never wait on the fetch once the cache is warm,
+- forces one refresh when a token names a key id it has not seen (rotation),
+- verifies the RS256 signature locally.
+
+Everything here is blocking; async callers run verify() in the threadpool.
+The cert URL is configurable so tests can serve certs from a local stub.
+"""
+import base64
+import json
+import re
+import threading
+import time
+from typing import Optional
+
+import requests
+from google.auth import jwt as google_jwt
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+# The background refresh starts at most this share of the cert lifetime before expiry
+REFRESH_AHEAD_FRACTION = 0.1
+
+
+def _parse_max_age(response: requests.Response, default: float) -> float:
+    match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+    if not match:
+        return default
+    age = int(response.headers.get("Age", "0") or 0)
+    return max(0.0, float(match.group(1)) - age)
+
+
+def _token_key_id(token: str) -> Optional[str]:
+    try:
+        header = token.split(".", 1)[0]
+        header += "=" * (-len(header) % 4)
+        return json.loads(base64.urlsafe_b64decode(header)).get("kid")
+    except Exception:
+        return None
+
+
+class GoogleTokenVerifier:
+    def __init__(
+        self,
+        certs_url: str,
+        audience: str,
+        session: Optional[requests.Session] = None,
+        default_ttl: float = 300.0,
+        refresh_ahead: float = 300.0,
+        timeout: float = 5.0,
+        clock_skew_in_seconds: int = 10,
+        min_forced_refresh_interval: float = 30.0,
+    ):
+        self.certs_url = certs_url
+        self.audience = audience
+        self.session = session or requests.Session()
+        self.default_ttl = default_ttl        # used when the response has no max-age
+        self.refresh_ahead = refresh_ahead    # start a background refresh this long before expiry (at most)
+        self.timeout = timeout
+        self.clock_skew_in_seconds = clock_skew_in_seconds
+        # Unknown key ids trigger at most one refetch per interval, so forged tokens cannot hammer Google
+        self.min_forced_refresh_interval = min_forced_refresh_interval
+
+        self._certs: Optional[dict] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._fetched_at = float("-inf")
+        self._fetch_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # guards _refreshing; never held during a fetch
+        self._refreshing = False
+        self.fetches = 0
+
+    # --- cert cache --------------------------------------------------------------
+    def _fetch(self) -> None:
+        response = self.session.get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+        certs = response.json()
+        ttl = _parse_max_age(response, self.default_ttl)
+        now = time.monotonic()
+        # A refresh window as long as the lifetime would refetch on every call after a fetch
+        refresh_at = now + ttl - min(self.refresh_ahead, ttl * REFRESH_AHEAD_FRACTION)
+        self._certs, self._expires_at, self._refresh_at, self._fetched_at = certs, now + ttl, refresh_at, now
+        self.fetches += 1
+
+    def _refresh_blocking(self, stale_expiry: float) -> None:
+        with self._fetch_lock:
+            # Someone else refreshed while we waited for the lock
+            if self._certs is not None and self._expires_at != stale_expiry and self._expires_at > time.monotonic():
+                return
+            self._fetch()
+
+    def _refresh_in_background(self) -> None:
+        def run():
+            try:
+                with self._fetch_lock:
+                    self._fetch()
+            except Exception:
+                pass  # keep serving the current certs; the next call retries
+            finally:
+                with self._refresh_lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="google-certs-refresh", daemon=True).start()
+
+    def get_certs(self, force: bool = False) -> dict:
+        expires_at = self._expires_at
+        now = time.monotonic()
+        if force or self._certs is None or now >= expires_at:
+            self._refresh_blocking(expires_at)
+        elif now >= self._refresh_at:
+            with self._refresh_lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                self._refresh_in_background()
+        return self._certs
+
+    # --- verification ------------------------------------------------------------
+    def verify(self, token: str) -> dict:
+        """
+        Verify signature, expiry, audience and issuer; return the token claims.
+
+        Raises:
+            ValueError: If the token is invalid
+        """
+        certs = self.get_certs()
+        key_id = _token_key_id(token)
+        if key_id and key_id not in certs and time.monotonic() - self._fetched_at >= self.min_forced_refresh_interval:
+            certs = self.get_certs(force=True)  # Google may have rotated its keys
+
+        claims = google_jwt.decode(
+            token, certs=certs, audience=self.audience, clock_skew_in_seconds=self.clock_skew_in_seconds
+        )
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError("Wrong issuer.")
+        return claims
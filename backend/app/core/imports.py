@@ -0,0 +1,144 @@
+"""
+Bulk import: read CSV/NDJSON records, validate them and write them in batches.
+
+Rows are validated one by one with the same pydantic schemas the API uses.
+Rows that fail validation are reported with their line number and skipped;
+they never abort the import. Valid rows are handed to a repository writer
+BATCH_ROWS at a time. The writer does one executemany per table and the
+batch is committed as its own transaction, so a 200k-row file never holds
+the write lock for long and only one batch is in memory at a time.
+
+Files may be gzipped (a ".gz" suffix, or a gzip magic number when reading
+an upload), which makes the exports importable as they are.
+"""
+import csv
+import gzip
+import io
+import json
+import time
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+BATCH_ROWS = 5000
+MAX_REPORTED_ERRORS = 1000  # per import; the failed count keeps going past it
+FORMATS = ("csv", "ndjson")
+
+
+def format_for(filename: str) -> Optional[str]:
+    """Guess the record format from a file name (data.csv, data.ndjson.gz, ...)."""
+    name = filename.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def _decompressed(stream: BinaryIO) -> BinaryIO:
+    peek = stream.read(2)
+    stream.seek(0)
+    return gzip.GzipFile(fileobj=stream, mode="rb") if peek == b"\x1f\x8b" else stream
+
+
+def read_records(stream: BinaryIO, fmt: str) -> Iterator[tuple[int, Any]]:
+    """
+    Yield (line number, record) from a seekable binary stream. CSV records
+    are dicts keyed by the header row, with empty cells as None. NDJSON
+    records are whatever each line decodes to; a line that is not valid JSON
+    is yielded as a ValueError for the caller to report.
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format {fmt!r} (expected one of: {', '.join(FORMATS)})")
+    text = io.TextIOWrapper(_decompressed(stream), encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, {key: (value if value != "" else None) for key, value in record.items()}
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, ValueError(f"Invalid JSON: {exc.msg}")
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+        )
+    return str(exc)
+
+
+def run_import(
+    db: Session,
+    records: Iterator[tuple[int, Any]],
+    schema: type[BaseModel],
+    write_batch: Callable[[Session, list[tuple[int, BaseModel]]], dict],
+    batch_size: int = BATCH_ROWS,
+) -> dict:
+    """
+    Validate records against schema and write them through write_batch,
+    committing after every batch.
+
+    Args:
+        db: Write session
+        records: (line number, record) pairs, see read_records
+        schema: Pydantic model each record must satisfy
+        write_batch: Repository writer; receives the batch's (line number,
+            payload) pairs and returns counts ("inserted", "updated",
+            "skipped") plus optional "errors" as (line number, message)
+        batch_size: Rows per executemany / transaction
+
+    Returns:
+        dict: Fields of schemas.imports.ImportReport
+    """
+    report = {"processed": 0, "inserted": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": []}
+    started = time.perf_counter()
+
+    def fail(line_no: int, message: str) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_no, "error": message})
+
+    def flush(batch: list) -> None:
+        counts = write_batch(db, batch)
+        db.commit()
+        for key in ("inserted", "updated", "skipped"):
+            report[key] += counts.get(key, 0)
+        for line_no, message in counts.get("errors", ()):
+            fail(line_no, message)
+
+    batch = []
+    try:
+        for line_no, record in records:
+            report["processed"] += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError("Expected an object")
+                batch.append((line_no, schema.model_validate(record)))
+            except ValueError as exc:  # ValidationError is a ValueError
+                fail(line_no, _describe(exc))
+                continue
+            if len(batch) == batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except Exception:
+        db.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    report["seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["processed"] / elapsed, 1) if elapsed > 0 else 0.0
+    return report
@@ -0,0 +1,253 @@
+"""
+Request, SQL and hashing instrumentation, exported in the Prometheus text format.
+
+MetricsMiddleware wraps every HTTP request. It keeps a RequestTimings in a
+context variable for the request's lifetime. The variable follows the
+request into the threadpool (run_db, streaming bodies), where the engine
+hooks in app.core.db add each query's count and duration to it. When the
+response starts, the middleware can add a Server-Timing header with the DB,
+serialization and password-hashing time so far (everything, except for
+streamed bodies). Serialization is the JSON rendering in the app's response
+classes (app.core.serialization); FastAPI's response_model validation has no
+hook and is not included. When the response ends, the middleware records the
+request in per-route-template histograms.
+
+The hot path is a few perf_counter() calls and a bisect per observation, so
+this can stay on in production: METRICS_ENABLED=false removes the middleware
+and hooks entirely. The Server-Timing header tells clients how long queries
+took, so it is off unless SERVER_TIMING_ENABLED=true (for local profiling).
+/api/v1/metrics reveals per-route traffic and sign-in counts: it answers only
+requests bearing METRICS_TOKEN, and is disabled while that is unset.
+
+Metrics are per process: with several workers, scrape each one (or
+aggregate them in Prometheus).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # /api/v1/metrics wants "Authorization: Bearer <token>"; unset disables it
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PASSWORD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+UNMATCHED_ROUTE = "unmatched"  # 404s: keep arbitrary paths out of the label values
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{_labels(self.label_names, labels)} {_number(value)}" for labels, value in values]
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (non-cumulative; the last one is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket = _labels(self.label_names, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the last body byte is sent",
+    LATENCY_BUCKETS, ("method", "route", "status"),
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per HTTP request", LATENCY_BUCKETS, ("method", "route"),
+)
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served")
+query_duration = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time (including outside requests)", QUERY_BUCKETS,
+)
+slow_queries = Counter("db_slow_queries_total", "SQL statements over SLOW_QUERY_MS (see app.core.slow_queries)")
+upload_bytes = Counter("upload_bytes_total", "Bytes received in file uploads", ("kind",))
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "CPU time per password hash or verification (excludes queueing)",
+    PASSWORD_BUCKETS, ("operation",),
+)
+
+REGISTRY = (
+    request_duration, request_db_queries, request_db_seconds, requests_in_flight,
+    query_duration, slow_queries, upload_bytes, password_hash_duration,
+)
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestTimings:
+    started: float
+    request: str = ""  # "GET /api/v1/patients"
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    password_seconds: float = 0.0
+
+    def server_timing(self, now: float) -> str:
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+            f"serialize;dur={self.serialize_seconds * 1000:.1f}",
+        ]
+        if self.password_seconds:
+            parts.append(f"pwd;dur={self.password_seconds * 1000:.1f}")
+        parts.append(f"total;dur={(now - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_request() -> Optional[str]:
+    """Method and path of the request being served in this context, if any."""
+    timings = _current.get()
+    return timings.request if timings is not None else None
+
+
+def record_query(seconds: float) -> None:
+    """Count one SQL statement (called from the engine hooks, on any thread)."""
+    query_duration.observe(seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_seconds += seconds
+
+
+def record_password_hash(operation: str, seconds: float) -> None:
+    password_hash_duration.observe(seconds, operation)
+    timings = _current.get()
+    if timings is not None:
+        timings.password_seconds += seconds
+
+
+@contextmanager
+def serialization_timer() -> Iterator[None]:
+    """Count the enclosed work as response serialization for the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Per-request timings, route-template histograms and the Server-Timing header."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(time.perf_counter(), f"{scope['method']} {scope['path']}")
+        token = _current.set(timings)
+        status = 500
+
+        async def timed_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing(time.perf_counter()))
+            await send(message)
+
+        requests_in_flight.inc(1)
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _current.reset(token)
+            requests_in_flight.inc(-1)
+            # The router leaves the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - timings.started, method, route, status)
+            request_db_queries.observe(timings.queries, method, route)
+            request_db_seconds.observe(timings.db_seconds, method, route)
@@ -0,0 +1,373 @@
+"""
+Versioned schema migrations with online, checkpointed data backfills.
+
+Migrations are the modules in app/migrations named m<NNNN>_<name>.py,
+applied in version order and recorded in the schema_versions table. A
+module defines:
+
+    STEPS     schema operations (AddColumn, CreateIndex, DropIndex,
+              ExecuteSql), run together in one transaction
+    BACKFILL  optionally, a data migration over one table's rows
+
+Every step looks before it acts (a column that is already there is not
+added again). prepare() creates missing tables straight from the models
+before migrating, so on a new database the steps find their work done, and
+a database patched by an older script is brought in line instead of failing.
+
+A backfill walks its table in id order, batch_size rows per transaction,
+and saves its checkpoint (the last id done) in the same transaction as the
+rows. It pauses between chunks so live writes get the lock in between, and
+it can be stopped at any point and resumed from the checkpoint. Workers
+only need the schema steps: they start once those are applied and finish
+any open backfill in a background thread, so the application code must
+cope with rows not backfilled yet (NULL scheduled_at sorts last, say).
+
+plan() reports what is pending without changing anything: each step's SQL
+and the rows each step and backfill is estimated to touch.
+
+Migrations spell out their SQL and names as they were when written rather
+than using the models, so later model changes cannot break them.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import func, insert, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.db import engine
+from app.models.schema_versions import SchemaVersion
+
+BATCH_SIZE = 500
+PAUSE_SECONDS = 0.05
+MIGRATIONS_PACKAGE = "app.migrations"
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+_versions = SchemaVersion.__table__
+
+logger = logging.getLogger(__name__)
+
+
+def _row_count(conn: Connection, table: str) -> int:
+    if not inspect(conn).has_table(table):
+        return 0
+    return conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    """ALTER TABLE ... ADD COLUMN. SQLite only rewrites the schema, never the rows."""
+    table: str
+    column: str
+    definition: str  # type and constraints, e.g. "VARCHAR(255)"
+
+    def sql(self) -> str:
+        return f"ALTER TABLE {self.table} ADD COLUMN {self.column} {self.definition}"
+
+    def is_pending(self, conn: Connection) -> bool:
+        inspector = inspect(conn)
+        return inspector.has_table(self.table) and self.column not in {
+            column["name"] for column in inspector.get_columns(self.table)
+        }
+
+    def estimate_rows(self, conn: Connection) -> int:
+        return 0
+
+
+@dataclass(frozen=True)
+class CreateIndex:
+    """CREATE INDEX. Reads every row of the table while holding the write lock."""
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    unique: bool = False
+
+    def sql(self) -> str:
+        unique = "UNIQUE " if self.unique else ""
+        return f"CREATE {unique}INDEX IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    def is_pending(self, conn: Connection) -> bool:
+        inspector = inspect(conn)
+        return inspector.has_table(self.table) and self.name not in {
+            index["name"] for index in inspector.get_indexes(self.table)
+        }
+
+    def estimate_rows(self, conn: Connection) -> int:
+        return _row_count(conn, self.table)
+
+
+@dataclass(frozen=True)
+class DropIndex:
+    name: str
+    table: str
+
+    def sql(self) -> str:
+        return f"DROP INDEX IF EXISTS {self.name}"
+
+    def is_pending(self, conn: Connection) -> bool:
+        inspector = inspect(conn)
+        return inspector.has_table(self.table) and self.name in {
+            index["name"] for index in inspector.get_indexes(self.table)
+        }
+
+    def estimate_rows(self, conn: Connection) -> int:
+        return 0
+
+
+@dataclass(frozen=True)
+class ExecuteSql:
+    """Any other statement. It always runs (once, with its migration), so make it idempotent."""
+    statement: str
+    table: Optional[str] = None  # the table it rewrites, for the dry-run estimate
+
+    def sql(self) -> str:
+        return " ".join(self.statement.split())
+
+    def is_pending(self, conn: Connection) -> bool:
+        return True
+
+    def estimate_rows(self, conn: Connection) -> int:
+        return _row_count(conn, self.table) if self.table else 0
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """
+    A data migration over one table, walked in id order.
+
+    Args:
+        table: Table with an integer id primary key
+        columns: Columns apply() reads, besides id
+        pending: SQL condition for the rows that still need migrating
+        apply: apply(conn, rows) migrates one chunk of (id, *columns) rows and
+            returns how many it changed; the others are reported as skipped
+        finish: Run once, in the transaction that completes the backfill
+        after_commit: after_commit(bind, rows) runs once a chunk has committed,
+            for changes outside the database (deleting files the chunk moved)
+    """
+    table: str
+    columns: tuple[str, ...]
+    pending: str
+    apply: Callable[[Connection, Sequence], int]
+    finish: Optional[Callable[[Connection], None]] = None
+    after_commit: Optional[Callable[[Engine, Sequence], None]] = None
+
+    def chunk(self, conn: Connection, after: int, limit: int) -> list:
+        return conn.execute(
+            text(
+                f"SELECT id, {', '.join(self.columns)} FROM {self.table} "
+                f"WHERE id > :after AND ({self.pending}) ORDER BY id LIMIT :limit"
+            ),
+            {"after": after, "limit": limit},
+        ).all()
+
+    def estimate_rows(self, conn: Connection, after: int, exact: bool) -> int:
+        """Rows left after the checkpoint: those still pending, or all of them when
+        the pending condition needs columns the schema steps have yet to add."""
+        if not inspect(conn).has_table(self.table):
+            return 0
+        condition = f" AND ({self.pending})" if exact else ""
+        return conn.execute(
+            text(f"SELECT count(*) FROM {self.table} WHERE id > :after{condition}"), {"after": after}
+        ).scalar()
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    steps: tuple = ()
+    backfill: Optional[Backfill] = None
+
+
+@lru_cache(maxsize=None)
+def load_migrations() -> tuple[Migration, ...]:
+    """
+    Every migration module, in version order.
+
+    Raises:
+        RuntimeError: If the versions are not 1, 2, 3... without gaps or duplicates
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{module_info.name}")
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            name=match.group(2),
+            description=(module.__doc__ or "").strip().split("\n", 1)[0],
+            steps=tuple(getattr(module, "STEPS", ())),
+            backfill=getattr(module, "BACKFILL", None),
+        ))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions must be 1, 2, 3... without gaps or duplicates, got {versions}")
+    return tuple(migrations)
+
+
+def latest_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def _recorded(conn: Connection) -> dict:
+    if not inspect(conn).has_table(_versions.name):
+        return {}
+    return {row.version: row for row in conn.execute(select(_versions))}
+
+
+def applied_version(bind: Engine = engine) -> int:
+    """The highest version whose schema steps are applied (0 for a new database)."""
+    with bind.connect() as conn:
+        if not inspect(conn).has_table(_versions.name):
+            return 0
+        return conn.execute(
+            select(func.max(_versions.c.version)).where(_versions.c.applied_at.is_not(None))
+        ).scalar() or 0
+
+
+def apply_schema_steps(bind: Engine = engine) -> list[Migration]:
+    """
+    Run the steps of every migration not applied yet, each migration in one
+    transaction. The schema_versions table must exist (create_all).
+
+    Returns:
+        list[Migration]: The migrations applied
+    """
+    applied = []
+    for migration in load_migrations():
+        # BEGIN IMMEDIATE: processes preparing at the same time take turns
+        with bind.begin() as conn:
+            row = conn.execute(select(_versions).where(_versions.c.version == migration.version)).first()
+            if row is not None and row.applied_at is not None:
+                continue
+            for step in migration.steps:
+                if step.is_pending(conn):
+                    conn.exec_driver_sql(step.sql())
+            now = datetime.utcnow()
+            values = {"name": migration.name, "applied_at": now, "backfilled_at": None if migration.backfill else now}
+            if row is None:
+                conn.execute(insert(_versions).values(version=migration.version, **values))
+            else:
+                conn.execute(update(_versions).where(_versions.c.version == migration.version).values(**values))
+        logger.info("Applied migration %04d %s", migration.version, migration.name)
+        applied.append(migration)
+    return applied
+
+
+def pending_backfills(bind: Engine = engine) -> list[Migration]:
+    """Applied migrations whose backfill has not finished."""
+    with bind.connect() as conn:
+        recorded = _recorded(conn)
+    return [
+        migration for migration in load_migrations()
+        if migration.backfill is not None
+        and migration.version in recorded
+        and recorded[migration.version].applied_at is not None
+        and recorded[migration.version].backfilled_at is None
+    ]
+
+
+def run_backfill(
+    migration: Migration, bind: Engine = engine, batch_size: int = BATCH_SIZE, pause: float = PAUSE_SECONDS,
+) -> dict:
+    """
+    Run (or resume) one migration's backfill to the end, a chunk per transaction.
+
+    Returns:
+        dict: Rows changed and skipped, chunks and seconds taken by this run
+    """
+    backfill = migration.backfill
+    stats = {"version": migration.version, "name": migration.name, "rows": 0, "skipped": 0, "chunks": 0}
+    started = time.perf_counter()
+    by_version = _versions.c.version == migration.version
+    while True:
+        # Checkpoint, rows and new checkpoint in one write transaction: two
+        # processes running the same backfill take turns instead of repeating work
+        with bind.begin() as conn:
+            state = conn.execute(select(_versions.c.checkpoint, _versions.c.backfilled_at).where(by_version)).one()
+            if state.backfilled_at is not None:
+                break
+            rows = backfill.chunk(conn, state.checkpoint, batch_size)
+            if not rows:
+                if backfill.finish is not None:
+                    backfill.finish(conn)
+                conn.execute(update(_versions).where(by_version).values(backfilled_at=datetime.utcnow()))
+                break
+            changed = backfill.apply(conn, rows)
+            conn.execute(update(_versions).where(by_version).values(
+                checkpoint=rows[-1][0], backfilled_rows=_versions.c.backfilled_rows + changed,
+            ))
+        if backfill.after_commit is not None:
+            backfill.after_commit(bind, rows)
+        stats["rows"] += changed
+        stats["skipped"] += len(rows) - changed
+        stats["chunks"] += 1
+        if pause:
+            time.sleep(pause)
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def run_backfills(bind: Engine = engine, batch_size: int = BATCH_SIZE, pause: float = PAUSE_SECONDS) -> list[dict]:
+    return [run_backfill(migration, bind, batch_size, pause) for migration in pending_backfills(bind)]
+
+
+def run_backfills_in_background() -> None:
+    """Startup hook target: finish open backfills without delaying startup, logging the outcome."""
+    try:
+        for stats in run_backfills():
+            logger.info("Backfill %04d %s finished: %s", stats["version"], stats["name"], stats)
+    except Exception:
+        logger.exception("Backfill failed; it resumes from its checkpoint on the next start")
+
+
+def plan(bind: Engine = engine) -> list[dict]:
+    """
+    What apply_schema_steps() and run_backfills() would do, changing nothing.
+
+    Returns:
+        list[dict]: Per unfinished migration: version, name, description, the
+            pending steps ({"sql", "rows"}) and the backfill ({"table", "rows",
+            "exact", "checkpoint"}, or None)
+    """
+    report = []
+    with bind.connect() as conn:
+        recorded = _recorded(conn)
+        for migration in load_migrations():
+            row = recorded.get(migration.version)
+            if row is not None and row.backfilled_at is not None:
+                continue
+            steps = []
+            if row is None or row.applied_at is None:
+                steps = [step for step in migration.steps if step.is_pending(conn)]
+            backfill = None
+            if migration.backfill is not None:
+                checkpoint = row.checkpoint if row is not None else 0
+                # The pending condition may read the very columns the steps are yet to add
+                exact = not any(isinstance(step, AddColumn) and step.table == migration.backfill.table for step in steps)
+                backfill = {
+                    "table": migration.backfill.table,
+                    "rows": migration.backfill.estimate_rows(conn, checkpoint, exact),
+                    "exact": exact,
+                    "checkpoint": checkpoint,
+                }
+            report.append({
+                "version": migration.version,
+                "name": migration.name,
+                "description": migration.description,
+                "steps": [{"sql": step.sql(), "rows": step.estimate_rows(conn)} for step in steps],
+                "backfill": backfill,
+            })
+    return report
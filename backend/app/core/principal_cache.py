@@ -0,0 +1,99 @@
+"""
+In-process cache of authenticated principals, keyed by user id.
+
+get_current_user used to run `db.get(User, id)` on every authenticated
+request. The cache keeps a plain snapshot of the user's columns (never a
+session-bound ORM object) for PRINCIPAL_CACHE_TTL_SECONDS, bounded to
+PRINCIPAL_CACHE_MAX_SIZE entries with LRU eviction.
+
+Writers that change a user must call `principal_cache.invalidate(user_id)`
+after committing. A per-user generation counter makes sure a lookup that
+raced with the invalidation cannot put the stale row back.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.users import User
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+_CACHED_FIELDS = ("id", "full_name", "email", "is_admin", "google_id", "profile_picture")
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple[float, dict]]" = OrderedDict()
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[User]:
+        """A fresh, detached User built from the cached snapshot, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            snapshot = entry[1]
+        return User(**snapshot)
+
+    def put(self, user: User, generation: int) -> None:
+        """
+        Cache a user loaded from the DB. `generation` must be read with
+        generation() *before* the DB lookup; if the user was invalidated
+        since, the (possibly stale) row is not cached.
+        """
+        snapshot = {field: getattr(user, field) for field in _CACHED_FIELDS}
+        with self._lock:
+            if self._generations.get(user.id, 0) != generation:
+                return
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
@@ -0,0 +1,191 @@
+"""
+SQLite query plan checks, for catching full scans and N+1 patterns early.
+
+An index that stops matching a query (a new filter, a changed ORDER BY) does
+not fail anything: SQLite falls back to scanning the table and sorting it in
+a temp B-tree, which is unnoticeable on a dev database and slow on a real
+one. These helpers make the regression visible:
+
+    assert_query_plan_uses_index(db, appointments_repo.list_all, db, limit=50,
+                                 index="ix_appt_scheduled")
+
+runs the call, EXPLAINs every SELECT it issued and fails on a full table
+scan or a temp B-tree sort, and optionally on an index that is never used.
+
+    with query_budget(3):
+        client.get("/api/v1/appointments", headers=auth)
+
+fails when the block runs more statements than budgeted, listing them, so a
+loop that lazy-loads one row per item shows up as soon as it is introduced.
+
+The slow-query log (app.core.slow_queries) uses explain_query_plan() too.
+"""
+import re
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# "SCAN appointments" (no index) as opposed to "SCAN appointments USING INDEX ..."
+# or "SEARCH ...". Subqueries, CTEs and virtual tables (FTS) are not table scans.
+_FULL_SCAN = re.compile(r"^SCAN (?!\(|CONSTANT ROW)(\S+)$")
+_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)$")
+_TEMP_SORT = re.compile(r"^USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+@dataclass(frozen=True)
+class CapturedQuery:
+    statement: str
+    parameters: Any
+    executemany: bool
+
+
+def is_explainable(statement: str) -> bool:
+    return statement.lstrip().upper().startswith(_EXPLAINABLE)
+
+
+def explain_query_plan(dbapi_connection, statement: str, parameters: Any = ()) -> list[str]:
+    """
+    SQLite's EXPLAIN QUERY PLAN for a statement, one line per plan step,
+    indented by depth ("SEARCH appointments USING INDEX ix_appt_scheduled (...)").
+
+    Args:
+        dbapi_connection: Raw sqlite3 connection (e.g. cursor.connection in an engine hook)
+        statement: SQL as sent to the driver
+        parameters: Its bound parameters (the first set, for executemany)
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    # Rows are (id, parent, notused, detail); nest by parent for readability
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def plan_problems(
+    plan: Sequence[str], allow_temp_sort: bool = False, allow_scans: Sequence[str] = (),
+) -> list[str]:
+    """The plan lines that are full table scans (and temp B-tree sorts, unless allowed)."""
+    # Reading back a subquery's rows ("SCAN anon_1") is not a table scan
+    subqueries = {match.group(1) for match in map(_SUBQUERY.match, (line.strip() for line in plan)) if match}
+    problems = []
+    for line in plan:
+        step = line.strip()
+        scan = _FULL_SCAN.match(step)
+        if scan and scan.group(1) not in subqueries and scan.group(1) not in allow_scans:
+            problems.append(step)
+        elif not allow_temp_sort and _TEMP_SORT.match(step):
+            problems.append(step)
+    return problems
+
+
+@contextmanager
+def captured_queries(bind: Engine, into: Optional[list] = None) -> Iterator[list[CapturedQuery]]:
+    """
+    Record every statement sent through bind inside the block (from any
+    thread, so calls made through run_db are included).
+    """
+    captured: list[CapturedQuery] = into if into is not None else []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(CapturedQuery(statement, parameters, executemany))
+
+    event.listen(bind, "before_cursor_execute", _capture)
+    try:
+        yield captured
+    finally:
+        event.remove(bind, "before_cursor_execute", _capture)
+
+
+def assert_query_plan_uses_index(
+    db: Session,
+    fn: Callable,
+    *args,
+    index: Optional[str] = None,
+    allow_temp_sort: bool = False,
+    allow_scans: Sequence[str] = (),
+    **kwargs,
+):
+    """
+    Call fn(*args, **kwargs) and check the plan of every SELECT it ran on
+    db's engine.
+
+    Args:
+        db: Session whose engine to watch (and to run EXPLAIN on)
+        fn: The code under test, typically a repository function
+        index: Index name that at least one of the plans must use
+        allow_temp_sort: Accept USE TEMP B-TREE (for queries that sort few rows by design)
+        allow_scans: Tables that may be read in full (small rollups, by design)
+
+    Returns:
+        Whatever fn returned
+
+    Raises:
+        AssertionError: On a full table scan, a temp B-tree sort, a missing
+            index, or if fn ran no SELECT at all
+    """
+    bind = db.get_bind()
+    with captured_queries(bind) as captured:
+        result = fn(*args, **kwargs)
+
+    selects = [query for query in captured if query.statement.lstrip().upper().startswith(("SELECT", "WITH"))]
+    if not selects:
+        raise AssertionError(f"{getattr(fn, '__name__', fn)} ran no SELECT")
+
+    failures = []
+    used_index = index is None
+    dbapi_connection = db.connection().connection.dbapi_connection
+    for query in selects:
+        parameters = query.parameters[0] if query.executemany else query.parameters
+        plan = explain_query_plan(dbapi_connection, query.statement, parameters)
+        used_index = used_index or any(f"INDEX {index} " in f"{line} " for line in plan)
+        problems = plan_problems(plan, allow_temp_sort, allow_scans)
+        if problems:
+            failures.append(f"{', '.join(problems)} in:\n  {' '.join(query.statement.split())}\n  plan:\n    "
+                            + "\n    ".join(plan))
+    if not used_index:
+        failures.append(f"no plan uses index {index}")
+    if failures:
+        raise AssertionError(f"{getattr(fn, '__name__', fn)}: " + "\n".join(failures))
+    return result
+
+
+@contextmanager
+def query_budget(max_queries: int, binds: Optional[Sequence[Engine]] = None) -> Iterator[list[CapturedQuery]]:
+    """
+    Fail if the block runs more than max_queries SQL statements (transaction
+    control like BEGIN is not counted). Counts every thread's statements on
+    the engines, so keep other traffic off them while it runs.
+
+    Args:
+        max_queries: Statements allowed
+        binds: Engines to watch; default both the write and the read engine
+
+    Raises:
+        AssertionError: Listing the statements, when over budget
+    """
+    if binds is None:
+        from app.core.db import engine, read_engine
+        binds = (engine,) if read_engine is engine else (engine, read_engine)
+
+    captured: list[CapturedQuery] = []
+    with ExitStack() as stack:
+        for bind in binds:
+            stack.enter_context(captured_queries(bind, into=captured))
+        yield captured
+
+    counted = [query for query in captured if is_explainable(query.statement)]
+    if len(counted) > max_queries:
+        listing = "\n".join(f"  {' '.join(query.statement.split())[:200]}" for query in counted)
+        raise AssertionError(f"{len(counted)} queries, budget {max_queries}:\n{listing}")
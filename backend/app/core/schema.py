@@ -0,0 +1,128 @@
+"""
+Schema setup, done once per deploy instead of in every worker.
+
+prepare() creates missing tables, applies the pending migrations'
+schema steps (app.core.migrations), adds missing columns and indexes,
+installs the search index and version-tracking triggers, backfills the
+rollups, seeds the dev admin and finally runs the migrations' data
+backfills. It is idempotent; `python -m app.prepare` runs it.
+
+Worker startup only calls ensure_schema(), which just reads the applied
+migration version (and looks up the search index) when the database is
+current. A database behind this build is prepared in-process if
+SCHEMA_AUTO_PREPARE is true (the default, so a fresh checkout just runs);
+its backfills are then left to the background. Deploys set it to false and
+run the prepare step before starting workers: a forgotten step then fails
+the boot loudly instead of every worker racing through DDL and bcrypt.
+"""
+import logging
+import os
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.core import migrations
+from app.core.db import Base, SessionLocal, add_missing_columns, create_missing_indexes, engine
+from app.core.search_index import detect_search_index, ensure_search_index
+from app.core.versions import ensure_version_tracking
+from app.models import (  # noqa: F401  (registers every table on Base.metadata)
+    appointment_stats, appointments, patients, payment_proofs, schema_versions, slot_occupancy, table_versions,
+    users,
+)
+from app.repositories import appointment_stats_repo, availability_repo
+from app.startup_seed import ensure_default_admin
+
+# The newest migration in app/migrations: workers refuse to run against a
+# database whose schema steps have not been applied up to it.
+SCHEMA_VERSION = migrations.latest_version()
+SCHEMA_AUTO_PREPARE = os.getenv("SCHEMA_AUTO_PREPARE", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def schema_version(bind: Engine = engine) -> int:
+    """The latest migration applied to the database (0 if never prepared)."""
+    return migrations.applied_version(bind)
+
+
+def prepare(
+    bind: Engine = engine,
+    backfill: bool = True,
+    batch_size: int = migrations.BATCH_SIZE,
+    pause: float = migrations.PAUSE_SECONDS,
+) -> dict:
+    """
+    Bring the database up to SCHEMA_VERSION and seed it. Safe to re-run.
+
+    Args:
+        backfill: Also run the migrations' data backfills to the end (else
+            the workers finish them in the background)
+        batch_size, pause: Backfill rows per transaction and seconds between them
+
+    Returns:
+        dict: "migrations" applied, "columns" added outside them and "backfills" run
+    """
+    Base.metadata.create_all(bind=bind)
+    applied = migrations.apply_schema_steps(bind)
+    added = add_missing_columns(bind)
+    create_missing_indexes(bind)
+    ensure_search_index(bind)
+    ensure_version_tracking(bind)
+
+    db = SessionLocal(bind=bind)
+    try:
+        appointment_stats_repo.ensure_backfilled(db)
+        availability_repo.ensure_backfilled(db)
+    finally:
+        db.close()
+    ensure_default_admin()
+
+    backfills = migrations.run_backfills(bind, batch_size, pause) if backfill else []
+    return {
+        "migrations": [f"{migration.version:04d} {migration.name}" for migration in applied],
+        "columns": added,
+        "backfills": backfills,
+    }
+
+
+def plan(bind: Engine = engine) -> dict:
+    """
+    What prepare() would change, changing nothing: the tables create_all
+    would create and the unfinished migrations (see migrations.plan()).
+    """
+    with bind.connect() as conn:
+        existing = set(inspect(conn).get_table_names())
+    return {
+        "tables": [table.name for table in Base.metadata.sorted_tables if table.name not in existing],
+        "migrations": migrations.plan(bind),
+    }
+
+
+def ensure_schema(bind: Engine = engine, auto_prepare: bool = SCHEMA_AUTO_PREPARE) -> None:
+    """
+    Worker startup check: a few small reads (the applied version, and
+    whether the search index exists) when the database is current.
+
+    Raises:
+        SchemaOutOfDate: If it is not and auto_prepare is off, or if it was
+            prepared by a newer build
+    """
+    version = schema_version(bind)
+    if version == SCHEMA_VERSION:
+        detect_search_index(bind)
+        return
+    if version > SCHEMA_VERSION:
+        raise SchemaOutOfDate(
+            f"Database schema is version {version}, newer than this build's {SCHEMA_VERSION}"
+        )
+    if not auto_prepare:
+        raise SchemaOutOfDate(
+            f"Database schema is version {version}, this build needs {SCHEMA_VERSION}: "
+            "run `python -m app.prepare` before starting the workers"
+        )
+    logger.warning("Database schema is version %s, preparing it for version %s", version, SCHEMA_VERSION)
+    prepare(bind, backfill=False)
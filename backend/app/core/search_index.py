@@ -0,0 +1,174 @@
+"""
+Full-text search over patients and appointments (SQLite FTS5, trigram tokenizer).
+
+`full_name LIKE '%q%'` cannot use a B-tree index, so every keystroke in the
+admin search box scanned the whole patients table. The trigram tokenizer
+indexes every 3-character substring, which gives the same "contains"
+semantics (case-insensitive, prefix and infix) from an index lookup.
+
+One FTS table covers both sources so results can be ranked together. The
+FTS rowid encodes the source row, which keeps the sync triggers to rowid
+lookups:
+
+    patients.id     -> rowid = id * 2
+    appointments.id -> rowid = id * 2 + 1
+
+Triggers on both tables keep the index in step with every insert, update and
+delete, whichever code path (ORM, bulk insert, raw SQL) made the change.
+Queries shorter than MIN_QUERY_LENGTH characters cannot use trigrams; callers
+fall back to LIKE for those.
+"""
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+SEARCH_TABLE = "search_index"
+MIN_QUERY_LENGTH = 3
+
+KIND_PATIENT = "patient"
+KIND_APPOINTMENT = "appointment"
+_KIND_PARITY = {KIND_PATIENT: 0, KIND_APPOINTMENT: 1}
+
+# bm25 weights, in column order: a name match outranks one buried in a message
+RANK_FUNCTION = "bm25(10.0, 4.0, 4.0, 4.0, 1.0)"
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+    name, email, phone, reference, message,
+    tokenize = 'trigram'
+)
+"""
+
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS patients_search_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, phone) VALUES (new.id * 2, new.full_name, new.phone_number);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS patients_search_au AFTER UPDATE OF full_name, phone_number ON patients BEGIN
+        UPDATE {SEARCH_TABLE} SET name = new.full_name, phone = new.phone_number WHERE rowid = new.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS patients_search_ad AFTER DELETE ON patients BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS appointments_search_ai AFTER INSERT ON appointments BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, email, phone, reference, message)
+        VALUES (new.id * 2 + 1, new.full_name, new.email, new.phone, new.payment_reference, new.message);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS appointments_search_au
+    AFTER UPDATE OF full_name, email, phone, payment_reference, message ON appointments BEGIN
+        UPDATE {SEARCH_TABLE}
+        SET name = new.full_name, email = new.email, phone = new.phone,
+            reference = new.payment_reference, message = new.message
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS appointments_search_ad AFTER DELETE ON appointments BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+_enabled = False
+
+
+def is_enabled() -> bool:
+    """True once ensure_search_index() or detect_search_index() has found the index in this process."""
+    return _enabled
+
+
+def detect_search_index(bind: Engine) -> bool:
+    """
+    Worker startup: turn search on if the prepared database has the index,
+    without any DDL (ensure_search_index() runs in the prepare step).
+
+    Returns:
+        bool: Whether full-text search is available
+    """
+    global _enabled
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.connect() as conn:
+        _enabled = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first() is not None
+    return _enabled
+
+
+def ensure_search_index(bind: Engine) -> bool:
+    """
+    Create the FTS table and its triggers if missing, filling it from the
+    existing rows the first time. Safe to re-run (see app.core.schema.prepare).
+
+    Returns:
+        bool: Whether full-text search is available (False on non-SQLite databases)
+    """
+    global _enabled
+    if bind.dialect.name != "sqlite":
+        return False
+
+    with bind.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SEARCH_TABLE},
+        ).first()
+        if not exists:
+            conn.exec_driver_sql(_CREATE_TABLE)
+            conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', '{RANK_FUNCTION}')")
+            _populate(conn)
+        for trigger in _TRIGGERS:
+            conn.exec_driver_sql(trigger)
+
+    _enabled = True
+    return True
+
+
+def rebuild_search_index(bind: Engine) -> None:
+    """Drop every entry and re-index both tables (repair after out-of-band changes)."""
+    with bind.begin() as conn:
+        conn.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+        _populate(conn)
+
+
+def _populate(conn) -> None:
+    conn.exec_driver_sql(
+        f"INSERT INTO {SEARCH_TABLE}(rowid, name, phone) SELECT id * 2, full_name, phone_number FROM patients"
+    )
+    conn.exec_driver_sql(
+        f"""
+        INSERT INTO {SEARCH_TABLE}(rowid, name, email, phone, reference, message)
+        SELECT id * 2 + 1, full_name, email, phone, payment_reference, message FROM appointments
+        """
+    )
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: every word must appear
+    (as a substring), each quoted so FTS syntax characters are taken literally.
+
+    Returns None when no word is long enough to match trigrams.
+    """
+    terms = [word for word in query.split() if len(word) >= MIN_QUERY_LENGTH]
+    if not terms:
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def kind_parity(kind: str) -> int:
+    return _KIND_PARITY[kind]
+
+
+def decode_rowid(rowid: int) -> tuple[str, int]:
+    """(kind, source id) for an FTS rowid."""
+    return (KIND_APPOINTMENT if rowid % 2 else KIND_PATIENT), rowid // 2
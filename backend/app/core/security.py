@@ -1,9 +1,14 @@
-from passlib.context import CryptContext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+import asyncio
+import threading
 from jose import jwt
-from google.auth.transport import requests
-from google.oauth2 import id_token
+from starlette.concurrency import run_in_threadpool
+from app.core import metrics
 import os
+import time
 
 SECRET_KEY = "your_secret_key"
 ALGORITHM = "HS256"
@@ -11,6 +16,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 # Google OAuth Settings
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "your_google_client_id")
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+
+# passlib and the Google auth stack are imported on first use, not at startup:
+# a worker that never sees a sign-in never pays for them.
+@lru_cache(maxsize=None)
+def get_google_verifier():
+    from app.core.google_tokens import GoogleTokenVerifier
+    return GoogleTokenVerifier(GOOGLE_CERTS_URL, GOOGLE_CLIENT_ID)
 
 def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES) -> str:
     to_encode = data.copy()
@@ -19,27 +32,100 @@ def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_M
     jwt_token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return jwt_token
 
-pwd_context = CryptContext(schemes=["bcrypt", "pbkdf2_sha256", "sha256_crypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt", "pbkdf2_sha256", "sha256_crypt"], deprecated="auto")
+
+# Password hashing pool: bcrypt costs hundreds of ms of CPU per call, so it never runs on the event loop.
+# "thread" scales across cores because the bcrypt extension releases the GIL; "process" isolates it fully.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Calls allowed to wait for a worker before new ones are turned away (backpressure)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
+    return get_pwd_context().hash(plain)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
+
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Verify, and return a replacement hash if the stored one uses a deprecated scheme."""
+    return get_pwd_context().verify_and_update(plain, hashed)
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _timed(fn, *args):
+    # Runs in the pool worker (a module-level function, so process pools can pickle it)
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHashingPool:
+    """
+    Bounded executor for password hashing. At most `workers` hashes run at
+    once, up to `max_pending` more wait in the executor queue, and anything
+    beyond that fails fast with PasswordHasherBusy instead of piling up.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+            return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_pending:
+                raise PasswordHasherBusy("Too many sign-in attempts in progress, please retry shortly")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, seconds = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+            metrics.record_password_hash(fn.__name__, seconds)
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordHashingPool(PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+async def hash_password_async(plain: str) -> str:
+    return await password_pool.run(hash_password, plain)
+
+async def verify_and_update_password_async(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return await password_pool.run(verify_and_update_password, plain, hashed)
 
 def verify_google_token(token: str) -> dict:
     """
     Verify Google ID token and return user info
     """
     try:
-        # Verify the token
-        idinfo = id_token.verify_oauth2_token(
-            token, requests.Request(), GOOGLE_CLIENT_ID
-        )
-        
-        # Verify the issuer
-        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-            raise ValueError('Wrong issuer.')
+        # Verify the token locally against the cached Google certs (also checks the issuer)
+        idinfo = get_google_verifier().verify(token)
         
         return {
             'google_id': idinfo['sub'],
@@ -51,4 +137,8 @@ def verify_google_token(token: str) -> dict:
     except ValueError as e:
         raise ValueError(f"Invalid Google token: {str(e)}")
     except Exception as e:
-        raise ValueError(f"Token verification failed: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Token verification failed: {str(e)}")
+
+async def verify_google_token_async(token: str) -> dict:
+    """verify_google_token off the event loop (cert fetch + RSA verification)."""
+    return await run_in_threadpool(verify_google_token, token)
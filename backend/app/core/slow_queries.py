@@ -0,0 +1,105 @@
+"""
+Slow-query log.
+
+Every SQL statement slower than SLOW_QUERY_MS is written to SLOW_QUERY_LOG
+(rotated at SLOW_QUERY_LOG_MAX_BYTES, SLOW_QUERY_LOG_BACKUPS files kept) as
+one JSON object per line:
+
+    {"at": "...", "ms": 412.7, "request": "GET /api/v1/patients",
+     "sql": "SELECT ... WHERE patients.full_name LIKE ? ...",
+     "params": ["str", "int"], "plan": ["SCAN patients", "USE TEMP B-TREE FOR ORDER BY"]}
+
+Parameters are logged by type only ("params" is their shape; executemany
+shows the row count and the first row's shape), so patient data never ends
+up in the log. The plan comes from EXPLAIN QUERY PLAN on the same connection
+right after the statement ran; it is captured once per distinct statement
+text, so a hot slow query is not explained on every execution.
+
+The time is that of the driver's execute() call. With SQLite that covers
+everything up to the first row, including any sort, which is where scans
+plus temp B-tree sorts spend their time. Rows fetched later are not
+included. SLOW_QUERY_MS=0 logs every statement (handy in development); a
+negative value turns the log off.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+from app.core import metrics
+from app.core.query_plans import explain_query_plan, is_explainable
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+ENABLED = SLOW_QUERY_MS >= 0
+PLAN_CACHE_SIZE = 256
+
+logger = logging.getLogger("app.slow_queries")
+logger.propagate = False
+if ENABLED:
+    # delay=True: the file is only created once there is something to write
+    _handler = RotatingFileHandler(
+        SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_MAX_BYTES, backupCount=SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8", delay=True,
+    )
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.WARNING)
+
+_plans: "OrderedDict[str, list[str]]" = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def is_slow(seconds: float) -> bool:
+    return ENABLED and seconds * 1000 >= SLOW_QUERY_MS
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Bound parameters with every value replaced by its type name."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def _plan_for(dbapi_connection, statement: str, parameters: Any, executemany: bool) -> Optional[list[str]]:
+    if not SLOW_QUERY_EXPLAIN or not is_explainable(statement):
+        return None
+    with _plans_lock:
+        plan = _plans.get(statement)
+        if plan is not None:
+            _plans.move_to_end(statement)
+            return plan
+    try:
+        plan = explain_query_plan(dbapi_connection, statement, parameters[0] if executemany else parameters)
+    except Exception as exc:  # never fail the query being logged
+        return [f"(EXPLAIN failed: {exc})"]
+    with _plans_lock:
+        _plans[statement] = plan
+        if len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def record(dbapi_connection, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+    """Log one slow statement (called from the engine hooks in app.core.db)."""
+    metrics.slow_queries.inc(1)
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "ms": round(seconds * 1000, 1),
+        "request": metrics.current_request(),
+        "sql": " ".join(statement.split()),
+        "params": parameter_shape(parameters, executemany),
+        "plan": _plan_for(dbapi_connection, statement, parameters, executemany),
+    }
+    logger.warning(json.dumps(entry))
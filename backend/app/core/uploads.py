@@ -0,0 +1,193 @@
+"""
+Streaming upload helpers for payment proofs.
+
+Files are copied from the (already spooled) UploadFile in fixed-size chunks,
+each disk write runs in the threadpool, the SHA-256 is computed on the fly and
+the data lands in a fsynced temp file that the caller atomically renames into
+place (see app.core.blobstore). Oversized or non-allowlisted files are removed
+before anything else sees them.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+PAYMENT_PROOF_MAX_BYTES = int(os.getenv("PAYMENT_PROOF_MAX_BYTES", str(10 * 1024 * 1024)))  # 10 MiB
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+# Allowance for the other form fields and multipart boundaries on top of the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# content type -> (canonical extension, magic-byte check)
+ALLOWED_TYPES = {
+    "image/jpeg": (".jpg", lambda head: head.startswith(b"\xff\xd8\xff")),
+    "image/png": (".png", lambda head: head.startswith(b"\x89PNG\r\n\x1a\n")),
+    "image/webp": (".webp", lambda head: head[:4] == b"RIFF" and head[8:12] == b"WEBP"),
+    "image/heic": (".heic", lambda head: head[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1")),
+    "application/pdf": (".pdf", lambda head: head.startswith(b"%PDF-")),
+}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UnsupportedUploadType(ValueError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+    content_type: str
+
+
+def detect_content_type(head: bytes, declared: Optional[str]) -> str:
+    """
+    Identify the file type from its leading bytes.
+
+    The declared Content-Type must be on the allowlist and agree with the
+    magic bytes; anything else is rejected.
+
+    Raises:
+        UnsupportedUploadType: If the type is not allowed or does not match the content
+    """
+    declared = (declared or "").split(";")[0].strip().lower()
+    if declared == "image/jpg":
+        declared = "image/jpeg"
+    if declared not in ALLOWED_TYPES:
+        raise UnsupportedUploadType(f"Unsupported file type: {declared or 'unknown'}")
+    _, matches = ALLOWED_TYPES[declared]
+    if not matches(head):
+        raise UnsupportedUploadType("File content does not match its declared type")
+    return declared
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Best-effort type detection from magic bytes alone (None if not an allowed type)."""
+    for content_type, (_, matches) in ALLOWED_TYPES.items():
+        if matches(head):
+            return content_type
+    return None
+
+
+def extension_for(content_type: str) -> str:
+    return ALLOWED_TYPES[content_type][0]
+
+
+def _open_temp(directory: Path) -> tuple[BinaryIO, str]:
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(fd, "wb"), temp_path
+
+
+def _finish(buffer: BinaryIO) -> None:
+    buffer.flush()
+    os.fsync(buffer.fileno())
+    buffer.close()
+
+
+def _discard(buffer: BinaryIO, temp_path: str) -> None:
+    buffer.close()
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def receive_upload(upload: UploadFile, temp_dir: Path, max_bytes: int = PAYMENT_PROOF_MAX_BYTES) -> StoredUpload:
+    """
+    Stream an uploaded file into a temp file under temp_dir.
+
+    Args:
+        upload: The incoming file
+        temp_dir: Directory for the temp file (created if missing); must be on
+            the same filesystem as the final location so os.replace is atomic
+        max_bytes: Hard size limit
+
+    Returns:
+        StoredUpload: Temp file path, size, SHA-256 hex digest and content type.
+        The caller owns the temp file and must rename or delete it.
+
+    Raises:
+        UploadTooLarge: If the file exceeds max_bytes
+        UnsupportedUploadType: If the file type is not on the allowlist
+    """
+    digest = hashlib.sha256()
+    size = 0
+    content_type: Optional[str] = None
+    buffer, temp_path = await run_in_threadpool(_open_temp, temp_dir)
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if content_type is None:
+                content_type = detect_content_type(chunk, upload.content_type)
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"File exceeds the {max_bytes / (1024 * 1024):.1f} MB limit")
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+
+        if content_type is None:
+            raise UnsupportedUploadType("Uploaded file is empty")
+
+        await run_in_threadpool(_finish, buffer)
+    except BaseException:
+        await run_in_threadpool(_discard, buffer, temp_path)
+        raise
+    finally:
+        metrics.upload_bytes.inc(size, "payment_proof")
+    return StoredUpload(path=Path(temp_path), size=size, sha256=digest.hexdigest(), content_type=content_type)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject oversized request bodies on selected routes before they are parsed.
+
+    A declared Content-Length above the limit gets a 413 without reading the
+    body at all; chunked bodies are counted as they arrive and cut off as soon
+    as they cross the limit, so the multipart parser never buffers them.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, paths: tuple[str, ...]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body_size:
+                response = JSONResponse({"detail": "Request body too large"}, status_code=413)
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised inside body parsing; FastAPI re-raises HTTPException as-is
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
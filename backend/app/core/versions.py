@@ -0,0 +1,53 @@
+"""
+Table change counters, the validators behind list ETags.
+
+A list's ETag must change whenever any row it could contain changes, and
+checking it must not touch the rows themselves. max(updated_at) plus a
+count needs an index scan and misses a delete paired with an insert. A
+counter bumped by triggers costs one extra row update per write and one
+primary-key read per check. Like the search index triggers, it catches
+every write path (ORM, bulk import, raw SQL).
+
+Counters start at the current time in microseconds rather than 0. A
+database that is recreated therefore never reuses the version (and ETag)
+of an older one that clients may still have cached.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.table_versions import TableVersion
+
+TRACKED_TABLES = ("appointments", "patients")
+
+_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {event} ON {table} BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+END
+"""
+
+
+def ensure_version_tracking(bind: Engine) -> None:
+    """Create the counters and their triggers if missing. Safe to re-run (see app.core.schema.prepare)."""
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        for table in TRACKED_TABLES:
+            conn.execute(
+                text("INSERT OR IGNORE INTO table_versions (name, version) VALUES (:name, :version)"),
+                {"name": table, "version": time.time_ns() // 1000},
+            )
+            for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+                conn.exec_driver_sql(_TRIGGER.format(table=table, suffix=suffix, event=event))
+
+
+def current_version(db: Session, table: str) -> Optional[int]:
+    """
+    The table's change counter, or None where it is not tracked (the
+    triggers are SQLite-only). Without a counter, changes go unnoticed, so
+    callers must not derive an ETag from it.
+    """
+    return db.scalar(select(TableVersion.version).where(TableVersion.name == table))
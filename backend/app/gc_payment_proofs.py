@@ -0,0 +1,23 @@
+"""
+Delete payment proof blobs that no appointment references any more
+
+Blobs are kept for a grace period after their last reference goes (see
+payment_proof_repo.collect_garbage), so run this periodically, e.g. from cron.
+
+Usage (from backend/):
+    python -m app.gc_payment_proofs
+"""
+from app.core.db import SessionLocal
+from app.repositories import payment_proof_repo
+
+
+def collect_garbage() -> int:
+    db = SessionLocal()
+    try:
+        return payment_proof_repo.collect_garbage(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(f"Removed {collect_garbage()} unreferenced blobs")
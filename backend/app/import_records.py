@@ -0,0 +1,62 @@
+"""
+Bulk import of patients or appointments from CSV or NDJSON files
+
+Same validation and batching as POST /api/v1/import/..., for files too big
+to upload comfortably (e.g. the legacy patient register). Exported files,
+gzipped or not, can be imported back as they are.
+
+Usage (from backend/):
+    python -m app.import_records patients legacy_patients.csv [--on-conflict skip|update]
+    python -m app.import_records appointments bookings.ndjson.gz [--batch-size 5000]
+"""
+import argparse
+
+from app.core.db import SessionLocal
+from app.core.imports import BATCH_ROWS, FORMATS, format_for, read_records, run_import
+from app.core.schema import ensure_schema
+from app.repositories import appointments_repo, patient_repo
+from app.schemas.imports import AppointmentImport
+from app.schemas.patients import PatientCreate
+
+
+def import_file(kind: str, path: str, fmt: str, on_conflict: str = "skip", batch_size: int = BATCH_ROWS) -> dict:
+    if kind == "patients":
+        schema = PatientCreate
+        writer = lambda db, batch: patient_repo.bulk_write(db, batch, on_conflict)  # noqa: E731
+    else:
+        schema, writer = AppointmentImport, appointments_repo.bulk_write
+
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as stream:
+            return run_import(db, read_records(stream, fmt), schema, writer, batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import patients or appointments")
+    parser.add_argument("kind", choices=["patients", "appointments"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file name")
+    parser.add_argument("--on-conflict", choices=patient_repo.ON_CONFLICT, default="skip",
+                        help="patients whose phone number is already on file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_ROWS, help="rows per executemany / transaction")
+    args = parser.parse_args()
+
+    fmt = args.format or format_for(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    ensure_schema()  # as the server would at startup
+    print(f"Importing {args.kind} from {args.path}...")
+    report = import_file(args.kind, args.path, fmt, args.on_conflict, args.batch_size)
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+    if report["failed"] > len(report["errors"]):
+        print(f"  ... and {report['failed'] - len(report['errors'])} more")
+    print(
+        f"Done: {report['processed']} rows, {report['inserted']} inserted, {report['updated']} updated, "
+        f"{report['skipped']} skipped, {report['failed']} failed in {report['seconds']:.1f}s "
+        f"({report['rows_per_second']:.0f} rows/s)"
+    )
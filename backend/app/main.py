@@ -1,13 +1,31 @@
+import threading
+
 from fastapi import FastAPI
 from app.api.v1.patients import router  as patient_router 
-from app.core.db import Base, engine
 from app.api.v1.auth import router as user_router
 from app.api.v1.appointments import router as appointment_router
 from app.api.v1.admin import router as admin_router
+from app.api.v1.meta import router as meta_router
+from app.api.v1.search import router as search_router
+from app.api.v1.availability import router as availability_router
+from app.api.v1.export import router as export_router
+from app.api.v1.imports import router as import_router
 from fastapi.middleware.cors import CORSMiddleware
-from app.startup_seed import ensure_default_admin
+from app.core.security import password_pool
+from app.core.events import appointment_events
+from app.core.uploads import BodySizeLimitMiddleware, PAYMENT_PROOF_MAX_BYTES, FORM_OVERHEAD_BYTES
+from app.core import metrics, migrations, schema
+from app.core.serialization import TimedJSONResponse
+
+app = FastAPI(title="Clinic Management System", version="1.0.0", default_response_class=TimedJSONResponse)
 
-app = FastAPI(title="Clinic Management System", version="1.0.0")
+# Reject oversized booking forms before the multipart parser buffers them.
+# Added before CORS so CORS stays outermost and the 413 still carries CORS headers.
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=PAYMENT_PROOF_MAX_BYTES + FORM_OVERHEAD_BYTES,
+    paths=("/api/v1/appointments",),
+)
 
 origins = [
     "http://localhost:5173",
@@ -22,13 +40,36 @@ app.add_middleware(
     allow_headers=["*"],             # or include specific: ["Authorization","Content-Type"]
 )
 
-Base.metadata.create_all(bind=engine)
+# Outermost, so request latency covers the other middleware too
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
+# Schema creation, rollup backfills and admin seeding run in `python -m app.prepare`
+# (once per deploy); workers only check the schema version here.
 @app.on_event("startup")
-def _seed_dev_admin():
-    ensure_default_admin()
+def _check_schema():
+    schema.ensure_schema()
+
+@app.on_event("startup")
+def _resume_backfills():
+    # Migration backfills the prepare step left open: finish them in batches without delaying startup
+    if migrations.pending_backfills():
+        threading.Thread(target=migrations.run_backfills_in_background, name="migration-backfill", daemon=True).start()
+
+@app.on_event("shutdown")
+def _stop_password_pool():
+    password_pool.shutdown()
+
+@app.on_event("shutdown")
+def _close_event_streams():
+    appointment_events.close_all()
     
 app.router.include_router(patient_router)
 app.router.include_router(user_router)
 app.router.include_router(appointment_router)
-app.include_router(admin_router)
\ No newline at end of file
+app.include_router(admin_router)
+app.include_router(meta_router)
+app.include_router(search_router)
+app.include_router(availability_router)
+app.include_router(export_router)
+app.include_router(import_router)
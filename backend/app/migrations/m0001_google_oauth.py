@@ -0,0 +1,18 @@
+"""
+Google sign-in columns on users (formerly app/add_google_oauth_migration.py).
+
+The old script also created idx_users_google_id_unique, idx_users_google_id
+and idx_users_email next to the model's ix_users_google_id and
+ix_users_email, so every user write maintained the same keys twice. They
+are dropped once the model's unique index is in place.
+"""
+from app.core.migrations import AddColumn, CreateIndex, DropIndex
+
+STEPS = [
+    AddColumn("users", "google_id", "VARCHAR(255)"),
+    AddColumn("users", "profile_picture", "VARCHAR(500)"),
+    CreateIndex("ix_users_google_id", "users", ("google_id",), unique=True),
+    DropIndex("idx_users_google_id_unique", "users"),
+    DropIndex("idx_users_google_id", "users"),
+    DropIndex("idx_users_email", "users"),
+]
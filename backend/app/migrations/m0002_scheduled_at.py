@@ -0,0 +1,64 @@
+"""
+Appointment schedule backfill (formerly app/migrate_scheduled_at.py).
+
+Fills scheduled_at (naive UTC) and scheduled_date (clinic-local day) from
+the preferred_date and preferred_time strings for rows created before those
+columns existed. Rows whose strings do not parse stay NULL (they sort last
+in every list) and are reported as skipped. Once no row lacks a schedule,
+the indexes on the string columns that the scheduled ones replace are
+dropped.
+"""
+import logging
+from datetime import datetime
+
+from app.core.availability import scheduled_at_for
+from app.core.migrations import AddColumn, Backfill
+from app.models.appointments import ClinicType
+
+logger = logging.getLogger(__name__)
+
+# Indexes on the string columns, superseded by the scheduled_at / scheduled_date ones
+SUPERSEDED_INDEXES = ("ix_appt_date_clinic", "ix_appt_user_schedule", "ix_appt_email_schedule")
+
+STEPS = [
+    AddColumn("appointments", "scheduled_at", "DATETIME"),
+    AddColumn("appointments", "scheduled_date", "DATE"),
+]
+
+
+def _fill_schedules(conn, rows) -> int:
+    now = datetime.utcnow().isoformat(" ", "microseconds")
+    updates = []
+    for appointment_id, clinic, preferred_date, preferred_time in rows:
+        try:
+            # clinic holds the enum member's name, as SQLAlchemy stores it
+            scheduled_at, scheduled_date = scheduled_at_for(ClinicType[clinic], preferred_date, preferred_time)
+        except (KeyError, ValueError):
+            continue
+        # In the text format SQLAlchemy's SQLite DateTime and Date types use
+        updates.append((scheduled_at.isoformat(" ", "microseconds"), scheduled_date.isoformat(), now, appointment_id))
+    if updates:
+        # scheduled_at is part of AppointmentRead: a new updated_at changes the
+        # detail ETag, so clients holding the NULL version fetch the filled one
+        conn.exec_driver_sql(
+            "UPDATE appointments SET scheduled_at = ?, scheduled_date = ?, updated_at = ? WHERE id = ?", updates
+        )
+    return len(updates)
+
+
+def _drop_superseded_indexes(conn) -> None:
+    unparseable = conn.exec_driver_sql("SELECT count(*) FROM appointments WHERE scheduled_at IS NULL").scalar()
+    if unparseable:
+        logger.warning("%s appointments have no parseable schedule; keeping %s", unparseable, SUPERSEDED_INDEXES)
+        return
+    for name in SUPERSEDED_INDEXES:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+BACKFILL = Backfill(
+    table="appointments",
+    columns=("clinic", "preferred_date", "preferred_time"),
+    pending="scheduled_at IS NULL",
+    apply=_fill_schedules,
+    finish=_drop_superseded_indexes,
+)
@@ -0,0 +1,82 @@
+"""
+Payment proof blob store backfill (formerly app/migrate_payment_proofs.py).
+
+Moves legacy per-user proof files (uploads/payment_proofs/user_{id}/...) into
+the content-addressed blob store and points payment_proof at the blob;
+identical files collapse into one payment_proof_blobs row with a reference
+count. Rows whose file is missing keep their path and are reported as
+skipped. A legacy file is deleted only after the chunk that moved it has
+committed, and only if no appointment still points at it.
+"""
+import os
+from datetime import datetime
+from pathlib import Path
+
+from app.core import blobstore
+from app.core.migrations import Backfill
+from app.core.uploads import extension_for, sniff_content_type
+
+BLOB_PREFIX = f"{blobstore.BLOB_DIR}{os.sep}"
+
+STEPS = []
+
+
+def _describe(path: Path) -> tuple[str, str]:
+    """Content type and blob extension for a legacy file."""
+    with open(path, "rb") as f:
+        content_type = sniff_content_type(f.read(16))
+    if content_type:
+        return content_type, extension_for(content_type)
+    return "application/octet-stream", path.suffix.lower()
+
+
+def _move_proofs(conn, rows) -> int:
+    now = datetime.utcnow().isoformat(" ", "microseconds")
+    moved = 0
+    for appointment_id, payment_proof in rows:
+        src = Path(payment_proof)
+        if not src.is_file():
+            continue
+        sha256, size = blobstore.hash_file(src)
+        content_type, extension = _describe(src)
+        # The source stays in place until the chunk commits (see _delete_moved)
+        dest = str(blobstore.import_file(src, sha256, extension))
+        conn.exec_driver_sql(
+            """
+            INSERT INTO payment_proof_blobs (sha256, path, size, content_type, ref_count, created_at)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT (sha256) DO UPDATE SET ref_count = ref_count + 1, released_at = NULL
+            """,
+            (sha256, dest, size, content_type, now),
+        )
+        # A new updated_at changes the detail ETag, so cached copies of the old path revalidate
+        conn.exec_driver_sql(
+            "UPDATE appointments SET payment_proof = ?, updated_at = ? WHERE id = ?", (dest, now, appointment_id)
+        )
+        moved += 1
+    return moved
+
+
+def _delete_moved(bind, rows) -> None:
+    legacy = list({payment_proof for _, payment_proof in rows})
+    with bind.connect() as conn:
+        placeholders = ", ".join("?" * len(legacy))
+        still_used = {
+            path for (path,) in conn.exec_driver_sql(
+                f"SELECT payment_proof FROM appointments WHERE payment_proof IN ({placeholders})", tuple(legacy)
+            )
+        }
+    for path in legacy:
+        if path not in still_used:
+            Path(path).unlink(missing_ok=True)
+
+
+BACKFILL = Backfill(
+    table="appointments",
+    columns=("payment_proof",),
+    pending="payment_proof IS NOT NULL AND substr(payment_proof, 1, {length}) != '{prefix}'".format(
+        length=len(BLOB_PREFIX), prefix=BLOB_PREFIX.replace("'", "''"),
+    ),
+    apply=_move_proofs,
+    after_commit=_delete_moved,
+)
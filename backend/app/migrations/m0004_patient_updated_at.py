@@ -0,0 +1,12 @@
+"""
+Patient change timestamp for the detail ETag.
+
+patients.updated_at is set on every change from now on. Existing rows keep
+NULL until their next change (patient_repo.version_of stamps them ""), so
+there is nothing to backfill.
+"""
+from app.core.migrations import AddColumn
+
+STEPS = [
+    AddColumn("patients", "updated_at", "DATETIME"),
+]
@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, Enum as SQLEnum
+from app.core.db import Base
+from app.models.appointments import AppointmentStatus, ClinicType, ServiceType
+
+
+class AppointmentDailyStat(Base):
+    """
+    Rollup of appointment counts per day (preferred_date), status, clinic and
+    service. Kept current by appointments_repo.create/update/delete in the
+    same transaction as the appointment change.
+    """
+    __tablename__ = "appointment_daily_stats"
+
+    # Composite key with the day first, so date ranges are a primary-key range scan
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)  # YYYY-MM-DD
+    status: Mapped[AppointmentStatus] = mapped_column(SQLEnum(AppointmentStatus), primary_key=True)
+    clinic: Mapped[ClinicType] = mapped_column(SQLEnum(ClinicType), primary_key=True)
+    service_required: Mapped[ServiceType] = mapped_column(SQLEnum(ServiceType), primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
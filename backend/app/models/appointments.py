@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, Index, Enum as SQLEnum
+from sqlalchemy import Integer, String, Date, DateTime, Index, Enum as SQLEnum
 from app.core.db import Base
-from datetime import datetime
+from datetime import date, datetime
 import enum
 
 class ClinicType(str, enum.Enum):
@@ -36,6 +36,10 @@ class Appointment(Base):
     service_required: Mapped[ServiceType] = mapped_column(SQLEnum(ServiceType), nullable=False)
     preferred_date: Mapped[str] = mapped_column(String(10), nullable=False)  # YYYY-MM-DD format
     preferred_time: Mapped[str] = mapped_column(String(8), nullable=False)   # HH:MM format
+    # Normalized copies of the two fields above, used for sorting and range filters.
+    # Derived with availability.scheduled_at_for(); NULL until migration 0002 backfills old rows.
+    scheduled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # UTC
+    scheduled_date: Mapped[date | None] = mapped_column(Date, nullable=True)       # clinic-local day
     
     # Payment information
     payment_reference: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -52,6 +56,12 @@ class Appointment(Base):
 
     # Indexes for better query performance
     __table_args__ = (
-        Index("ix_appt_date_clinic", "preferred_date", "clinic"),
         Index("ix_appt_email_status", "email", "status"),
+        # Every list is ordered by (scheduled_at, id); these serve it without a sort step
+        Index("ix_appt_scheduled", "scheduled_at", "id"),
+        Index("ix_appt_status_scheduled", "status", "scheduled_at", "id"),
+        Index("ix_appt_day_clinic", "scheduled_date", "clinic"),
+        # "My appointments": each branch walks its index already in list order
+        Index("ix_appt_user_scheduled", "created_by_user_id", "scheduled_at", "id"),
+        Index("ix_appt_email_scheduled", "email", "scheduled_at", "id"),
     )
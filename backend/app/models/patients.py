@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Integer, String
 from app.core.db import Base
 
 class Patient(Base):
@@ -7,4 +7,4 @@ class Patient(Base):
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(120), index=True,nullable=False)
     phone_number = Column(String(11), index=True,nullable=False, unique=True)
-
+    updated_at = Column(DateTime, nullable=True)  # NULL for patients not changed since the column was added
@@ -0,0 +1,23 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, DateTime, Index
+from app.core.db import Base
+from datetime import datetime
+
+
+class PaymentProofBlob(Base):
+    """One stored payment proof file, shared by every appointment that uploaded the same bytes."""
+    __tablename__ = "payment_proof_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    path: Mapped[str] = mapped_column(String(500), nullable=False, unique=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Number of appointments whose payment_proof points at this blob
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    released_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # when ref_count last hit 0
+
+    __table_args__ = (
+        Index("ix_proof_blobs_unreferenced", "ref_count", "released_at"),
+    )
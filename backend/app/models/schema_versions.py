@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class SchemaVersion(Base):
+    """
+    One row per migration in app/migrations (see app.core.migrations).
+    applied_at is set once its schema steps ran; a data backfill then
+    advances checkpoint (the last id done) chunk by chunk until backfilled_at
+    is set.
+    """
+    __tablename__ = "schema_versions"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    applied_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    checkpoint: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    backfilled_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    backfilled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, String, Enum as SQLEnum
+from app.core.db import Base
+from app.models.appointments import ClinicType, ServiceType
+
+
+class SlotOccupancy(Base):
+    """
+    Number of active (not cancelled) bookings in one clinic slot for one
+    service. Only slots with bookings have a row; everything else is free.
+    """
+    __tablename__ = "slot_occupancy"
+
+    # Clinic and day lead the key, so a clinic's week is one primary-key range scan
+    clinic: Mapped[ClinicType] = mapped_column(SQLEnum(ClinicType), primary_key=True)
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)        # YYYY-MM-DD
+    slot_time: Mapped[str] = mapped_column(String(5), primary_key=True)   # HH:MM
+    service_required: Mapped[ServiceType] = mapped_column(SQLEnum(ServiceType), primary_key=True)
+
+    booked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
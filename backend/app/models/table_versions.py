@@ -0,0 +1,15 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, String
+from app.core.db import Base
+
+
+class TableVersion(Base):
+    """
+    A change counter per table, bumped by triggers on every insert, update
+    and delete (see app.core.versions). List endpoints build their ETags from
+    it, so revalidating a list reads one row instead of the table.
+    """
+    __tablename__ = "table_versions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
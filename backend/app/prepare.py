@@ -0,0 +1,75 @@
+"""
+Deploy step: migrate the schema and seed the database
+
+Run once per deploy, before starting the workers (which then only check the
+schema version; see app.core.schema). Migrations are in app/migrations (see
+app.core.migrations). Safe to stop and re-run: data backfills resume from
+their checkpoint.
+
+Usage (from backend/):
+    python -m app.prepare [--batch-size 500] [--pause 0.05]
+    python -m app.prepare --dry-run          # what would change, with estimated rows
+    python -m app.prepare --skip-backfills   # leave data backfills to the workers
+    python -m app.prepare --check            # exit 1 if the workers would refuse to start
+"""
+import argparse
+import sys
+import time
+
+from app.core import migrations
+from app.core.db import DATABASE_URL, engine
+from app.core.schema import SCHEMA_VERSION, plan, prepare, schema_version
+
+
+def print_plan(report: dict) -> None:
+    if not report["tables"] and not report["migrations"]:
+        print("Nothing to do")
+        return
+    if report["tables"]:
+        print(f"create tables: {', '.join(report['tables'])}")
+    for migration in report["migrations"]:
+        print(f"{migration['version']:04d} {migration['name']}: {migration['description']}")
+        for step in migration["steps"]:
+            print(f"  {step['sql']}  (~{step['rows']} rows)")
+        backfill = migration["backfill"]
+        if backfill is not None:
+            estimate = "" if backfill["exact"] else "at most "
+            print(f"  backfill {backfill['table']} after id {backfill['checkpoint']}: {estimate}{backfill['rows']} rows")
+    print("Dry run: nothing was changed. Rows are estimates; missing columns and indexes found outside "
+          "migrations are not listed.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true",
+                        help="only report the schema version; exit 1 if the database needs preparing")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change and exit")
+    parser.add_argument("--skip-backfills", action="store_true",
+                        help="apply schema steps only; workers run the backfills in the background")
+    parser.add_argument("--batch-size", type=int, default=migrations.BATCH_SIZE, help="backfill rows per transaction")
+    parser.add_argument("--pause", type=float, default=migrations.PAUSE_SECONDS,
+                        help="seconds to sleep between backfill transactions")
+    args = parser.parse_args()
+
+    version = schema_version(engine)
+    print(f"{DATABASE_URL}: schema version {version}, this build needs {SCHEMA_VERSION}")
+    if args.check:
+        sys.exit(0 if version == SCHEMA_VERSION else 1)
+    if args.dry_run:
+        print_plan(plan(engine))
+        return
+
+    started = time.perf_counter()
+    result = prepare(engine, backfill=not args.skip_backfills, batch_size=args.batch_size, pause=args.pause)
+    for migration in result["migrations"]:
+        print(f"  applied {migration}")
+    for column in result["columns"]:
+        print(f"  added column {column}")
+    for backfill in result["backfills"]:
+        print(f"  backfilled {backfill['version']:04d} {backfill['name']}: {backfill['rows']} rows, "
+              f"{backfill['skipped']} skipped, in {backfill['chunks']} chunks ({backfill['seconds']}s)")
+    print(f"Prepared for schema version {SCHEMA_VERSION} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Optional
+from collections import Counter
+
+from app.models.appointments import Appointment, AppointmentStatus, ClinicType, ServiceType
+from app.models.appointment_stats import AppointmentDailyStat
+
+# The fields an appointment is counted under in the rollup
+STAT_FIELDS = ("preferred_date", "status", "clinic", "service_required")
+
+
+def stat_key(appointment: Appointment) -> tuple:
+    """The rollup row an appointment is counted in: (day, status, clinic, service_required)."""
+    return tuple(getattr(appointment, field) for field in STAT_FIELDS)
+
+
+def apply(db: Session, key: tuple, delta: int) -> None:
+    """
+    Add delta to the rollup row for key, creating it if needed. Does not
+    commit: call it inside the transaction that creates, changes or deletes
+    the appointment.
+    
+    Args:
+        db: Database session
+        key: (day, status, clinic, service_required), see stat_key
+        delta: +1 for a new appointment, -1 for a removed one
+    """
+    day, status, clinic, service_required = key
+    stmt = sqlite_insert(AppointmentDailyStat).values(
+        day=day, status=status, clinic=clinic, service_required=service_required, count=delta
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            AppointmentDailyStat.day,
+            AppointmentDailyStat.status,
+            AppointmentDailyStat.clinic,
+            AppointmentDailyStat.service_required,
+        ],
+        set_={"count": AppointmentDailyStat.count + delta},
+    )
+    db.execute(stmt)
+
+
+def apply_many(db: Session, deltas: Counter) -> None:
+    """
+    apply() for many keys at once (one executemany upsert), for bulk imports.
+    Does not commit.
+
+    Args:
+        db: Database session
+        deltas: stat_key -> delta
+    """
+    if not deltas:
+        return
+    stmt = sqlite_insert(AppointmentDailyStat)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            AppointmentDailyStat.day,
+            AppointmentDailyStat.status,
+            AppointmentDailyStat.clinic,
+            AppointmentDailyStat.service_required,
+        ],
+        set_={"count": AppointmentDailyStat.count + stmt.excluded.count},
+    )
+    db.execute(stmt, [
+        {"day": day, "status": status, "clinic": clinic, "service_required": service_required, "count": delta}
+        for (day, status, clinic, service_required), delta in deltas.items()
+    ])
+
+
+def move(db: Session, old_key: tuple, new_key: tuple) -> None:
+    """Re-count an appointment whose day, status, clinic or service changed."""
+    if old_key != new_key:
+        apply(db, old_key, -1)
+        apply(db, new_key, +1)
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute the whole rollup from the appointments table (one GROUP BY).
+    Used to backfill the table; does not commit.
+    
+    Returns:
+        int: Number of rollup rows written
+    """
+    db.execute(delete(AppointmentDailyStat))
+    grouped = (
+        select(
+            Appointment.preferred_date,
+            Appointment.status,
+            Appointment.clinic,
+            Appointment.service_required,
+            func.count(),
+        )
+        .group_by(Appointment.preferred_date, Appointment.status, Appointment.clinic, Appointment.service_required)
+    )
+    result = db.execute(
+        insert(AppointmentDailyStat).from_select(
+            ["day", "status", "clinic", "service_required", "count"], grouped
+        )
+    )
+    return result.rowcount
+
+
+def ensure_backfilled(db: Session) -> bool:
+    """
+    Fill the rollup once for a database that had appointments before it
+    existed. Runs in a write (BEGIN IMMEDIATE) transaction, so concurrent
+    workers starting up cannot both backfill.
+    
+    Returns:
+        bool: True if a backfill was done
+    """
+    if db.query(AppointmentDailyStat.day).first() is not None or db.query(Appointment.id).first() is None:
+        db.rollback()
+        return False
+    rebuild(db)
+    db.commit()
+    return True
+
+
+def summary(
+    db: Session,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    user_id: Optional[int] = None,
+    email: Optional[str] = None,
+) -> dict:
+    """
+    Appointment counts by status, clinic, service and day.
+    
+    Unfiltered requests read only the rollup (one row per day/status/clinic/
+    service combination). Requests for one user or email count that subject's
+    own appointments via ix_appt_user_schedule / ix_appt_email_schedule, which
+    also bound the date range; they never scan the whole table.
+    
+    Args:
+        db: Database session
+        date_from, date_to: Optional inclusive YYYY-MM-DD bounds on preferred_date
+        user_id: Only appointments booked by this user
+        email: Only appointments booked under this email
+    
+    Returns:
+        dict: Fields of schemas.appointments.AppointmentStats
+    """
+    if user_id is None and email is None:
+        day = AppointmentDailyStat.day
+        stmt = select(
+            AppointmentDailyStat.day,
+            AppointmentDailyStat.status,
+            AppointmentDailyStat.clinic,
+            AppointmentDailyStat.service_required,
+            AppointmentDailyStat.count,
+        ).where(AppointmentDailyStat.count > 0)
+    else:
+        day = Appointment.preferred_date
+        stmt = select(
+            Appointment.preferred_date,
+            Appointment.status,
+            Appointment.clinic,
+            Appointment.service_required,
+            func.count(),
+        ).group_by(Appointment.preferred_date, Appointment.status, Appointment.clinic, Appointment.service_required)
+        if user_id is not None:
+            stmt = stmt.where(Appointment.created_by_user_id == user_id)
+        if email is not None:
+            stmt = stmt.where(Appointment.email == email)
+    if date_from is not None:
+        stmt = stmt.where(day >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(day <= date_to)
+
+    by_status = Counter({s.value: 0 for s in AppointmentStatus})
+    by_clinic = Counter({c.value: 0 for c in ClinicType})
+    by_service = Counter({s.value: 0 for s in ServiceType})
+    by_day = Counter()
+    for day_value, status, clinic, service_required, count in db.execute(stmt):
+        by_status[status.value] += count
+        by_clinic[clinic.value] += count
+        by_service[service_required.value] += count
+        by_day[day_value] += count
+
+    return {
+        "total": sum(by_day.values()),
+        "by_status": dict(by_status),
+        "by_clinic": dict(by_clinic),
+        "by_service": dict(by_service),
+        "by_day": [{"date": d, "count": by_day[d]} for d in sorted(by_day)],
+    }
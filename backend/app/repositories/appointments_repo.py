@@ -1,13 +1,154 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import and_, insert, or_, select, tuple_, union
+from sqlalchemy.engine import Result
+from typing import List, Optional, Sequence, Tuple
+from datetime import date, datetime
+from collections import Counter
+from types import SimpleNamespace
+import base64
+import json
 
+from app.core.availability import InvalidSlot, scheduled_at_for, utc_bounds
+from app.core.events import appointment_events
+from app.core.uploads import StoredUpload
 from app.models.appointments import Appointment, AppointmentStatus, ClinicType
-from app.schemas.appointments import AppointmentCreate, AppointmentUpdate
+from app.models.users import User
+from app.repositories import appointment_stats_repo, availability_repo, payment_proof_repo
+from app.schemas.appointments import AppointmentCreate, AppointmentRead, AppointmentUpdate
+from app.schemas.imports import AppointmentImport
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
 
-def create(db: Session, payload: AppointmentCreate, created_by_user_id: Optional[int] = None, payment_proof_path: Optional[str] = None) -> Appointment:
+# Columns behind each AppointmentRead field, for list queries that select plain tuples
+READ_FIELDS = tuple(AppointmentRead.model_fields)
+READ_COLUMNS = {name: getattr(Appointment, name) for name in READ_FIELDS}
+
+
+def encode_cursor(appointment) -> str:
+    """
+    Build an opaque cursor pointing just after the given appointment
+    (an Appointment or any row exposing scheduled_at and id).
+
+    The cursor carries the full sort key (scheduled_at, id) so the next page
+    can be fetched with a seek predicate instead of OFFSET.
+    """
+    scheduled_at = appointment.scheduled_at
+    key = [scheduled_at.isoformat() if scheduled_at else None, appointment.id]
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        scheduled_at, appointment_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(scheduled_at) if scheduled_at else None), int(appointment_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _seek(cursor: str):
+    """Seek predicate: rows strictly "after" the cursor in descending order."""
+    scheduled_at, appointment_id = decode_cursor(cursor)
+    if scheduled_at is None:
+        # Rows not yet backfilled by migration 0002 sort last (NULLs are smallest)
+        return and_(Appointment.scheduled_at.is_(None), Appointment.id < appointment_id)
+    # The NULL rows come after every scheduled one; a row comparison with them is NULL, not true
+    return or_(
+        tuple_(Appointment.scheduled_at, Appointment.id) < tuple_(scheduled_at, appointment_id),
+        Appointment.scheduled_at.is_(None),
+    )
+
+
+def _has_unscheduled(db: Session) -> bool:
+    """
+    Whether any appointment still lacks scheduled_at: migration 0002 has not
+    backfilled it yet, or its date and time strings do not parse. One probe
+    of ix_appt_scheduled (NULLs come first in it).
+    """
+    return db.execute(select(Appointment.id).where(Appointment.scheduled_at.is_(None)).limit(1)).first() is not None
+
+
+def _on_days(db: Session, date_from: Optional[date], date_to: Optional[date]) -> list:
+    """
+    Conditions keeping appointments on the clinic-local days date_from..date_to.
+
+    Scheduled rows are matched on a scheduled_at range (which the indexes
+    serve) narrowed to the exact scheduled_date. Rows without a schedule fall
+    back to the ISO preferred_date string, but only while there are any: the
+    OR costs the index range.
+    """
+    start, end = utc_bounds(date_from, date_to)
+    scheduled, unscheduled = [], [Appointment.scheduled_at.is_(None)]
+    if start is not None:
+        scheduled += [Appointment.scheduled_at >= start, Appointment.scheduled_date >= date_from]
+        unscheduled.append(Appointment.preferred_date >= date_from.isoformat())
+    if end is not None:
+        scheduled += [Appointment.scheduled_at < end, Appointment.scheduled_date <= date_to]
+        unscheduled.append(Appointment.preferred_date <= date_to.isoformat())
+    if not scheduled or not _has_unscheduled(db):
+        return scheduled
+    return [or_(and_(*scheduled), and_(*unscheduled))]
+
+
+# Newest first; matches the (…, scheduled_at, id) indexes so SQLite never sorts
+NEWEST_FIRST = (Appointment.scheduled_at.desc(), Appointment.id.desc())
+
+
+def _paginate(query: Query, cursor: Optional[str], limit: Optional[int], fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
+    """
+    Apply newest-first ordering and keyset pagination to an appointment query.
+
+    Args:
+        query: Base query (already filtered)
+        cursor: Opaque cursor from a previous page, or None for the first page
+        limit: Page size; None returns every remaining row
+        fields: AppointmentRead field names to select as plain row tuples
+            instead of loading Appointment objects. Each row starts with
+            those fields in order; scheduled_at and id are appended if
+            missing (the cursor needs them).
+
+    Returns:
+        Tuple of (appointments or rows on this page, cursor for the next page or None)
+    """
+    if cursor:
+        query = query.filter(_seek(cursor))
+    if fields is not None:
+        selected = dict.fromkeys([*fields, "scheduled_at", "id"])
+        query = query.with_entities(*(READ_COLUMNS[name] for name in selected))
+
+    query = query.order_by(*NEWEST_FIRST)
+    if limit is None:
+        return query.all(), None
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def _event_data(appointment: Appointment) -> dict:
+    """An appointment's AppointmentRead fields, for change events."""
+    return {name: getattr(appointment, name) for name in READ_FIELDS}
+
+
+def _schedule(appointment: Appointment) -> None:
+    """Derive scheduled_at / scheduled_date from the clinic-local date and time strings."""
+    appointment.scheduled_at, appointment.scheduled_date = scheduled_at_for(
+        appointment.clinic, appointment.preferred_date, appointment.preferred_time
+    )
+
+
+def create(db: Session, payload: AppointmentCreate, created_by_user_id: Optional[int] = None, payment_proof: Optional[StoredUpload] = None) -> Appointment:
     """
     Create a new appointment with the provided details.
     
@@ -15,9 +156,14 @@ def create(db: Session, payload: AppointmentCreate, created_by_user_id: Optional
         db: Database session
         payload: Validated appointment data from API
         created_by_user_id: ID of the user creating the appointment
+        payment_proof: Blob already placed in the content-addressed store, if any
     
     Returns:
         Appointment: The newly created appointment object
+    
+    Raises:
+        InvalidSlot: If the date/time is not one of the clinic's slots, or has passed
+        SlotUnavailable: If the slot is already full for the service
     """
     # Step 1: Create new Appointment object with all required fields
     obj = Appointment(
@@ -29,92 +175,104 @@ def create(db: Session, payload: AppointmentCreate, created_by_user_id: Optional
         preferred_date=payload.preferred_date,
         preferred_time=payload.preferred_time,
         payment_reference=payload.payment_reference,
-        payment_proof=payment_proof_path,  # Add payment proof path
+        payment_proof=str(payment_proof.path) if payment_proof else None,  # Blob path in the proof store
         message=payload.message,  # Can be None
         created_by_user_id=created_by_user_id,
         status=AppointmentStatus.PENDING,  # Default status
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
+    _schedule(obj)
     
-    # Step 2: Add to database session
+    # Step 2: Take a place in the slot first; nothing else is written if it is full
+    # (or already over: free_slots() does not offer past slots either)
+    try:
+        if obj.scheduled_at <= datetime.utcnow():
+            raise InvalidSlot(f"The {obj.preferred_time} slot on {obj.preferred_date} has already passed")
+        availability_repo.reserve(db, availability_repo.slot_key(obj))
+    except ValueError:
+        db.rollback()
+        if payment_proof:
+            # The blob is already in the store but nothing will point at it:
+            # register it as unreferenced so collect_garbage() can reclaim it
+            payment_proof_repo.acquire(
+                db, payment_proof.sha256, str(payment_proof.path), payment_proof.size, payment_proof.content_type
+            )
+            db.flush()
+            payment_proof_repo.release(db, str(payment_proof.path))
+            db.commit()
+        raise
+    
+    # Step 3: Add to database session (and count the reference to the shared blob)
     db.add(obj)
+    if payment_proof:
+        payment_proof_repo.acquire(
+            db, payment_proof.sha256, str(payment_proof.path), payment_proof.size, payment_proof.content_type
+        )
+    appointment_stats_repo.apply(db, appointment_stats_repo.stat_key(obj), +1)
     
-    # Step 3: Commit transaction to save permanently
+    # Step 4: Commit transaction to save permanently
     db.commit()
     
-    # Step 4: Refresh object to get updated data from DB (ID, etc.)
+    # Step 5: Refresh object to get updated data from DB (ID, etc.)
     db.refresh(obj)
+    appointment_events.publish("created", _event_data(obj))
     
-    # Step 5: Return the saved appointment
+    # Step 6: Return the saved appointment
     return obj
 
 
-def get_by_status(db: Session, status: AppointmentStatus) -> List[Appointment]:
+def get_by_status(db: Session, status: AppointmentStatus, cursor: Optional[str] = None, limit: Optional[int] = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
     """
     Get all appointments with a specific status.
     
     Args:
         db: Database session
         status: The appointment status to filter by (PENDING, CONFIRMED, etc.)
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of appointments to return (None for no limit)
+        fields: Select just these AppointmentRead fields as row tuples (see _paginate)
     
     Returns:
-        List[Appointment]: All appointments with the specified status, ordered by date/time
-    """
-    return (
-        db.query(Appointment)
-        .filter(Appointment.status == status)
-        .order_by(
-            Appointment.preferred_date.desc(),  # Newest dates first
-            Appointment.preferred_time.desc(),  # Latest times first 
-            Appointment.id.desc()               # Most recent IDs first
-        )
-        .all()
-    )
+        Tuple[List[Appointment], Optional[str]]: All appointments with the specified status, ordered by date/time, plus the next page cursor
+    """
+    query = db.query(Appointment).filter(Appointment.status == status)
+    return _paginate(query, cursor, limit, fields)
 
 
-def get_by_email(db: Session, email: str) -> List[Appointment]:
+def get_by_email(db: Session, email: str, cursor: Optional[str] = None, limit: Optional[int] = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
     """
     Get all appointments for a specific email address (patient history).
     
     Args:
         db: Database session
         email: Patient's email address
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of appointments to return (None for no limit)
+        fields: Select just these AppointmentRead fields as row tuples (see _paginate)
     
     Returns:
-        List[Appointment]: All appointments for this email, ordered by newest first
-    """
-    return (
-        db.query(Appointment)
-        .filter(Appointment.email == email)
-        .order_by(
-            Appointment.preferred_date.desc(),  # Newest dates first
-            Appointment.preferred_time.desc(),  # Latest times first
-            Appointment.id.desc()               # Most recent bookings first
-        )
-        .all()
-    )
+        Tuple[List[Appointment], Optional[str]]: All appointments for this email, ordered by newest first, plus the next page cursor
+    """
+    query = db.query(Appointment).filter(Appointment.email == email)
+    return _paginate(query, cursor, limit, fields)
 
 
-def list_all(db: Session) -> List[Appointment]:
+def list_all(db: Session, cursor: Optional[str] = None, limit: Optional[int] = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
     """
     Get all appointments in the system.
     
     Args:
         db: Database session
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of appointments to return (None for no limit)
+        fields: Select just these AppointmentRead fields as row tuples (see _paginate)
     
     Returns:
-        List[Appointment]: All appointments ordered by newest date/time first
-    """
-    return (
-        db.query(Appointment)
-        .order_by(
-            Appointment.preferred_date.desc(),  # Newest dates first
-            Appointment.preferred_time.desc(),  # Latest times first
-            Appointment.id.desc()               # Most recent IDs first
-        )
-        .all()
-    )
+        Tuple[List[Appointment], Optional[str]]: All appointments ordered by newest date/time first, plus the next page cursor
+    """
+    query = db.query(Appointment)
+    return _paginate(query, cursor, limit, fields)
 
 
 def update(db: Session, appointment_id: int, payload: AppointmentUpdate) -> Optional[Appointment]:
@@ -128,6 +286,10 @@ def update(db: Session, appointment_id: int, payload: AppointmentUpdate) -> Opti
     
     Returns:
         Optional[Appointment]: Updated appointment or None if not found
+    
+    Raises:
+        InvalidSlot: If moving it to a time that is not one of the clinic's slots
+        SlotUnavailable: If re-opening a cancelled appointment whose slot has filled up since
     """
     # Step 1: Find the appointment
     appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
@@ -135,8 +297,24 @@ def update(db: Session, appointment_id: int, payload: AppointmentUpdate) -> Opti
         return None
     
     # Step 2: Update only the provided fields
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    if "payment_proof" in changes and changes["payment_proof"] != appointment.payment_proof:
+        payment_proof_repo.release(db, appointment.payment_proof)
+        payment_proof_repo.retain(db, changes["payment_proof"])
+    old_stat_key = appointment_stats_repo.stat_key(appointment)
+    old_slot_key = availability_repo.slot_key(appointment)
+    for field, value in changes.items():
         setattr(appointment, field, value)
+    rescheduled = bool(changes.keys() & {"clinic", "preferred_date", "preferred_time"})
+    if rescheduled:
+        _schedule(appointment)
+    appointment_stats_repo.move(db, old_stat_key, appointment_stats_repo.stat_key(appointment))
+    try:
+        # A booking that keeps its slot is not held to today's timetable
+        availability_repo.move(db, old_slot_key, availability_repo.slot_key(appointment), rescheduled)
+    except ValueError:
+        db.rollback()
+        raise
     
     # Step 3: Update the timestamp
     appointment.updated_at = datetime.utcnow()
@@ -144,32 +322,80 @@ def update(db: Session, appointment_id: int, payload: AppointmentUpdate) -> Opti
     # Step 4: Save changes
     db.commit()
     db.refresh(appointment)
+    appointment_events.publish("updated", _event_data(appointment))
     
     # Step 5: Return updated appointment
     return appointment
 
 
-def get_by_user_id(db: Session, user_id: int) -> List[Appointment]:
+def get_by_user_id(db: Session, user_id: int, cursor: Optional[str] = None, limit: Optional[int] = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
     """
     Get all appointments created by a specific user.
     
     Args:
         db: Database session
         user_id: ID of the user who created the appointments
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of appointments to return (None for no limit)
+        fields: Select just these AppointmentRead fields as row tuples (see _paginate)
     
     Returns:
-        List[Appointment]: All appointments for this user, ordered by newest first
-    """
-    return (
-        db.query(Appointment)
-        .filter(Appointment.created_by_user_id == user_id)
-        .order_by(
-            Appointment.preferred_date.desc(),  # Newest dates first
-            Appointment.preferred_time.desc(),  # Latest times first
-            Appointment.id.desc()               # Most recent bookings first
-        )
-        .all()
-    )
+        Tuple[List[Appointment], Optional[str]]: All appointments for this user, ordered by newest first, plus the next page cursor
+    """
+    query = db.query(Appointment).filter(Appointment.created_by_user_id == user_id)
+    return _paginate(query, cursor, limit, fields)
+
+
+def get_for_user(db: Session, user_id: Optional[int], email: str, cursor: Optional[str] = None, limit: Optional[int] = DEFAULT_PAGE_SIZE, fields: Optional[Sequence[str]] = None) -> Tuple[list, Optional[str]]:
+    """
+    Get a user's appointments: those they booked while signed in plus those
+    booked under their email, deduplicated and newest first, in one query.
+    
+    Each branch seeks and limits on its own composite index
+    (ix_appt_user_scheduled / ix_appt_email_scheduled), so SQLite reads at most
+    limit + 1 rows per branch in index order; only that small union is sorted.
+    
+    Args:
+        db: Database session
+        user_id: ID of the signed-in user (None matches nothing on that branch)
+        email: The user's email address
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of appointments to return (None for no limit)
+        fields: Select just these AppointmentRead fields as row tuples (see _paginate)
+    
+    Returns:
+        Tuple[List[Appointment], Optional[str]]: This page of appointments, plus the next page cursor
+    """
+    seek = _seek(cursor) if cursor else None
+
+    def branch(condition):
+        stmt = select(Appointment.id).where(condition)
+        if seek is not None:
+            stmt = stmt.where(seek)
+        stmt = stmt.order_by(*NEWEST_FIRST)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        subquery = stmt.subquery()
+        return select(subquery.c.id)
+
+    branches = [branch(Appointment.email == email)]
+    if user_id is not None:
+        branches.append(branch(Appointment.created_by_user_id == user_id))
+    ids = union(*branches) if len(branches) > 1 else branches[0]
+
+    query = db.query(Appointment).filter(Appointment.id.in_(ids))
+    return _paginate(query, None, limit, fields)
+
+
+def version_of(db: Session, appointment_id: int) -> Optional[str]:
+    """
+    Cheap validator for one appointment (a primary-key read of updated_at, for ETags).
+    
+    Returns:
+        Optional[str]: updated_at as ISO text, or None if there is no such appointment
+    """
+    row = db.execute(select(Appointment.updated_at).where(Appointment.id == appointment_id)).first()
+    return None if row is None else row.updated_at.isoformat()
 
 
 def get_by_id(db: Session, appointment_id: int) -> Optional[Appointment]:
@@ -201,6 +427,167 @@ def delete(db: Session, appointment_id: int) -> bool:
     if not appointment:
         return False
     
+    payment_proof_repo.release(db, appointment.payment_proof)
+    appointment_stats_repo.apply(db, appointment_stats_repo.stat_key(appointment), -1)
+    availability_repo.release(db, availability_repo.slot_key(appointment))
     db.delete(appointment)
     db.commit()
-    return True
\ No newline at end of file
+    appointment_events.publish("deleted", {"id": appointment_id})
+    return True
+
+
+# Columns returned by the admin feed: enough for the grid, nothing more (no message/proof path)
+ADMIN_FEED_COLUMNS = (
+    Appointment.id,
+    Appointment.full_name,
+    Appointment.email,
+    Appointment.phone,
+    Appointment.clinic,
+    Appointment.service_required,
+    Appointment.preferred_date,
+    Appointment.preferred_time,
+    Appointment.scheduled_at,
+    Appointment.status,
+    Appointment.payment_reference,
+    Appointment.created_at,
+    User.id.label("user_id"),
+    User.full_name.label("user_full_name"),
+    User.email.label("user_email"),
+)
+
+
+def admin_feed(
+    db: Session,
+    status: Optional[AppointmentStatus] = None,
+    clinic: Optional[ClinicType] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    yield_per: int = 500,
+) -> Result:
+    """
+    Stream appointments joined (outer) with their booking user, for the admin grid.
+    
+    Args:
+        db: Database session (must stay open while the result is consumed)
+        status, clinic: Optional exact-match filters
+        date_from, date_to: Optional inclusive bounds on the clinic-local day (see _on_days)
+        cursor: Opaque cursor from a previous page
+        limit: Page size; the result holds up to limit + 1 rows so the caller
+            can tell whether another page exists
+        yield_per: Rows fetched from the DB cursor at a time
+    
+    Returns:
+        Result: Unbuffered rows of ADMIN_FEED_COLUMNS, newest first. Guest
+        bookings have user_id/user_full_name/user_email set to None.
+    """
+    stmt = select(*ADMIN_FEED_COLUMNS).outerjoin(User, User.id == Appointment.created_by_user_id)
+    if status is not None:
+        stmt = stmt.where(Appointment.status == status)
+    if clinic is not None:
+        stmt = stmt.where(Appointment.clinic == clinic)
+    stmt = stmt.where(*_on_days(db, date_from, date_to))
+    if cursor:
+        stmt = stmt.where(_seek(cursor))
+
+    stmt = stmt.order_by(*NEWEST_FIRST).limit(limit + 1)
+    return db.execute(stmt.execution_options(yield_per=yield_per))
+
+
+# Columns in appointment exports (the stored proof path stays internal)
+EXPORT_COLUMNS = (
+    Appointment.id,
+    Appointment.full_name,
+    Appointment.phone,
+    Appointment.email,
+    Appointment.clinic,
+    Appointment.service_required,
+    Appointment.preferred_date,
+    Appointment.preferred_time,
+    Appointment.scheduled_at,
+    Appointment.status,
+    Appointment.payment_reference,
+    Appointment.message,
+    Appointment.created_by_user_id,
+    Appointment.created_at,
+)
+
+
+def export_rows(
+    db: Session,
+    status: Optional[AppointmentStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    yield_per: int = 1000,
+) -> Result:
+    """
+    Stream every matching appointment, oldest scheduled first, for exports.
+    
+    Rows come in ix_appt_scheduled / ix_appt_status_scheduled order (a day
+    filter becomes a scheduled_at range on the same index), so SQLite never
+    has to sort and memory stays flat however many rows match. Rows without
+    a schedule come first; while there are any, a day filter also matches
+    them on preferred_date (see _on_days), at the cost of that sort.
+    
+    Args:
+        db: Database session (must stay open while the result is consumed)
+        status: Optional exact-match filter
+        date_from, date_to: Optional inclusive bounds on the clinic-local day
+        yield_per: Rows fetched from the DB cursor at a time
+    
+    Returns:
+        Result: Unbuffered rows of EXPORT_COLUMNS
+    """
+    stmt = select(*EXPORT_COLUMNS)
+    if status is not None:
+        stmt = stmt.where(Appointment.status == status)
+    stmt = stmt.where(*_on_days(db, date_from, date_to))
+    stmt = stmt.order_by(Appointment.scheduled_at, Appointment.id)
+    return db.execute(stmt.execution_options(yield_per=yield_per))
+
+
+def bulk_write(db: Session, rows: list[tuple[int, AppointmentImport]]) -> dict:
+    """
+    Insert a batch of imported appointments with one executemany, and count
+    them into the stats rollup and slot occupancy with one grouped upsert
+    each (the search index follows through its triggers). Does not commit.
+    
+    Imported bookings are records of what happened: slot capacity and the
+    current timetable are not enforced, unlike create().
+    
+    Args:
+        db: Database session
+        rows: (line number, payload) pairs
+    
+    Returns:
+        dict: {"inserted"} count and "errors" as (line number, message) for
+        rows whose date or time cannot be scheduled
+    """
+    now = datetime.utcnow()
+    values, errors = [], []
+    stats, slots = Counter(), Counter()
+    for line_no, payload in rows:
+        try:
+            scheduled_at, scheduled_date = scheduled_at_for(payload.clinic, payload.preferred_date, payload.preferred_time)
+        except ValueError as exc:
+            errors.append((line_no, str(exc)))
+            continue
+        row = SimpleNamespace(
+            **payload.model_dump(),
+            scheduled_at=scheduled_at,
+            scheduled_date=scheduled_date,
+            created_at=now,
+            updated_at=now,
+        )
+        values.append(vars(row))
+        stats[appointment_stats_repo.stat_key(row)] += 1
+        key = availability_repo.slot_key(row)
+        if key is not None:
+            slots[key] += 1
+
+    if values:
+        db.execute(insert(Appointment), values)
+    appointment_stats_repo.apply_many(db, stats)
+    availability_repo.add_bookings(db, slots)
+    return {"inserted": len(values), "errors": errors}
@@ -0,0 +1,199 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, insert, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Optional
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from app.core.availability import CLINIC_SCHEDULES, SlotUnavailable, check_slot, scheduled_at_for
+from app.models.appointments import Appointment, AppointmentStatus, ClinicType, ServiceType
+from app.models.slot_occupancy import SlotOccupancy
+
+_KEY_COLUMNS = [SlotOccupancy.clinic, SlotOccupancy.day, SlotOccupancy.slot_time, SlotOccupancy.service_required]
+
+
+def slot_key(appointment: Appointment) -> Optional[tuple]:
+    """The slot an appointment occupies: (clinic, day, time, service), or None once cancelled."""
+    if appointment.status == AppointmentStatus.CANCELLED:
+        return None
+    return (appointment.clinic, appointment.preferred_date, appointment.preferred_time, appointment.service_required)
+
+
+def reserve(db: Session, key: Optional[tuple], check_timetable: bool = True) -> None:
+    """
+    Take one place in a slot. A single conditional upsert does the capacity
+    check and the increment together, so concurrent bookings cannot both
+    take the last place. Capacity is per service: bookings for other
+    services in the same slot do not count against it. Does not commit.
+    
+    Args:
+        check_timetable: Also require the slot to be on the clinic's current
+            timetable. Off for bookings that keep their slot (a cancelled one
+            re-opened), which may predate the timetable or have been imported.
+    
+    Raises:
+        InvalidSlot: If the time is not one of the clinic's slots
+        SlotUnavailable: If the slot is already full for the service
+    """
+    if key is None:
+        return
+    clinic, day, slot_time, service = key
+    if check_timetable:
+        capacity = check_slot(clinic, service, day, slot_time)
+    else:
+        capacity = CLINIC_SCHEDULES[clinic].capacity_for(service)
+
+    stmt = sqlite_insert(SlotOccupancy).values(
+        clinic=clinic, day=day, slot_time=slot_time, service_required=service, booked=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_KEY_COLUMNS,
+        set_={"booked": SlotOccupancy.booked + 1},
+        where=SlotOccupancy.booked < capacity,
+    )
+    if capacity < 1 or db.execute(stmt).rowcount == 0:
+        raise SlotUnavailable(f"The {slot_time} slot on {day} is fully booked")
+
+
+def add_bookings(db: Session, counts: Counter) -> None:
+    """
+    Count already-made bookings into their slots (one executemany upsert),
+    for bulk imports of past appointments. Unlike reserve() this checks
+    neither the timetable nor capacity: the bookings happened, and the
+    counts must match them. Does not commit.
+
+    Args:
+        db: Database session
+        counts: slot_key -> number of bookings
+    """
+    if not counts:
+        return
+    stmt = sqlite_insert(SlotOccupancy)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_KEY_COLUMNS,
+        set_={"booked": SlotOccupancy.booked + stmt.excluded.booked},
+    )
+    db.execute(stmt, [
+        {"clinic": clinic, "day": day, "slot_time": slot_time, "service_required": service, "booked": n}
+        for (clinic, day, slot_time, service), n in counts.items()
+    ])
+
+
+def release(db: Session, key: Optional[tuple]) -> None:
+    """Give a place in a slot back. Does not commit."""
+    if key is None:
+        return
+    clinic, day, slot_time, service = key
+    db.query(SlotOccupancy).filter(
+        SlotOccupancy.clinic == clinic,
+        SlotOccupancy.day == day,
+        SlotOccupancy.slot_time == slot_time,
+        SlotOccupancy.service_required == service,
+        SlotOccupancy.booked > 0,
+    ).update({SlotOccupancy.booked: SlotOccupancy.booked - 1}, synchronize_session=False)
+
+
+def move(db: Session, old_key: Optional[tuple], new_key: Optional[tuple], rescheduled: bool = True) -> None:
+    """
+    Follow an appointment change (cancelled, re-opened, rescheduled). Does not commit.
+    
+    Args:
+        rescheduled: The clinic, date or time changed, so the new slot must be
+            on the timetable; otherwise only its capacity is checked
+    
+    Raises:
+        InvalidSlot / SlotUnavailable: If the new slot cannot take the booking
+    """
+    if old_key != new_key:
+        release(db, old_key)
+        reserve(db, new_key, check_timetable=rescheduled)
+
+
+def free_slots(
+    db: Session,
+    clinic: ClinicType,
+    date_from: date,
+    date_to: date,
+    service: Optional[ServiceType] = None,
+    now: Optional[datetime] = None,
+) -> list[dict]:
+    """
+    Free places per slot for each day in an inclusive range.
+    
+    The clinic's timetable gives the slots; one primary-key range read of
+    slot_occupancy gives what is already taken.
+    
+    Args:
+        db: Database session
+        clinic: Clinic to look at
+        date_from, date_to: Inclusive day range
+        service: Only report places for this service (None reports every service)
+        now: Naive UTC time before which slots have passed (default: the current time)
+    
+    Returns:
+        list[dict]: One {"date", "slots"} per day; each slot is {"time", "remaining"}
+        with remaining places per service. Full and past slots are left out.
+    """
+    now = now or datetime.utcnow()
+    schedule = CLINIC_SCHEDULES[clinic]
+    query = db.query(
+        SlotOccupancy.day, SlotOccupancy.slot_time, SlotOccupancy.service_required, SlotOccupancy.booked
+    ).filter(
+        SlotOccupancy.clinic == clinic,
+        SlotOccupancy.day >= date_from.isoformat(),
+        SlotOccupancy.day <= date_to.isoformat(),
+    )
+    if service is not None:
+        query = query.filter(SlotOccupancy.service_required == service)
+    booked = {(day, slot_time, svc): n for day, slot_time, svc, n in query}
+
+    services = [service] if service is not None else list(ServiceType)
+    days = []
+    current = date_from
+    while current <= date_to:
+        day = current.isoformat()
+        slots = []
+        for slot_time in schedule.slots_on(current):
+            if scheduled_at_for(clinic, day, slot_time)[0] <= now:
+                continue
+            remaining = {}
+            for svc in services:
+                left = schedule.capacity_for(svc) - booked.get((day, slot_time, svc), 0)
+                if left > 0:
+                    remaining[svc.value] = left
+            if remaining:
+                slots.append({"time": slot_time, "remaining": remaining})
+        days.append({"date": day, "slots": slots})
+        current += timedelta(days=1)
+    return days
+
+
+def ensure_backfilled(db: Session) -> bool:
+    """
+    Count existing active appointments into slot_occupancy once, for
+    databases that had bookings before the table existed. Runs in a write
+    (BEGIN IMMEDIATE) transaction, so concurrent workers cannot both backfill.
+    
+    Returns:
+        bool: True if a backfill was done
+    """
+    if db.query(SlotOccupancy.day).first() is not None or db.query(Appointment.id).first() is None:
+        db.rollback()
+        return False
+    db.execute(delete(SlotOccupancy))
+    grouped = (
+        select(
+            Appointment.clinic,
+            Appointment.preferred_date,
+            Appointment.preferred_time,
+            Appointment.service_required,
+            func.count(),
+        )
+        .where(Appointment.status != AppointmentStatus.CANCELLED)
+        .group_by(Appointment.clinic, Appointment.preferred_date, Appointment.preferred_time, Appointment.service_required)
+    )
+    db.execute(
+        insert(SlotOccupancy).from_select(["clinic", "day", "slot_time", "service_required", "booked"], grouped)
+    )
+    db.commit()
+    return True
@@ -1,7 +1,12 @@
 # app/repositories/patient_repo.py
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Result
+from app.core import search_index
 from app.models.patients import Patient
+from app.repositories import search_repo
 from app.schemas.patients import PatientCreate, PatientUpdate
 
 
@@ -9,6 +14,7 @@ def create(db: Session, payload: PatientCreate) -> Patient:
     obj = Patient(
         full_name=payload.full_name,
         phone_number=payload.phone_number,
+        updated_at=datetime.utcnow(),
     )
     db.add(obj)
     db.commit()
@@ -24,6 +30,19 @@ def get_by_id(db: Session, patient_id: int) -> Patient | None:
     return db.get(Patient, patient_id)
 
 
+def version_of(db: Session, patient_id: int) -> str | None:
+    """
+    Cheap validator for one patient (a primary-key read of updated_at, for ETags).
+
+    Returns:
+        str | None: updated_at as ISO text ("" if never changed), or None if there is no such patient
+    """
+    row = db.execute(select(Patient.updated_at).where(Patient.id == patient_id)).first()
+    if row is None:
+        return None
+    return row.updated_at.isoformat() if row.updated_at else ""
+
+
 def update(db: Session, patient_id: int, payload: PatientUpdate) -> Patient:
     """
     Partial update: only fields present in payload are applied.
@@ -35,6 +54,7 @@ def update(db: Session, patient_id: int, payload: PatientUpdate) -> Patient:
     changes = payload.model_dump(exclude_unset=True)
     for k, v in changes.items():
         setattr(obj, k, v)
+    obj.updated_at = datetime.utcnow()
 
     db.commit()
     db.refresh(obj)
@@ -50,15 +70,117 @@ def delete(db: Session, patient_id: int) -> bool:
     return True
 
 
+ON_CONFLICT = ("skip", "update")
+
+
+def bulk_write(db: Session, rows: list[tuple[int, PatientCreate]], on_conflict: str = "skip") -> dict:
+    """
+    Insert a batch of validated patients with one executemany. Does not commit.
+
+    phone_number is unique: with on_conflict="skip" a patient whose number is
+    already taken (in the database or earlier in the batch) is left alone;
+    with "update" the existing patient takes the new name. One indexed IN
+    lookup finds the existing numbers, so the counts are exact.
+
+    Args:
+        db: Database session
+        rows: (line number, payload) pairs
+        on_conflict: "skip" or "update"
+
+    Returns:
+        dict: {"inserted", "updated", "skipped"} counts
+
+    Raises:
+        ValueError: If on_conflict is not one of ON_CONFLICT
+    """
+    if on_conflict not in ON_CONFLICT:
+        raise ValueError(f"on_conflict must be one of: {', '.join(ON_CONFLICT)}")
+
+    now = datetime.utcnow()
+    by_phone: dict[str, dict] = {}
+    skipped = 0
+    for _, payload in rows:
+        if payload.phone_number in by_phone and on_conflict == "skip":
+            skipped += 1
+            continue
+        by_phone[payload.phone_number] = {
+            "full_name": payload.full_name, "phone_number": payload.phone_number, "updated_at": now,
+        }
+    duplicates = len(rows) - skipped - len(by_phone)  # repeated numbers in the batch; the last one wins
+
+    existing = set(db.scalars(select(Patient.phone_number).where(Patient.phone_number.in_(list(by_phone)))))
+    stmt = sqlite_insert(Patient)
+    if on_conflict == "skip":
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Patient.phone_number])
+        values = [row for phone, row in by_phone.items() if phone not in existing]
+        skipped += len(existing)
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Patient.phone_number], set_={"full_name": stmt.excluded.full_name, "updated_at": stmt.excluded.updated_at}
+        )
+        values = list(by_phone.values())
+    if values:
+        db.execute(stmt, values)
+
+    inserted = len(by_phone) - len(existing)
+    return {
+        "inserted": inserted,
+        "updated": len(by_phone) - inserted + duplicates if on_conflict == "update" else 0,
+        "skipped": skipped,
+    }
+
+
+def export_rows(db: Session, yield_per: int = 1000) -> Result:
+    """
+    Stream every patient in id order (a primary-key scan, no sort) for exports.
+    The session must stay open while the result is consumed.
+    """
+    stmt = select(Patient.id, Patient.full_name, Patient.phone_number).order_by(Patient.id)
+    return db.execute(stmt.execution_options(yield_per=yield_per))
+
+
 def search(db: Session, query: str) -> list[Patient]:
     """
-    Simple case-insensitive search on name and phone.
+    Case-insensitive search on name and phone, best matches first.
+    Digits are looked up as a phone number prefix first (an index range).
+    Otherwise, or when no number starts with them, it uses the full-text
+    index when the query has a word of 3+ characters (trigrams); shorter
+    queries fall back to a LIKE scan.
     Limits to 50 to avoid huge payloads.
     """
     q = (query or "").strip()
     if not q:
         return []
 
+    if q.isdigit():
+        patients = search_phone_prefix(db, q)
+        if patients:
+            return patients
+
+    if not search_index.is_enabled() or search_index.match_expression(q) is None:
+        return search_like(db, q)
+
+    ids = search_repo.best_ids(db, q, kind=search_index.KIND_PATIENT, limit=50)
+    by_id = {p.id: p for p in db.query(Patient).filter(Patient.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def search_phone_prefix(db: Session, digits: str) -> list[Patient]:
+    """Patients whose number starts with digits, in number order (a range on the unique phone index)."""
+    return (
+        db.query(Patient)
+        .filter(Patient.phone_number >= digits, Patient.phone_number < digits + ":")  # ":" sorts right after "9"
+        .order_by(Patient.phone_number)
+        .limit(50)
+        .all()
+    )
+
+
+def search_like(db: Session, q: str) -> list[Patient]:
+    """
+    Substring search with LIKE. The leading wildcard means a full table scan;
+    only used for queries too short for the full-text index.
+    """
     like = f"%{q}%"
     return (
         db.query(Patient)
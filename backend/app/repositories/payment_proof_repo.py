@@ -0,0 +1,111 @@
+# app/repositories/payment_proof_repo.py
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import blobstore
+from app.models.payment_proofs import PaymentProofBlob
+
+
+def acquire(db: Session, sha256: str, path: str, size: int, content_type: str) -> PaymentProofBlob:
+    """
+    Record one more appointment referencing a blob (creating the row on first use).
+    Does not commit: runs inside the caller's appointment transaction.
+    """
+    blob = db.get(PaymentProofBlob, sha256)
+    if blob is None:
+        blob = PaymentProofBlob(sha256=sha256, path=path, size=size, content_type=content_type, ref_count=0)
+        db.add(blob)
+    blob.ref_count += 1
+    blob.released_at = None
+    return blob
+
+
+def retain(db: Session, path: Optional[str]) -> None:
+    """Increment the reference count for a stored path, if it is a blob. Does not commit."""
+    if not blobstore.is_blob_path(path):
+        return
+    blob = db.query(PaymentProofBlob).filter(PaymentProofBlob.path == path).first()
+    if blob is not None:
+        blob.ref_count += 1
+        blob.released_at = None
+
+
+def release(db: Session, path: Optional[str]) -> None:
+    """
+    Drop one reference to a stored path. Blobs reaching zero are kept until
+    collect_garbage() so an in-flight upload of the same bytes can still reuse them.
+    Does not commit.
+    """
+    if not blobstore.is_blob_path(path):
+        return
+    blob = db.query(PaymentProofBlob).filter(PaymentProofBlob.path == path).first()
+    if blob is not None and blob.ref_count > 0:
+        blob.ref_count -= 1
+        if blob.ref_count == 0:
+            blob.released_at = datetime.utcnow()
+
+
+def collect_garbage(db: Session, grace: timedelta = timedelta(hours=1), batch_size: int = 500) -> int:
+    """
+    Delete unreferenced blobs released more than `grace` ago.
+
+    A blob whose file was touched within the grace period (a new upload of the
+    same bytes is on its way to acquiring it) is skipped. Files are moved aside
+    after their rows are deleted and put back if an upload reused them anyway.
+
+    Returns:
+        int: Number of blobs removed
+    """
+    cutoff = datetime.utcnow() - grace
+    cutoff_ts = time.time() - grace.total_seconds()
+    removed = 0
+    last_sha = ""
+    while True:
+        blobs = (
+            db.query(PaymentProofBlob)
+            .filter(
+                PaymentProofBlob.ref_count == 0,
+                PaymentProofBlob.released_at < cutoff,
+                PaymentProofBlob.sha256 > last_sha,
+            )
+            .order_by(PaymentProofBlob.sha256)
+            .limit(batch_size)
+            .all()
+        )
+        if not blobs:
+            return removed
+        last_sha = blobs[-1].sha256
+
+        doomed = {}
+        for blob in blobs:
+            mtime = blobstore.modified_at(blob.path)
+            if mtime is not None and mtime > cutoff_ts:
+                continue
+            doomed[blob.sha256] = blob.path
+            db.delete(blob)
+        db.commit()
+        if not doomed:
+            continue
+
+        # Files go only after the rows are gone, so nothing can point at a missing
+        # blob. An upload may have reused one since its mtime was read: move the
+        # files aside, then keep any that were touched or acquired again meanwhile.
+        trashed = {sha256: blobstore.trash_blob(path) for sha256, path in doomed.items()}
+        reacquired = set(
+            db.scalars(select(PaymentProofBlob.sha256).where(PaymentProofBlob.sha256.in_(list(doomed))))
+        )
+        db.commit()
+        for sha256, trash in trashed.items():
+            if trash is None:
+                removed += 1
+                continue
+            mtime = blobstore.modified_at(str(trash))
+            if sha256 in reacquired or (mtime is not None and mtime > cutoff_ts):
+                blobstore.restore_blob(trash, doomed[sha256])
+            else:
+                trash.unlink(missing_ok=True)
+                removed += 1
@@ -0,0 +1,135 @@
+# app/repositories/search_repo.py
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, Tuple
+import base64
+import json
+
+from app.core import search_index
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Matches ranked by best_ids(): bm25 over every match of a common term
+# ("khan") costs more than the LIKE scan it replaced
+RANK_CANDIDATES = 100
+
+
+def encode_cursor(offset: int) -> str:
+    """
+    Opaque cursor for the next page of results. Ranked results have no stable
+    seek key (bm25 scores shift as the index changes), so it carries an offset.
+    """
+    raw = json.dumps({"offset": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded))["offset"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def search(db: Session, query: str, kind: Optional[str] = None, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[list[dict], Optional[str]]:
+    """
+    Ranked full-text search across patients and appointments.
+
+    Args:
+        db: Database session
+        query: Free text; every word of 3+ characters must appear somewhere in the row
+        kind: Restrict to "patient" or "appointment" (None searches both)
+        cursor: Opaque cursor from a previous page (None for the first page)
+        limit: Maximum number of hits to return
+
+    Returns:
+        Tuple[list[dict], Optional[str]]: Hits (SearchHit fields), best first, plus the next page cursor
+
+    Raises:
+        ValueError: If the query has no searchable word or the cursor is malformed
+    """
+    match = search_index.match_expression(query or "")
+    if match is None:
+        raise ValueError(f"Search terms must be at least {search_index.MIN_QUERY_LENGTH} characters")
+    offset = decode_cursor(cursor) if cursor else 0
+
+    params = {"match": match, "limit": limit + 1, "offset": offset}
+    kind_filter = ""
+    if kind is not None:
+        kind_filter = "AND rowid % 2 = :parity"
+        params["parity"] = search_index.kind_parity(kind)
+
+    rows = db.execute(
+        text(
+            f"""
+            SELECT rowid, name, email, phone, reference,
+                   snippet({search_index.SEARCH_TABLE}, -1, '[', ']', '…', 10) AS snippet,
+                   rank
+            FROM {search_index.SEARCH_TABLE}
+            WHERE {search_index.SEARCH_TABLE} MATCH :match {kind_filter}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+            """
+        ),
+        params,
+    ).all()
+
+    # Fetched one extra row to know whether another page exists
+    next_cursor = encode_cursor(offset + limit) if len(rows) > limit else None
+    hits = []
+    for row in rows[:limit]:
+        hit_kind, source_id = search_index.decode_rowid(row.rowid)
+        hits.append({
+            "kind": hit_kind,
+            "id": source_id,
+            "full_name": row.name,
+            "phone": row.phone,
+            "email": row.email,
+            "payment_reference": row.reference,
+            "snippet": row.snippet,
+            "score": -row.rank,  # bm25 is negative, lower = better
+        })
+    return hits, next_cursor
+
+
+def best_ids(db: Session, query: str, kind: str, limit: int, candidates: int = RANK_CANDIDATES) -> list[int]:
+    """
+    Source ids of one kind's best matches, for search-as-you-type.
+
+    Only the newest `candidates` matches are ranked: the subquery walks the
+    index in rowid order and stops there, and bm25 is computed over that
+    rowid range alone. For rarer terms that is every match.
+
+    Returns:
+        list[int]: Up to limit ids, best first (empty if the query has no searchable word)
+    """
+    match = search_index.match_expression(query or "")
+    if match is None:
+        return []
+    table = search_index.SEARCH_TABLE
+    rows = db.execute(
+        text(
+            f"""
+            SELECT rowid FROM {table}
+            WHERE {table} MATCH :match AND rowid % 2 = :parity AND rowid >= (
+                SELECT min(rowid) FROM (
+                    SELECT rowid FROM {table}
+                    WHERE {table} MATCH :match AND rowid % 2 = :parity
+                    ORDER BY rowid DESC
+                    LIMIT :candidates
+                )
+            )
+            ORDER BY rank
+            LIMIT :limit
+            """
+        ),
+        {"match": match, "parity": search_index.kind_parity(kind), "candidates": candidates, "limit": limit},
+    ).scalars()
+    return [search_index.decode_rowid(rowid)[1] for rowid in rows]
@@ -3,6 +3,7 @@ from sqlalchemy.exc import IntegrityError
 from app.models.users import User
 from app.schemas.users import UserCreate
 from app.core.security import hash_password
+from app.core.principal_cache import principal_cache
 from typing import Optional
 
 def get_by_email(db: Session, email: str) -> User | None:
@@ -11,8 +12,9 @@ def get_by_email(db: Session, email: str) -> User | None:
 def get_by_google_id(db: Session, google_id: str) -> User | None:
     return db.query(User).filter(User.google_id == google_id).first()
 
-def create(db: Session, payload: UserCreate) -> User:
-    hashed = hash_password(payload.password)
+def create(db: Session, payload: UserCreate, hashed_password: Optional[str] = None) -> User:
+    # Callers on the event loop hash in the password pool and pass the result in
+    hashed = hashed_password or hash_password(payload.password)
     db_obj = User(
         email=payload.email,
         full_name=payload.full_name,
@@ -27,6 +29,11 @@ def create(db: Session, payload: UserCreate) -> User:
     db.refresh(db_obj)
     return db_obj
 
+def update_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    """Replace a stored hash, e.g. when a login upgrades a deprecated scheme to bcrypt."""
+    user.hashed_password = hashed_password
+    db.commit()
+
 def create_or_update_google_user(
     db: Session, 
     google_id: str, 
@@ -45,6 +52,7 @@ def create_or_update_google_user(
         user.full_name = full_name
         user.profile_picture = profile_picture
         db.commit()
+        principal_cache.invalidate(user.id)
         db.refresh(user)
         return user
     
@@ -56,6 +64,7 @@ def create_or_update_google_user(
         user.google_id = google_id
         user.profile_picture = profile_picture
         db.commit()
+        principal_cache.invalidate(user.id)
         db.refresh(user)
         return user
     
@@ -13,8 +13,7 @@ sys.path.insert(0, str(backend_dir))
 
 from sqlalchemy import create_engine
 from app.core.db import DATABASE_URL, Base
-from app.models import users, appointments  # Import all model modules
-from app.startup_seed import ensure_default_admin
+from app.core.schema import prepare  # also imports all model modules
 
 def reset_database():
     """Drop all tables and recreate them with current schema."""
@@ -27,13 +26,9 @@ def reset_database():
     print("Dropping all tables...")
     Base.metadata.drop_all(bind=engine)
     
-    # Create all tables
-    print("Creating all tables...")
-    Base.metadata.create_all(bind=engine)
-    
-    # Seed default admin
-    print("Seeding default admin user...")
-    ensure_default_admin()
+    # Create all tables, triggers and the default admin (and stamp the schema version)
+    print("Creating all tables and seeding default admin user...")
+    prepare(engine)
     
     print("Database reset complete!")
 
@@ -30,8 +30,8 @@ class AppointmentCreate(BaseModel):
     @classmethod
     def validate_time_format(cls, v):
         try:
-            datetime.strptime(v, '%H:%M')
-            return v
+            # Zero-pad ("9:30" -> "09:30") so times compare and match slots correctly
+            return datetime.strptime(v, '%H:%M').strftime('%H:%M')
         except ValueError:
             raise ValueError('Time must be in HH:MM format (24-hour)')
     
@@ -55,6 +55,7 @@ class AppointmentRead(BaseModel):
     service_required: ServiceType
     preferred_date: str
     preferred_time: str
+    scheduled_at: Optional[datetime] = None  # UTC instant of preferred_date/preferred_time at the clinic
     payment_reference: str
     payment_proof: Optional[str] = None
     message: Optional[str] = None
@@ -66,6 +67,26 @@ class AppointmentRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# ---------- paginated response model ----------
+class AppointmentPage(BaseModel):
+    items: list[AppointmentRead]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to fetch the next page
+
+
+# ---------- statistics response model ----------
+class DailyCount(BaseModel):
+    date: str  # YYYY-MM-DD (preferred_date)
+    count: int
+
+
+class AppointmentStats(BaseModel):
+    total: int
+    by_status: dict[str, int]   # every status, zero when absent
+    by_clinic: dict[str, int]   # every clinic, zero when absent
+    by_service: dict[str, int]  # every service, zero when absent
+    by_day: list[DailyCount]    # days with at least one appointment, oldest first
+
+
 # ---------- update model ----------
 class AppointmentUpdate(BaseModel):
     status: Optional[AppointmentStatus] = None
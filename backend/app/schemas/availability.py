@@ -0,0 +1,17 @@
+# app/schemas/availability.py
+from pydantic import BaseModel
+from app.models.appointments import ClinicType
+
+# --- Read ---
+class FreeSlot(BaseModel):
+    time: str                  # HH:MM slot start
+    remaining: dict[str, int]  # free places per service (services with none left are omitted)
+
+class DayAvailability(BaseModel):
+    date: str                  # YYYY-MM-DD
+    slots: list[FreeSlot]      # empty when the clinic is closed or fully booked
+
+class Availability(BaseModel):
+    clinic: ClinicType
+    slot_minutes: int
+    days: list[DayAvailability]
@@ -0,0 +1,29 @@
+# app/schemas/imports.py
+from typing import Literal
+from pydantic import BaseModel
+
+from app.models.appointments import AppointmentStatus
+from app.schemas.appointments import AppointmentCreate
+
+ImportFormat = Literal["csv", "ndjson"]
+OnConflict = Literal["skip", "update"]
+
+# --- Import records ---
+class AppointmentImport(AppointmentCreate):
+    # Legacy registers hold past bookings, so the status may be given (defaults to pending)
+    status: AppointmentStatus = AppointmentStatus.PENDING
+
+# --- Report ---
+class ImportRowError(BaseModel):
+    line: int   # line in the uploaded file (the header is line 1 in CSV)
+    error: str
+
+class ImportReport(BaseModel):
+    processed: int  # records read, valid or not
+    inserted: int
+    updated: int    # patients only, with on_conflict=update
+    skipped: int    # patients only: phone number already present
+    failed: int
+    errors: list[ImportRowError]  # first MAX_REPORTED_ERRORS failures
+    seconds: float
+    rows_per_second: float
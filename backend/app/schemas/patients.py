@@ -1,4 +1,5 @@
 # app/schemas/patients.py
+from datetime import datetime
 from typing import Annotated, TypeAlias, Optional
 from pydantic import BaseModel, Field, StringConstraints
 
@@ -17,6 +18,7 @@ class PatientRead(BaseModel):
     id: int
     full_name: str
     phone_number: str
+    updated_at: Optional[datetime] = None  # None for patients not changed since the column was added
 
     model_config = {"from_attributes": True}
 
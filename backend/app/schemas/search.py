@@ -0,0 +1,20 @@
+# app/schemas/search.py
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+SearchKind = Literal["patient", "appointment"]
+
+# --- Read ---
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: int                                  # patients.id or appointments.id, depending on kind
+    full_name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None              # appointments only
+    payment_reference: Optional[str] = None  # appointments only
+    snippet: Optional[str] = None            # best-matching text, matches wrapped in [ ]
+    score: float                             # higher is more relevant
+
+class SearchPage(BaseModel):
+    items: list[SearchHit]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to fetch the next page
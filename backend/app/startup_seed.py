@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.models.users import User
 from app.core.security import hash_password
+from app.core.principal_cache import principal_cache
 
 DEFAULT_ADMIN_EMAIL = os.getenv("DEFAULT_ADMIN_EMAIL", "admin@clinic.com")
 DEFAULT_ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD", "admin123")
@@ -43,5 +44,6 @@ def ensure_default_admin() -> None:
                 changed = True
             if changed:
                 db.commit()
+                principal_cache.invalidate(user.id)
     finally:
         db.close()
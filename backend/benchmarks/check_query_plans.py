@@ -0,0 +1,194 @@
+"""
+Query plan and query budget checks for the hot repository queries and endpoints.
+
+Generates a synthetic clinic (benchmarks/datagen.py) and then checks two things:
+
+  plans    each listed repository call is run and EXPLAINed. It fails on a
+           full table scan or a temp B-tree sort, or when the index it is
+           written for goes unused (app.core.query_plans).
+  budgets  each listed endpoint must stay within its number of SQL
+           statements, which catches N+1 loops.
+  streams  an open appointment event stream must hold no read connection
+           (nor the WAL snapshot of one), however long it stays open.
+
+Exits 1 if anything fails, so it can run in CI next to the build. The known
+scans by design (GET /patients returns every patient, patient search falls
+back to LIKE for queries under 3 characters) are not listed.
+
+Usage (from backend/):
+    python -m benchmarks.check_query_plans [--size 10k]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# Run against a throwaway database: it is relative to cwd.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.db import ReadSessionLocal, engine, read_engine  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.core.schema import prepare  # noqa: E402
+from app.core.query_plans import assert_query_plan_uses_index, is_explainable, query_budget  # noqa: E402
+from app.models.appointments import AppointmentStatus, ClinicType, ServiceType  # noqa: E402
+from app.repositories import (  # noqa: E402
+    appointment_stats_repo, appointments_repo, availability_repo, patient_repo, search_repo, user_repo,
+)
+from app.startup_seed import DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+from benchmarks.endpoints import open_event_stream  # noqa: E402
+
+DAY = date(2024, 3, 4)
+WEEK_END = date(2024, 3, 10)
+
+
+def plan_checks(db, user_id: int, email: str, cursor: str) -> list[tuple]:
+    """(label, call, args, kwargs) for assert_query_plan_uses_index."""
+    return [
+        ("appointments: list_all", appointments_repo.list_all, (db,), {"index": "ix_appt_scheduled"}),
+        ("appointments: list_all, next page", appointments_repo.list_all, (db,),
+         {"cursor": cursor, "index": "ix_appt_scheduled"}),
+        ("appointments: get_by_status", appointments_repo.get_by_status, (db, AppointmentStatus.CONFIRMED),
+         {"index": "ix_appt_status_scheduled"}),
+        ("appointments: get_by_user_id", appointments_repo.get_by_user_id, (db, user_id),
+         {"index": "ix_appt_user_scheduled"}),
+        ("appointments: get_by_email", appointments_repo.get_by_email, (db, email),
+         {"index": "ix_appt_email_scheduled"}),
+        # Each branch is read in index order; only the small union of ids is sorted
+        ("appointments: get_for_user", appointments_repo.get_for_user, (db, user_id, email),
+         {"index": "ix_appt_user_scheduled", "allow_temp_sort": True}),
+        ("appointments: get_by_id", appointments_repo.get_by_id, (db, 1), {}),
+        ("appointments: admin_feed", lambda: appointments_repo.admin_feed(db).all(), (),
+         {"index": "ix_appt_scheduled"}),
+        ("appointments: admin_feed, status", lambda: appointments_repo.admin_feed(
+            db, status=AppointmentStatus.PENDING).all(), (), {"index": "ix_appt_status_scheduled"}),
+        ("appointments: export_rows, week", lambda: appointments_repo.export_rows(
+            db, date_from=DAY, date_to=WEEK_END).all(), (), {"index": "ix_appt_scheduled"}),
+        # The rollup has one row per day/status/clinic/service, whatever the table size
+        ("stats: summary", appointment_stats_repo.summary, (db,), {"allow_scans": ("appointment_daily_stats",)}),
+        # Either index leading with created_by_user_id will do; SQLite picks by the data
+        ("stats: summary, user", appointment_stats_repo.summary, (db,), {"user_id": user_id, "allow_temp_sort": True}),
+        ("availability: free_slots", availability_repo.free_slots, (db, ClinicType.CLINIC_A, DAY, WEEK_END), {}),
+        ("availability: free_slots, service", availability_repo.free_slots,
+         (db, ClinicType.CLINIC_B, DAY, WEEK_END, ServiceType.GENERAL_SURGERY), {}),
+        ("patients: get_by_id", patient_repo.get_by_id, (db, 1), {}),
+        ("patients: search", patient_repo.search, (db, "Khan"), {}),
+        ("patients: search, phone prefix", patient_repo.search, (db, "0300000"), {"index": "ix_patients_phone_number"}),
+        ("search: search", search_repo.search, (db, "Ayesha Malik"), {}),
+        ("users: get_by_email", user_repo.get_by_email, (db, email), {"index": "ix_users_email"}),
+    ]
+
+
+BUDGETS = [
+    ("GET", "/api/v1/appointments", 2),
+    ("GET", "/api/v1/appointments/1", 2),
+    ("GET", "/api/v1/appointments/status/confirmed", 2),
+    ("GET", "/api/v1/my-appointments", 2),
+    ("GET", "/api/v1/appointments/stats", 1),
+    ("GET", "/api/v1/admin/appointments", 1),
+    ("GET", "/api/v1/patients/1", 2),
+    ("GET", "/api/v1/patients/search/?query=Khan", 2),
+    ("GET", "/api/v1/search?q=Khan", 1),
+    ("GET", "/api/v1/availability?clinic=clinic_a&from=2024-03-04&to=2024-03-10", 1),
+    ("GET", "/api/v1/auth/me", 0),
+]
+
+
+def run_plan_checks(size: int) -> list[str]:
+    failures = []
+    db = ReadSessionLocal()
+    try:
+        user_id, email = db.execute(
+            text("SELECT id, email FROM users WHERE email LIKE 'user%@bench.example' ORDER BY id LIMIT 1")
+        ).one()
+        _, cursor = appointments_repo.list_all(db, limit=size // 2)
+        for label, call, args, kwargs in plan_checks(db, user_id, email, cursor):
+            try:
+                assert_query_plan_uses_index(db, call, *args, **kwargs)
+                print(f"  ok    {label}")
+            except AssertionError as exc:
+                failures.append(label)
+                print(f"  FAIL  {label}\n        " + str(exc).replace("\n", "\n        "))
+    finally:
+        db.close()
+    return failures
+
+
+def run_budget_checks(client: TestClient, headers: dict) -> list[str]:
+    failures = []
+    for method, path, budget in BUDGETS:
+        client.request(method, path, headers=headers)  # warm the principal cache
+        try:
+            with query_budget(budget) as captured:
+                response = client.request(method, path, headers=headers)
+            response.raise_for_status()
+            used = sum(1 for query in captured if is_explainable(query.statement))
+            print(f"  ok    {method} {path}: {used}/{budget} queries")
+        except AssertionError as exc:
+            failures.append(f"{method} {path}")
+            print(f"  FAIL  {method} {path}: " + str(exc).replace("\n", "\n        "))
+    return failures
+
+
+def run_stream_check(headers: dict) -> list[str]:
+    """Open the event stream on a principal-cache miss and look at the read pool while it is open."""
+    held = {}
+
+    def on_ready() -> None:
+        held["connections"] = read_engine.pool.checkedout()
+        # Outside any transaction (the write engine begins one on connect)
+        conn = sqlite3.connect(engine.url.database)
+        try:
+            held["checkpoint_busy"] = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        finally:
+            conn.close()
+
+    principal_cache.clear()
+    status = asyncio.run(open_event_stream(app, headers, on_ready))
+    if status == 200 and held == {"connections": 0, "checkpoint_busy": 0}:
+        print(f"  ok    GET /api/v1/appointments/events: {held}")
+        return []
+    print(f"  FAIL  GET /api/v1/appointments/events: status {status}, while open {held}")
+    return ["GET /api/v1/appointments/events"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10k", help="appointments to generate: 10k, 100k, 1m or a number")
+    args = parser.parse_args()
+
+    size = datagen.parse_size(args.size)
+    prepare(engine)
+    print(f"Generating {size} appointments...")
+    datagen.generate(engine, size)
+
+    print("\nQuery plans:")
+    failures = run_plan_checks(size)
+
+    print("\nQuery budgets:")
+    with TestClient(app) as client:
+        token = client.post(
+            "/api/v1/auth/signin", json={"email": DEFAULT_ADMIN_EMAIL, "password": DEFAULT_ADMIN_PASSWORD}
+        ).json()["access_token"]
+        failures += run_budget_checks(client, {"Authorization": f"Bearer {token}"})
+
+    print("\nOpen streams:")
+    failures += run_stream_check({"Authorization": f"Bearer {token}"})
+
+    if failures:
+        raise SystemExit(f"\n{len(failures)} check(s) failed: {', '.join(failures)}")
+    print("\nAll checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Synthetic clinic data for the benchmarks.
+
+generate() fills an empty database with users, patients and appointments
+spread across every ClinicType, ServiceType and AppointmentStatus, on the
+clinics' real slot grid over two years. Rows go in with one executemany per
+chunk of raw tuples inside a single transaction. The per-row triggers (the
+search index and the table version counters) are dropped for the load, and
+afterwards the search index and the rollup tables are rebuilt in one pass
+each. This is the same end state the API leaves behind, at a fraction of the
+cost: 1M appointments take about two minutes.
+
+Capacity is not enforced for this history (as with bulk imports), so busy
+slots can hold more bookings than the schedule allows.
+
+All users share BENCH_PASSWORD, hashed once, so signin can be timed against
+any of them.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+from app.core.availability import CLINIC_SCHEDULES, scheduled_at_for
+from app.core.db import SessionLocal
+from app.core.search_index import ensure_search_index, rebuild_search_index
+from app.core.security import hash_password
+from app.core.versions import TRACKED_TABLES, ensure_version_tracking
+from app.models.appointments import AppointmentStatus, ClinicType, ServiceType
+from app.repositories import appointment_stats_repo, availability_repo
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCH_PASSWORD = "benchmark-password"
+FIRST_DAY = date(2024, 1, 1)
+DAYS = 730
+CHUNK_ROWS = 50_000
+
+FIRST_NAMES = (
+    "Ayesha", "Ali", "Fatima", "Hassan", "Zainab", "Usman", "Maryam", "Bilal", "Sana", "Omar",
+    "Hira", "Imran", "Nadia", "Kamran", "Rabia", "Tariq", "Amna", "Farhan", "Saima", "Adeel",
+)
+LAST_NAMES = (
+    "Khan", "Ahmed", "Malik", "Hussain", "Qureshi", "Siddiqui", "Butt", "Chaudhry", "Raza", "Sheikh",
+    "Iqbal", "Anwar", "Javed", "Mirza", "Baig", "Abbasi", "Rana", "Aslam", "Hashmi", "Zafar",
+)
+MESSAGES = (
+    "Please call before the visit",
+    "Follow-up after surgery",
+    "Referred by Dr. Saleem",
+    "Prefers an Urdu-speaking doctor",
+    "Bringing previous reports",
+)
+
+# Relative weights; the enum order is kept so a seed always gives the same data
+STATUS_WEIGHTS = {
+    AppointmentStatus.PENDING: 20,
+    AppointmentStatus.CONFIRMED: 30,
+    AppointmentStatus.CANCELLED: 10,
+    AppointmentStatus.COMPLETED: 40,
+}
+SERVICE_WEIGHTS = {
+    ServiceType.GENERAL_CONSULTATION: 50,
+    ServiceType.BARIATRIC_SURGERY: 12,
+    ServiceType.LAPAROSCOPIC_SURGERY: 14,
+    ServiceType.GENERAL_SURGERY: 16,
+    ServiceType.METABOLIC_SURGERY: 8,
+}
+GUEST_SHARE = 0.3  # bookings made without an account
+
+
+def parse_size(raw: str) -> int:
+    """"10k", "1m" or a plain number of appointments."""
+    size = SIZES.get(raw.lower())
+    if size is None:
+        size = int(raw)
+    if size <= 0:
+        raise ValueError(f"Size must be positive, got {raw!r}")
+    return size
+
+
+def user_email(index: int) -> str:
+    return f"user{index}@bench.example"
+
+
+def slot_grid(first_day: date, days: int) -> list[tuple[ClinicType, str, str]]:
+    """Every (clinic, day, time) slot the schedules open between first_day and first_day + days."""
+    slots = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for clinic, schedule in CLINIC_SCHEDULES.items():
+            slots.extend((clinic, day.isoformat(), time) for time in schedule.slots_on(day))
+    return slots
+
+
+@lru_cache(maxsize=None)
+def _scheduled(clinic: ClinicType, day: str, time: str) -> tuple[str, str]:
+    at, local_day = scheduled_at_for(clinic, day, time)
+    return at.isoformat(" "), local_day.isoformat()
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _set_triggers(engine: Engine, enabled: bool) -> None:
+    # The ensure_* functions create the triggers with IF NOT EXISTS
+    if enabled:
+        ensure_search_index(engine)
+        ensure_version_tracking(engine)
+        return
+    with engine.begin() as conn:
+        names = conn.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('patients', 'appointments')"
+        ).scalars().all()
+        for name in names:
+            conn.exec_driver_sql(f'DROP TRIGGER "{name}"')
+
+
+def _insert_users(conn, count: int, password_hash: str) -> None:
+    rows = [(f"Bench User {i}", user_email(i), password_hash) for i in range(count)]
+    conn.exec_driver_sql(
+        "INSERT INTO users (full_name, email, hashed_password, is_admin) VALUES (?, ?, ?, 0)", rows
+    )
+
+
+def _insert_patients(conn, rng: random.Random, count: int) -> None:
+    stamp = datetime(2024, 1, 1).isoformat(" ")
+    for start in range(0, count, CHUNK_ROWS):
+        rows = [
+            (_name(rng), f"03{i:09d}", stamp)
+            for i in range(start, min(count, start + CHUNK_ROWS))
+        ]
+        conn.exec_driver_sql("INSERT INTO patients (full_name, phone_number, updated_at) VALUES (?, ?, ?)", rows)
+
+
+def _insert_appointments(conn, rng: random.Random, count: int, user_ids: list[int]) -> None:
+    slots = slot_grid(FIRST_DAY, DAYS)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=count)
+    services = rng.choices(list(SERVICE_WEIGHTS), weights=list(SERVICE_WEIGHTS.values()), k=count)
+    sql = """
+        INSERT INTO appointments (full_name, phone, email, clinic, service_required, preferred_date,
+            preferred_time, scheduled_at, scheduled_date, payment_reference, message, status,
+            created_by_user_id, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    for start in range(0, count, CHUNK_ROWS):
+        rows = []
+        for i in range(start, min(count, start + CHUNK_ROWS)):
+            clinic, day, time = rng.choice(slots)
+            scheduled_at, scheduled_date = _scheduled(clinic, day, time)
+            booked = datetime.fromisoformat(day) - timedelta(days=rng.randrange(1, 30), minutes=rng.randrange(1440))
+            if rng.random() < GUEST_SHARE:
+                user_id = None
+                email = f"guest{i}@mail.example"
+            else:
+                index = rng.randrange(len(user_ids))
+                user_id, email = user_ids[index], user_email(index)
+            rows.append((
+                _name(rng), f"+92300{i:07d}", email, clinic.name, services[i].name, day, time,
+                scheduled_at, scheduled_date, f"TXN{i:09d}",
+                rng.choice(MESSAGES) if rng.random() < 0.3 else None,
+                statuses[i].name, user_id, booked.isoformat(" "), booked.isoformat(" "),
+            ))
+        conn.exec_driver_sql(sql, rows)
+
+
+def generate(engine: Engine, appointments: int, users: Optional[int] = None,
+             patients: Optional[int] = None, seed: int = 7) -> dict:
+    """
+    Fill an empty database (schema already created) with a synthetic clinic.
+
+    Args:
+        engine: Write engine
+        appointments: Number of appointments
+        users: Number of (non-admin) users; default appointments / 100, at least 10
+        patients: Number of patients; default appointments / 10, at least 100
+        seed: Random seed; the same arguments always give the same data
+
+    Returns:
+        dict: Row counts and the seconds spent loading and rebuilding
+
+    Raises:
+        ValueError: If the database already holds appointments or patients
+    """
+    users = users if users is not None else max(10, appointments // 100)
+    patients = patients if patients is not None else max(100, appointments // 10)
+    rng = random.Random(seed)
+
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("SELECT EXISTS (SELECT 1 FROM appointments UNION ALL SELECT 1 FROM patients)").scalar():
+            raise ValueError("The database already has data; generate() only fills an empty one")
+
+    started = time.perf_counter()
+    password_hash = hash_password(BENCH_PASSWORD)
+    _set_triggers(engine, enabled=False)
+    try:
+        with engine.begin() as conn:
+            _insert_users(conn, users, password_hash)
+            user_ids = conn.exec_driver_sql(
+                "SELECT id FROM users WHERE email LIKE '%@bench.example' ORDER BY id"
+            ).scalars().all()
+            _insert_patients(conn, rng, patients)
+            _insert_appointments(conn, rng, appointments, user_ids)
+    finally:
+        _set_triggers(engine, enabled=True)
+    loaded = time.perf_counter()
+
+    rebuild_search_index(engine)
+    with engine.begin() as conn:
+        # Lists cached against the old counters must not revalidate
+        for table in TRACKED_TABLES:
+            conn.exec_driver_sql("UPDATE table_versions SET version = version + 1 WHERE name = ?", (table,))
+    db = SessionLocal()
+    try:
+        appointment_stats_repo.rebuild(db)
+        db.commit()
+        availability_repo.ensure_backfilled(db)
+    finally:
+        db.close()
+
+    return {
+        "users": users,
+        "patients": patients,
+        "appointments": appointments,
+        "load_seconds": round(loaded - started, 2),
+        "rebuild_seconds": round(time.perf_counter() - loaded, 2),
+    }
@@ -0,0 +1,586 @@
+"""
+Endpoint benchmark suite: every route under /api/v1 against a synthetic clinic.
+
+Generates a dataset (see benchmarks/datagen.py) in a temporary SQLite file,
+then drives each route in-process through the ASGI app and reports
+throughput and p50/p95/p99 latency per endpoint. Some routes are measured in
+more than one way (a deep cursor page, a 304 revalidation). Results are
+written as JSON; --compare reads an earlier results file and prints the
+change per endpoint, so a release can be checked against the last one on the
+same machine and dataset size.
+
+Each endpoint gets --requests timed requests (after --warmup untimed ones),
+or as many as fit in --max-seconds. With --concurrency N, N clients share
+that budget and throughput is completed requests over wall time.
+
+Write routes change the dataset as they run: bookings go into empty slots
+after the generated history, deletes remove what the create scenarios
+added, imports add 500 rows per request. The Google token check is a
+network call and is replaced with a stub; everything else is the real
+request path.
+
+Usage (from backend/):
+    python -m benchmarks.endpoints [--size 10k|100k|1m] [--requests 200] [--concurrency 1]
+        [--only REGEX] [--db PATH] [--output results.json] [--compare baseline.json]
+
+--db keeps the dataset in PATH (generated on first use), which saves the
+generation time on later runs; the default is a fresh temporary database.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+
+PNG_PROOF = b"\x89PNG\r\n\x1a\n" + bytes(1024)
+IMPORT_ROWS = 500
+SAMPLE_SIZE = 1000  # ids, users and emails the read scenarios cycle through
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class Scenario:
+    name: str
+    route: tuple[str, str]  # (method, path template) of the route it drives
+    # Request number -> response status, or None once there is nothing left to send (e.g. deletes)
+    send: Callable[[httpx.AsyncClient, int], Awaitable[Optional[int]]]
+    expect: tuple[int, ...] = (200,)
+
+
+def request(method: str, url, **kwargs) -> Callable[[httpx.AsyncClient, int], Awaitable[int]]:
+    """A send function for one plain request; url and keyword values may be functions of the request number."""
+    async def send(client: httpx.AsyncClient, i: int) -> int:
+        resolved = {key: value(i) if callable(value) else value for key, value in kwargs.items()}
+        response = await client.request(method, url(i) if callable(url) else url, **resolved)
+        return response.status_code
+    return send
+
+
+async def open_event_stream(app, headers: dict, on_ready: Optional[Callable[[], None]] = None) -> int:
+    """
+    Open the SSE stream and hang up once its "ready" event arrives (after
+    calling on_ready, if given, while the stream is still open). The stream
+    never ends by itself, so it is driven with a raw ASGI call rather than
+    the buffering test transport.
+    """
+    hang_up = asyncio.Event()
+    status = 0
+    requested = False
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await hang_up.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif b"event: ready" in message.get("body", b""):
+            if on_ready is not None:
+                on_ready()
+            hang_up.set()
+        elif not message.get("more_body", False):
+            hang_up.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/appointments/events", "raw_path": b"/api/v1/appointments/events",
+        "query_string": b"", "root_path": "", "client": ("bench", 1), "server": ("bench", 80),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+    await app(scope, receive, send)
+    return status
+
+
+@dataclass
+class Fixtures:
+    """What the scenarios need from the dataset, collected once before timing."""
+    admin: dict
+    user: dict
+    appointment_ids: list[int]
+    user_ids: list[int]
+    emails: list[str]
+    patient_ids: list[int]
+    deep_cursor: str
+    proof_id: int
+    first_day: date
+    next_phone: int
+    next_signup: int
+    free_slots: list[tuple[str, str, str]]
+    created_appointments: list[int] = field(default_factory=list)
+    created_patients: list[int] = field(default_factory=list)
+    list_etag: str = ""  # of the appointment list, as of the last write seen
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _token(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/api/v1/auth/signin", json={"email": email, "password": password})
+    response.raise_for_status()
+    return _bearer(response.json()["access_token"])
+
+
+async def build_fixtures(client: httpx.AsyncClient, engine) -> Fixtures:
+    from benchmarks import datagen
+    from app.repositories.appointments_repo import encode_cursor
+    from app.startup_seed import DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD
+
+    rng = random.Random(3)
+    with engine.connect() as conn:
+        def column(sql: str, *params) -> list:
+            return conn.exec_driver_sql(sql, params).scalars().all()
+
+        count = column("SELECT count(*) FROM appointments")[0]
+        appointment_ids = column("SELECT id FROM appointments ORDER BY random() LIMIT ?", SAMPLE_SIZE)
+        users = conn.exec_driver_sql(
+            "SELECT id, email FROM users WHERE email LIKE 'user%@bench.example' ORDER BY id LIMIT ?", (SAMPLE_SIZE,)
+        ).all()
+        patient_ids = column("SELECT id FROM patients ORDER BY random() LIMIT ?", SAMPLE_SIZE)
+        middle = conn.exec_driver_sql(
+            "SELECT scheduled_at, id FROM appointments ORDER BY scheduled_at DESC, id DESC LIMIT 1 OFFSET ?",
+            (count // 2,),
+        ).one()
+        first_day = date.fromisoformat(column("SELECT min(preferred_date) FROM appointments")[0])
+        last_day = date.fromisoformat(column("SELECT max(preferred_date) FROM appointments")[0])
+        # Writes continue numbering from earlier runs on the same --db
+        last_phone = column("SELECT max(phone_number) FROM patients WHERE phone_number LIKE '04%'")[0]
+        signups = column("SELECT count(*) FROM users WHERE email LIKE 'signup%@bench.example'")[0]
+
+    rng.shuffle(users)
+    admin = await _token(client, DEFAULT_ADMIN_EMAIL, DEFAULT_ADMIN_PASSWORD)
+    user = await _token(client, users[0].email, datagen.BENCH_PASSWORD)
+    free_slots = [
+        (clinic.value, day, time)
+        for clinic, day, time in datagen.slot_grid(max(last_day, date(2030, 1, 1)) + timedelta(days=1), 3650)
+    ]
+
+    clinic, day, time = free_slots.pop()
+    booking = await client.post(
+        "/api/v1/appointments",
+        data=_booking_form(clinic, day, time, 0),
+        files={"payment_proof": ("receipt.png", PNG_PROOF, "image/png")},
+        headers=user,
+    )
+    booking.raise_for_status()
+
+    return Fixtures(
+        admin=admin,
+        user=user,
+        appointment_ids=appointment_ids,
+        user_ids=[row.id for row in users],
+        emails=[row.email for row in users],
+        patient_ids=patient_ids,
+        deep_cursor=encode_cursor(SimpleNamespace(scheduled_at=datetime.fromisoformat(middle[0]), id=middle[1])),
+        proof_id=booking.json()["id"],
+        first_day=first_day,
+        next_phone=int(last_phone[2:]) + 1 if last_phone else 0,
+        next_signup=signups,
+        free_slots=free_slots,
+    )
+
+
+def _booking_form(clinic: str, day: str, time: str, i: int) -> dict:
+    return {
+        "full_name": "Benchmark Patient",
+        "phone": f"+92301{i:07d}",
+        "email": f"booking{i}@bench.example",
+        "clinic": clinic,
+        "service_required": "general_consultation",
+        "preferred_date": day,
+        "preferred_time": time,
+        "payment_reference": f"BENCH{i:09d}",
+    }
+
+
+def _import_files(first_day: date) -> tuple[bytes, bytes]:
+    from benchmarks import datagen
+
+    patients = "full_name,phone_number\n" + "".join(f"Imported Patient {i},05{i:09d}\n" for i in range(IMPORT_ROWS))
+    slots = datagen.slot_grid(first_day, 28)
+    appointments = "".join(
+        json.dumps({
+            "full_name": f"Imported Patient {i}", "phone": f"+92302{i:07d}", "email": f"import{i}@bench.example",
+            "clinic": slots[i % len(slots)][0].value, "service_required": "general_surgery",
+            "preferred_date": slots[i % len(slots)][1], "preferred_time": slots[i % len(slots)][2],
+            "payment_reference": f"IMP{i:09d}", "status": "completed",
+        }) + "\n"
+        for i in range(IMPORT_ROWS)
+    )
+    return patients.encode(), appointments.encode()
+
+
+def build_scenarios(app, fx: Fixtures) -> list[Scenario]:
+    from benchmarks import datagen
+
+    A = "/api/v1/appointments"
+    admin, user = fx.admin, fx.user
+    statuses = ["pending", "confirmed", "cancelled", "completed"]
+    queries = ["Khan", "Ayesha Malik", "Hussain", "0300000", "TXN0000", "Referred"]
+    week = {"date_from": fx.first_day.isoformat(), "date_to": (fx.first_day + timedelta(days=6)).isoformat()}
+    patients_csv, appointments_ndjson = _import_files(fx.first_day)
+
+    def appointment_id(i: int) -> int:
+        return fx.appointment_ids[i % len(fx.appointment_ids)]
+
+    def patient_id(i: int) -> int:
+        return fx.patient_ids[i % len(fx.patient_ids)]
+
+    async def create_appointment(client: httpx.AsyncClient, i: int) -> Optional[int]:
+        if not fx.free_slots:
+            return None
+        response = await client.post("/api/v1/appointments", data=_booking_form(*fx.free_slots.pop(), i), headers=user)
+        if response.status_code == 201:
+            fx.created_appointments.append(response.json()["id"])
+        return response.status_code
+
+    async def delete_appointment(client: httpx.AsyncClient, i: int) -> Optional[int]:
+        if not fx.created_appointments:
+            return None
+        response = await client.delete(f"/api/v1/appointments/{fx.created_appointments.pop()}", headers=user)
+        return response.status_code
+
+    async def create_patient(client: httpx.AsyncClient, i: int) -> int:
+        phone = f"04{fx.next_phone + i:09d}"
+        response = await client.post(
+            "/api/v1/patients", json={"full_name": "Benchmark Patient", "phone_number": phone}, headers=admin
+        )
+        if response.status_code == 201:
+            fx.created_patients.append(response.json()["id"])
+        return response.status_code
+
+    async def delete_patient(client: httpx.AsyncClient, i: int) -> Optional[int]:
+        if not fx.created_patients:
+            return None
+        response = await client.delete(f"/api/v1/patients/{fx.created_patients.pop()}", headers=admin)
+        return response.status_code
+
+    async def revalidate_list(client: httpx.AsyncClient, i: int) -> int:
+        # Writes from earlier scenarios change the ETag; the warmup picks up the current one
+        response = await client.get(A, headers={**admin, "If-None-Match": fx.list_etag})
+        if response.status_code == 200:
+            fx.list_etag = response.headers["ETag"]
+        return response.status_code
+
+    async def event_stream(client: httpx.AsyncClient, i: int) -> int:
+        return await open_event_stream(app, admin)
+
+    return [
+        Scenario("GET /healthz", ("GET", "/api/v1/healthz"), request("GET", "/api/v1/healthz")),
+        Scenario("GET /version", ("GET", "/api/v1/version"), request("GET", "/api/v1/version")),
+        Scenario("GET /cache-stats", ("GET", "/api/v1/cache-stats"), request("GET", "/api/v1/cache-stats", headers=admin)),
+
+        Scenario("POST /auth/signin", ("POST", "/api/v1/auth/signin"), request(
+            "POST", "/api/v1/auth/signin",
+            json=lambda i: {"email": fx.emails[i % len(fx.emails)], "password": datagen.BENCH_PASSWORD},
+        )),
+        Scenario("POST /auth/signup", ("POST", "/api/v1/auth/signup"), request(
+            "POST", "/api/v1/auth/signup",
+            json=lambda i: {"full_name": "Benchmark Signup", "email": f"signup{fx.next_signup + i}@bench.example",
+                            "password": "benchmark-password"},
+        ), expect=(201,)),
+        Scenario("POST /auth/google-signin", ("POST", "/api/v1/auth/google-signin"), request(
+            "POST", "/api/v1/auth/google-signin", json=lambda i: {"google_token": f"bench-{i % 50}"},
+        )),
+        Scenario("GET /auth/me", ("GET", "/api/v1/auth/me"), request("GET", "/api/v1/auth/me", headers=user)),
+
+        Scenario("POST /appointments", ("POST", A), create_appointment, expect=(201,)),
+        Scenario("GET /appointments", ("GET", A), request("GET", A, headers=admin)),
+        Scenario("GET /appointments?fields", ("GET", A), request(
+            "GET", A, params={"fields": "id,full_name,preferred_date,preferred_time,status"}, headers=admin,
+        )),
+        Scenario("GET /appointments?cursor (deep)", ("GET", A), request(
+            "GET", A, params={"cursor": fx.deep_cursor}, headers=admin,
+        )),
+        Scenario("GET /appointments (304)", ("GET", A), revalidate_list, expect=(304,)),
+        Scenario("GET /appointments/stats", ("GET", f"{A}/stats"), request("GET", f"{A}/stats", headers=admin)),
+        Scenario("GET /appointments/stats?range", ("GET", f"{A}/stats"), request(
+            "GET", f"{A}/stats", params=week, headers=admin,
+        )),
+        Scenario("GET /appointments/events (ready)", ("GET", f"{A}/events"), event_stream),
+        Scenario("GET /appointments/{id}", ("GET", f"{A}/{{appointment_id}}"), request(
+            "GET", lambda i: f"{A}/{appointment_id(i)}", headers=admin,
+        )),
+        Scenario("GET /appointments/user/{id}", ("GET", f"{A}/user/{{user_id}}"), request(
+            "GET", lambda i: f"{A}/user/{fx.user_ids[i % len(fx.user_ids)]}", headers=admin,
+        )),
+        Scenario("GET /my-appointments", ("GET", "/api/v1/my-appointments"), request(
+            "GET", "/api/v1/my-appointments", headers=user,
+        )),
+        Scenario("GET /appointments/email/{email}", ("GET", f"{A}/email/{{email}}"), request(
+            "GET", lambda i: f"{A}/email/{fx.emails[i % len(fx.emails)]}", headers=admin,
+        )),
+        Scenario("GET /appointments/status/{status}", ("GET", f"{A}/status/{{status}}"), request(
+            "GET", lambda i: f"{A}/status/{statuses[i % len(statuses)]}", headers=admin,
+        )),
+        Scenario("PUT /appointments/{id}", ("PUT", f"{A}/{{appointment_id}}"), request(
+            "PUT", lambda i: f"{A}/{appointment_id(i)}", json=lambda i: {"message": f"Benchmark note {i}"},
+            headers=admin,
+        )),
+        Scenario("GET /appointments/{id}/payment-proof", ("GET", f"{A}/{{appointment_id}}/payment-proof"), request(
+            "GET", f"{A}/{fx.proof_id}/payment-proof", headers=user,
+        )),
+        Scenario("DELETE /appointments/{id}", ("DELETE", f"{A}/{{appointment_id}}"), delete_appointment),
+
+        Scenario("GET /admin/appointments", ("GET", "/api/v1/admin/appointments"), request(
+            "GET", "/api/v1/admin/appointments", headers=admin,
+        )),
+        Scenario("GET /admin/appointments?filters", ("GET", "/api/v1/admin/appointments"), request(
+            "GET", "/api/v1/admin/appointments", params={"status": "confirmed", "clinic": "clinic_b", **week},
+            headers=admin,
+        )),
+
+        Scenario("POST /patients", ("POST", "/api/v1/patients"), create_patient, expect=(201,)),
+        Scenario("GET /patients", ("GET", "/api/v1/patients"), request("GET", "/api/v1/patients", headers=admin)),
+        Scenario("GET /patients/{id}", ("GET", "/api/v1/patients/{patient_id}"), request(
+            "GET", lambda i: f"/api/v1/patients/{patient_id(i)}", headers=admin,
+        )),
+        Scenario("GET /patients/search/", ("GET", "/api/v1/patients/search/"), request(
+            "GET", "/api/v1/patients/search/", params=lambda i: {"query": queries[i % len(queries)]}, headers=admin,
+        )),
+        Scenario("PUT /patients/{id}", ("PUT", "/api/v1/patients/{patient_id}"), request(
+            "PUT", lambda i: f"/api/v1/patients/{patient_id(i)}", json=lambda i: {"full_name": f"Renamed Patient {i}"},
+            headers=admin,
+        )),
+        Scenario("DELETE /patients/{id}", ("DELETE", "/api/v1/patients/{patient_id}"), delete_patient, expect=(204,)),
+
+        Scenario("GET /search", ("GET", "/api/v1/search"), request(
+            "GET", "/api/v1/search", params=lambda i: {"q": queries[i % len(queries)]}, headers=admin,
+        )),
+        Scenario("GET /availability", ("GET", "/api/v1/availability"), request(
+            "GET", "/api/v1/availability",
+            params=lambda i: {"clinic": ("clinic_a", "clinic_b")[i % 2], "from": fx.first_day.isoformat(),
+                              "to": (fx.first_day + timedelta(days=27)).isoformat()},
+        )),
+
+        Scenario("GET /export/appointments.ndjson (week)", ("GET", "/api/v1/export/appointments.ndjson"), request(
+            "GET", "/api/v1/export/appointments.ndjson", params=week, headers=admin,
+        )),
+        Scenario("GET /export/appointments.csv (week)", ("GET", "/api/v1/export/appointments.csv"), request(
+            "GET", "/api/v1/export/appointments.csv", params=week, headers=admin,
+        )),
+        Scenario("GET /export/patients.csv", ("GET", "/api/v1/export/patients.csv"), request(
+            "GET", "/api/v1/export/patients.csv", headers=admin,
+        )),
+        Scenario(f"POST /import/patients ({IMPORT_ROWS} rows)", ("POST", "/api/v1/import/patients"), request(
+            "POST", "/api/v1/import/patients", params={"on_conflict": "update"},
+            files={"file": ("patients.csv", patients_csv, "text/csv")}, headers=admin,
+        )),
+        Scenario(f"POST /import/appointments ({IMPORT_ROWS} rows)", ("POST", "/api/v1/import/appointments"), request(
+            "POST", "/api/v1/import/appointments",
+            files={"file": ("appointments.ndjson", appointments_ndjson, "application/x-ndjson")}, headers=admin,
+        )),
+    ]
+
+
+async def measure(client: httpx.AsyncClient, scenario: Scenario, requests: int, warmup: int,
+                  max_seconds: float, concurrency: int) -> dict:
+    numbers = itertools.count()
+    for _ in range(warmup):
+        if await scenario.send(client, next(numbers)) is None:
+            break
+
+    samples: list[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + max_seconds
+
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal issued
+        while issued < requests and time.perf_counter() < deadline:
+            issued += 1
+            started = time.perf_counter()
+            status = await scenario.send(client, next(numbers))
+            if status is None:
+                return
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    result = {
+        "method": scenario.route[0],
+        "route": scenario.route[1],
+        "requests": len(samples),
+        "errors": sum(count for status, count in statuses.items() if status not in scenario.expect),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+    if samples:
+        result.update({
+            "rps": round(len(samples) / wall, 1),
+            "p50_ms": round(percentile(samples, 50), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "p99_ms": round(percentile(samples, 99), 3),
+            "mean_ms": round(statistics.mean(samples), 3),
+            "max_ms": round(max(samples), 3),
+        })
+    return result
+
+
+def uncovered_routes(app, scenarios: list[Scenario]) -> list[str]:
+    from fastapi.routing import APIRoute
+
+    covered = {scenario.route for scenario in scenarios}
+    routes = {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.path.startswith("/api/v1")
+        for method in route.methods
+    }
+    return [f"{method} {path}" for method, path in sorted(routes - covered, key=lambda r: (r[1], r[0]))]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print per-endpoint changes against an earlier run; returns the endpoints that got slower than threshold (%)."""
+    print(f"\nAgainst {baseline['meta'].get('started_at', '?')} ({baseline['meta'].get('size', '?')} appointments):")
+    print(f"{'endpoint':<44} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9}")
+    regressions = []
+    for name, now in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before or "p50_ms" not in now or "p50_ms" not in before:
+            print(f"{name:<44} {'(new)' if not before else '(no samples)':>9}")
+            continue
+        change = {key: (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                  for key in ("p50_ms", "p95_ms", "p99_ms", "rps")}
+        slower = change["p50_ms"] > threshold
+        if slower:
+            regressions.append(name)
+        print(f"{name:<44} {change['p50_ms']:+8.1f}% {change['p95_ms']:+8.1f}% {change['p99_ms']:+8.1f}% "
+              f"{change['rps']:+8.1f}%{'   <- slower' if slower else ''}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.main import app
+    from app.api.v1 import auth as auth_api
+    from app.core.db import engine
+    from app.core.schema import prepare
+    from benchmarks import datagen
+
+    async def fake_google_token(token: str) -> dict:
+        return {"google_id": token, "email": f"{token}@google.bench.example", "name": "Google Bench User"}
+
+    auth_api.verify_google_token_async = fake_google_token
+
+    size = datagen.parse_size(args.size)
+    prepare(engine)
+    with engine.connect() as conn:
+        existing = conn.exec_driver_sql("SELECT count(*) FROM appointments").scalar()
+    if existing:
+        print(f"Using the {existing} appointments already in the database")
+        dataset = {"appointments": existing, "reused": True}
+    else:
+        print(f"Generating {size} appointments...")
+        dataset = datagen.generate(engine, size)
+        print(f"  {dataset['users']} users, {dataset['patients']} patients, {dataset['appointments']} appointments "
+              f"in {dataset['load_seconds']}s (+{dataset['rebuild_seconds']}s rebuilding indexes and rollups)")
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            fixtures = await build_fixtures(client, engine)
+            scenarios = build_scenarios(app, fixtures)
+            missing = uncovered_routes(app, scenarios)
+            if missing:
+                print(f"Not driven by any scenario: {', '.join(missing)}")
+            if args.only:
+                scenarios = [scenario for scenario in scenarios if re.search(args.only, scenario.name)]
+
+            results = {
+                "meta": {
+                    "started_at": datetime.now().isoformat(timespec="seconds"),
+                    "size": dataset["appointments"],
+                    "dataset": dataset,
+                    "requests": args.requests,
+                    "warmup": args.warmup,
+                    "max_seconds": args.max_seconds,
+                    "concurrency": args.concurrency,
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform(),
+                    "uncovered_routes": missing,
+                },
+                "endpoints": {},
+            }
+            print(f"\n{'endpoint':<44} {'n':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+            for scenario in scenarios:
+                result = await measure(client, scenario, args.requests, args.warmup, args.max_seconds, args.concurrency)
+                results["endpoints"][scenario.name] = result
+                if "p50_ms" in result:
+                    print(f"{scenario.name:<44} {result['requests']:>5} {result['errors']:>4} {result['rps']:>8} "
+                          f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+                else:
+                    print(f"{scenario.name:<44} {0:>5}   (nothing to send)")
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="10k", help="appointments to generate: 10k, 100k, 1m or a number")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per endpoint first")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per endpoint")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent clients per endpoint")
+    parser.add_argument("--only", help="run only endpoints whose name matches this regex")
+    parser.add_argument("--db", help="SQLite file to keep the dataset in (default: a temporary one)")
+    parser.add_argument("--output", help="write the results as JSON here")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="with --compare, exit 1 if any p50 got slower by more than this many percent")
+    args = parser.parse_args()
+
+    # Settings are read when app modules are first imported, so set them up before that happens.
+    # The upload dir is relative to cwd, as is the default database.
+    output = Path(args.output).resolve() if args.output else None
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    if args.db:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(args.db).resolve()}"
+    os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+    results = asyncio.run(run(args))
+    if output:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {output}")
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} endpoint(s) slower than {args.threshold:g}% at p50")
+
+
+if __name__ == "__main__":
+    main()
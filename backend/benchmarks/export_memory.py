@@ -0,0 +1,167 @@
+"""
+Constant-memory check for the streaming exports.
+
+Seeds a throwaway database with --rows synthetic appointments (and as many
+patients), then downloads every export through the ASGI app while sampling
+the process's memory after each body chunk. Exits non-zero if memory grows
+by more than --max-growth-mb during any export.
+
+Growth is measured on anonymous memory (RssAnon: heap, Python objects,
+SQLite page cache). File-backed pages of the memory-mapped database are
+excluded because the kernel can drop them at will. On platforms without
+/proc, peak RSS (ru_maxrss) is used instead.
+
+The ASGI app is driven directly with a `send` that drops each body chunk
+after counting it. A test client would buffer the whole body and hide what
+the server itself holds.
+
+Usage (from backend/):
+    python -m benchmarks.export_memory [--rows 1000000] [--max-growth-mb 64]
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Run against a throwaway database: it is relative to cwd.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+from app.main import app  # noqa: E402
+from app.core.db import SessionLocal, engine  # noqa: E402
+from app.core.schema import prepare  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models.users import User  # noqa: E402
+
+SEED_BATCH = 10_000
+EXPORTS = [
+    "/api/v1/export/appointments.csv",
+    "/api/v1/export/appointments.ndjson",
+    "/api/v1/export/appointments.csv?gzip=true",
+    "/api/v1/export/appointments.ndjson?status=pending&date_from=2025-03-01&date_to=2025-09-30",
+    "/api/v1/export/patients.csv",
+]
+
+
+def memory_mb() -> float:
+    """Anonymous resident memory in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(rows: int) -> None:
+    rng = random.Random(7)
+    statuses = ["PENDING", "CONFIRMED", "COMPLETED", "CANCELLED"]
+    services = ["GENERAL_CONSULTATION", "BARIATRIC_SURGERY", "GENERAL_SURGERY"]
+    first_day = date(2025, 1, 1)
+    for start in range(0, rows, SEED_BATCH):
+        batch = []
+        for i in range(start, min(rows, start + SEED_BATCH)):
+            day = first_day + timedelta(days=rng.randrange(365))
+            hour = rng.randrange(9, 18)
+            scheduled = datetime(day.year, day.month, day.day, hour) - timedelta(hours=5)
+            batch.append((
+                f"Patient {i}", f"+92300{i:07d}", f"user{i % 50_000}@example.com", "CLINIC_A",
+                rng.choice(services), day.isoformat(), f"{hour:02d}:00", scheduled.isoformat(" "),
+                day.isoformat(), rng.choice(statuses), f"TXN{i:09d}", "follow-up" if i % 4 else None,
+            ))
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                """
+                INSERT INTO appointments (full_name, phone, email, clinic, service_required, preferred_date,
+                    preferred_time, scheduled_at, scheduled_date, status, payment_reference, message,
+                    created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                """,
+                batch,
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO patients (full_name, phone_number) VALUES (?, ?)",
+                [(row[0], f"03{start + n:09d}") for n, row in enumerate(batch)],
+            )
+
+
+async def download(path: str, token: str) -> tuple[int, int, float, float]:
+    """GET path through the ASGI app; returns (status, body bytes, baseline MiB, peak MiB)."""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": raw_path, "raw_path": raw_path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"authorization", f"Bearer {token}".encode()), (b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    state = {"status": 0, "bytes": 0, "peak": 0.0}
+    disconnect = asyncio.Event()
+
+    async def receive():
+        if not state.get("requested"):
+            state["requested"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            state["bytes"] += len(message.get("body", b""))
+            state["peak"] = max(state["peak"], memory_mb())
+            if not message.get("more_body"):
+                disconnect.set()
+
+    baseline = memory_mb()
+    state["peak"] = baseline
+    await app(scope, receive, send)
+    return state["status"], state["bytes"], baseline, state["peak"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-growth-mb", type=float, default=64.0)
+    args = parser.parse_args()
+
+    prepare(engine)
+    started = time.perf_counter()
+    seed(args.rows)
+    print(f"Seeded {args.rows} appointments and patients in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    admin = User(full_name="Bench Admin", email="bench@example.com", hashed_password="", is_admin=True)
+    db.add(admin)
+    db.commit()
+    token = create_access_token({"sub": str(admin.id)})
+    db.close()
+
+    failed = False
+    print(f"\n{'export':<86} {'MB out':>8} {'secs':>6} {'base MB':>8} {'growth':>7}")
+    for path in EXPORTS:
+        started = time.perf_counter()
+        status, size, baseline, peak = asyncio.run(download(path, token))
+        growth = peak - baseline
+        ok = status == 200 and growth <= args.max_growth_mb
+        failed |= not ok
+        print(f"{path:<86} {size / 1e6:8.1f} {time.perf_counter() - started:6.1f} {baseline:8.1f} "
+              f"{growth:7.1f}{'' if ok else '  FAIL'}")
+
+    if failed:
+        raise SystemExit(f"An export failed or grew memory by more than {args.max_growth_mb} MiB")
+    print(f"\nAll exports stayed within {args.max_growth_mb} MiB of their starting memory.")
+
+
+if __name__ == "__main__":
+    main()
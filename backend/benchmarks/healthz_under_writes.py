@@ -0,0 +1,147 @@
+"""
+Event-loop responsiveness benchmark.
+
+Measures /api/v1/healthz latency while a batch of writers hammers
+POST /api/v1/appointments, all in-process through the ASGI app. If DB work
+blocks the event loop, healthz p99 climbs to the duration of a commit; with
+run_db() it should stay close to the idle baseline.
+
+Usage (from backend/):
+    python -m benchmarks.healthz_under_writes [--writers 8] [--seconds 5] [--commit-ms 20] [--compare]
+
+--commit-ms adds a blocking sleep to every commit to model real disk fsync
+latency (a temp dir is often tmpfs, where commits are nearly free).
+
+--compare also runs the same load with DB calls executed inline on the loop
+(the old behaviour) so both numbers can be read side by side.
+Requires httpx (also needed by FastAPI's TestClient).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run against a throwaway database and upload dir: both are relative to cwd.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.core.schema import prepare  # noqa: E402
+from app.api.v1 import appointments as appointments_api  # noqa: E402
+
+
+PROBE_INTERVAL_S = 0.01
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _inline_run_db(fn, *args, **kwargs):
+    """Old behaviour: call the blocking repository function on the loop."""
+    return fn(*args, **kwargs)
+
+
+def simulate_slow_commits(delay_ms: float) -> None:
+    if delay_ms <= 0:
+        return
+
+    @event.listens_for(engine, "commit")
+    def _slow_commit(conn):
+        time.sleep(delay_ms / 1000)
+
+
+async def probe_healthz(client: httpx.AsyncClient, stop: asyncio.Event, samples: list[float]) -> None:
+    """
+    Open-loop probe: one request every PROBE_INTERVAL_S, latency measured from
+    the *scheduled* send time so time spent waiting for a blocked loop counts.
+    """
+    loop = asyncio.get_running_loop()
+    scheduled = loop.time()
+    while not stop.is_set():
+        scheduled += PROBE_INTERVAL_S
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        response = await client.get("/api/v1/healthz")
+        response.raise_for_status()
+        samples.append((loop.time() - scheduled) * 1000)
+
+
+async def write_appointments(client: httpx.AsyncClient, stop: asyncio.Event, counter: list[int]) -> None:
+    form = {
+        "full_name": "Benchmark Patient",
+        "phone": "03001234567",
+        "email": "bench@example.com",
+        "clinic": "clinic_a",
+        "service_required": "general_consultation",
+        "preferred_date": "2025-11-15",
+        "preferred_time": "14:30",
+        "payment_reference": "TXN123456789",
+    }
+    while not stop.is_set():
+        response = await client.post("/api/v1/appointments", data=form)
+        response.raise_for_status()
+        counter[0] += 1
+
+
+async def run_phase(writers: int, seconds: float) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        samples: list[float] = []
+        written = [0]
+        tasks = [asyncio.create_task(probe_healthz(client, stop, samples))]
+        tasks += [asyncio.create_task(write_appointments(client, stop, written)) for _ in range(writers)]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return {
+        "writers": writers,
+        "writes_per_s": round(written[0] / seconds, 1),
+        "healthz_p50_ms": round(statistics.median(samples), 2),
+        "healthz_p99_ms": round(percentile(samples, 99), 2),
+        "healthz_max_ms": round(max(samples), 2),
+        "samples": len(samples),
+    }
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<22} writers={result['writers']:<3} writes/s={result['writes_per_s']:<8} "
+        f"p50={result['healthz_p50_ms']}ms p99={result['healthz_p99_ms']}ms max={result['healthz_max_ms']}ms n={result['samples']}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--commit-ms", type=float, default=20.0, help="simulated fsync latency per commit")
+    parser.add_argument("--compare", action="store_true", help="also run with DB calls inline on the event loop")
+    args = parser.parse_args()
+    prepare(engine)
+    simulate_slow_commits(args.commit_ms)
+
+    report("idle", await run_phase(0, args.seconds))
+    report("writes (threadpool)", await run_phase(args.writers, args.seconds))
+    if args.compare:
+        original = appointments_api.run_db
+        appointments_api.run_db = _inline_run_db
+        try:
+            report("writes (inline, old)", await run_phase(args.writers, args.seconds))
+        finally:
+            appointments_api.run_db = original
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
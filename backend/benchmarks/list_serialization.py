@@ -0,0 +1,126 @@
+"""
+List serialization benchmark: ORM objects + response_model vs column tuples + orjson.
+
+Seeds --rows synthetic appointments and serves one page of all of them
+through the full HTTP stack in three ways:
+
+  orm     the previous path: Appointment objects, AppointmentPage validation,
+          FastAPI's jsonable_encoder and stdlib json
+  tuples  the current path: selected column tuples, plain dicts, orjson
+  sparse  the current path with ?fields= as the admin grid asks for it
+
+Both paths are mounted on the app under /bench so the page size can exceed
+the public MAX_PAGE_SIZE. Before timing, the full orm and tuples bodies are
+checked to decode to the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.list_serialization [--rows 10000] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# Run against a throwaway database: it is relative to cwd.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+from fastapi import Depends, Request  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.api.v1.appointments import _page  # noqa: E402
+from app.core.db import engine, get_read_db  # noqa: E402
+from app.core.schema import prepare  # noqa: E402
+from app.repositories import appointments_repo  # noqa: E402
+from app.schemas.appointments import AppointmentPage  # noqa: E402
+
+GRID_FIELDS = "id,full_name,service_required,preferred_date,preferred_time,status,created_at,created_by_user_id"
+
+
+@app.get("/bench/orm", response_model=AppointmentPage)
+def bench_orm(limit: int, db: Session = Depends(get_read_db)) -> AppointmentPage:
+    items, next_cursor = appointments_repo.list_all(db, limit=limit)
+    return AppointmentPage(items=items, next_cursor=next_cursor)
+
+
+@app.get("/bench/tuples")
+async def bench_tuples(request: Request, limit: int, fields: Optional[str] = None, db: Session = Depends(get_read_db)):
+    return await _page(request, None, appointments_repo.list_all, db, cursor=None, limit=limit, fields=fields)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(rows: int) -> None:
+    rng = random.Random(11)
+    statuses = ["PENDING", "CONFIRMED", "COMPLETED", "CANCELLED"]
+    first_day = date(2025, 1, 1)
+    batch = []
+    for i in range(rows):
+        day = first_day + timedelta(days=rng.randrange(365))
+        scheduled = datetime(day.year, day.month, day.day, 11) + timedelta(minutes=30 * rng.randrange(4))
+        batch.append((
+            f"Patient {i}", f"+92300{i:07d}", f"user{i}@example.com", day.isoformat(),
+            (scheduled + timedelta(hours=5)).strftime("%H:%M"), scheduled.isoformat(" "), day.isoformat(),
+            rng.choice(statuses), f"TXN{i:09d}", "Please call before the visit" if i % 3 else None,
+        ))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            INSERT INTO appointments (full_name, phone, email, clinic, service_required, preferred_date,
+                preferred_time, scheduled_at, scheduled_date, status, payment_reference, message,
+                created_at, updated_at)
+            VALUES (?, ?, ?, 'CLINIC_A', 'GENERAL_CONSULTATION', ?, ?, ?, ?, ?, ?, ?,
+                    '2024-12-01 09:30:00.250000', '2024-12-02 10:00:00')
+            """,
+            batch,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    prepare(engine)
+    seed(args.rows)
+    client = TestClient(app)
+    paths = {
+        "orm": f"/bench/orm?limit={args.rows}",
+        "tuples": f"/bench/tuples?limit={args.rows}",
+        "sparse": f"/bench/tuples?limit={args.rows}&fields={GRID_FIELDS}",
+    }
+    if client.get(paths["orm"]).json() != client.get(paths["tuples"]).json():
+        raise SystemExit("orm and tuples bodies differ")
+
+    print(f"{args.rows} rows per response, {args.rounds} rounds\n")
+    print(f"{'path':<8} {'KB':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    baseline = None
+    for name, path in paths.items():
+        size = len(client.get(path).content)  # also warms the caches
+        samples = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            client.get(path)
+            samples.append((time.perf_counter() - started) * 1000)
+        p50 = percentile(samples, 50)
+        baseline = baseline or p50
+        print(f"{name:<8} {size / 1024:7.0f} {p50:9.1f} {percentile(samples, 95):9.1f} "
+              f"{percentile(samples, 99):9.1f} {statistics.mean(samples):9.1f}   x{baseline / p50:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Patient search benchmark: FTS5 trigram index vs the old LIKE scan.
+
+Fills a throwaway database with --patients synthetic patients (and
+--appointments appointments, which share the index), then times
+patient_repo.search_like (leading-wildcard LIKE) and patient_repo.search
+(phone prefix range, else the full-text index) on the same queries: rare
+names, common names, phone fragments and misses. Exits 1 if search is
+slower than LIKE (p50) on any of them.
+
+Usage (from backend/):
+    python -m benchmarks.search_vs_like [--patients 100000] [--appointments 50000] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run against a throwaway database: it is relative to cwd.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(tempfile.mkdtemp(prefix="cms_bench_"))
+
+from app.core.db import ReadSessionLocal, engine  # noqa: E402
+from app.core.schema import prepare  # noqa: E402
+from app.repositories import patient_repo  # noqa: E402
+
+FIRST_NAMES = ["Ahmed", "Ali", "Sara", "Fatima", "Bilal", "Zainab", "Usman", "Ayesha", "Hassan", "Maryam",
+               "Omar", "Hira", "Imran", "Sana", "Tariq", "Nadia", "Kamran", "Rabia", "Faisal", "Amna"]
+LAST_NAMES = ["Khan", "Ahmed", "Shah", "Malik", "Hussain", "Qureshi", "Butt", "Chaudhry", "Sheikh", "Raza",
+              "Iqbal", "Javed", "Siddiqui", "Mirza", "Abbasi", "Rana", "Bhatti", "Aslam", "Nawaz", "Zafar"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(patients: int, appointments: int) -> None:
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO patients (full_name, phone_number) VALUES (?, ?)",
+            [
+                (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:06d}", f"03{i:09d}")
+                for i in range(patients)
+            ],
+        )
+        conn.exec_driver_sql(
+            """
+            INSERT INTO appointments (full_name, phone, email, clinic, service_required, preferred_date,
+                                      preferred_time, payment_reference, message, status, created_at, updated_at)
+            VALUES (?, ?, ?, 'CLINIC_A', 'GENERAL_CONSULTATION', '2025-01-01', '10:00', ?, ?, 'PENDING',
+                    CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            [
+                (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"+92300{i:07d}", f"user{i}@example.com",
+                 f"TXN{i:09d}", "follow-up visit" if i % 3 else None)
+                for i in range(appointments)
+            ],
+        )
+
+
+def time_search(fn, queries: list[str], rounds: int) -> list[float]:
+    db = ReadSessionLocal()
+    try:
+        samples = []
+        for _ in range(rounds):
+            for q in queries:
+                started = time.perf_counter()
+                fn(db, q)
+                samples.append((time.perf_counter() - started) * 1000)
+        return samples
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--appointments", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    prepare(engine)  # schema and search index
+    started = time.perf_counter()
+    seed(args.patients, args.appointments)
+    print(f"Seeded {args.patients} patients, {args.appointments} appointments "
+          f"(search index kept by triggers) in {time.perf_counter() - started:.1f}s")
+
+    queries = [
+        f"{args.patients // 2:06d}",  # rare: one patient
+        "zainab",                     # common first name
+        "khan",                       # common last name
+        "0300001",                    # phone fragment
+        "nobody-by-this-name",        # miss
+    ]
+    with ReadSessionLocal() as db:  # same answers from both paths (ranking aside)
+        for q in queries:
+            fts = {p.id for p in patient_repo.search(db, q)}
+            like = {p.id for p in patient_repo.search_like(db, q)}
+            if len(fts) < 50 and fts != like:
+                raise SystemExit(f"result mismatch for {q!r}")
+
+    results = {name: {q: time_search(fn, [q], args.rounds) for q in queries}
+               for name, fn in (("LIKE", patient_repo.search_like), ("FTS5", patient_repo.search))}
+
+    print(f"\n{'query':<22} {'LIKE p50 ms':>12} {'FTS5 p50 ms':>12}")
+    for q in queries:
+        print(f"{q:<22} {percentile(results['LIKE'][q], 50):12.2f} {percentile(results['FTS5'][q], 50):12.2f}")
+
+    print(f"\n{'path':<6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for name, per_query in results.items():
+        samples = [sample for runs in per_query.values() for sample in runs]
+        print(f"{name:<6} {percentile(samples, 50):9.2f} {percentile(samples, 95):9.2f} "
+              f"{percentile(samples, 99):9.2f} {statistics.mean(samples):9.2f}")
+
+    slower = [q for q in queries if percentile(results["FTS5"][q], 50) > percentile(results["LIKE"][q], 50)]
+    if slower:
+        raise SystemExit(f"\nSlower than LIKE: {', '.join(slower)}")
+
+
+if __name__ == "__main__":
+    main()
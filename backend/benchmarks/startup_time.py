@@ -0,0 +1,127 @@
+"""
+Worker startup-time benchmark.
+
+Every uvicorn worker (and every autoscaled or restarted one) pays for
+importing app.main and running its startup hooks before it can serve. This
+starts fresh interpreters and measures, per run:
+
+  import   cold `import app.main`
+  startup  the startup hooks (schema check, backfill check)
+  total    both, i.e. the time until the worker could accept requests
+
+for two databases:
+
+  prepared    `python -m app.prepare` already ran: the normal worker boot
+  unprepared  an empty database with SCHEMA_AUTO_PREPARE on, i.e. what every
+              worker paid when schema creation and admin seeding ran at boot
+
+It also fails if a module that should load lazily (passlib, the Google auth
+stack) was imported during boot.
+
+Usage (from backend/):
+    python -m benchmarks.startup_time [--runs 10] [--importtime 15]
+
+--importtime N also prints the N slowest imports (python -X importtime) of
+one cold `import app.main`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Only needed for a sign-in (password hashing) or a Google sign-in
+LAZY_MODULES = ("passlib", "passlib.context", "google.auth", "google.oauth2", "requests", "app.core.google_tokens")
+
+_BOOT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+import asyncio
+asyncio.run(app.main.app.router.startup())
+booted = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (booted - imported) * 1000,
+    "total_ms": (booted - started) * 1000,
+    "eager": [name for name in {lazy!r} if name in sys.modules],
+}}))
+"""
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _python(args: list[str], cwd: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    env.pop("DATABASE_URL", None)  # the default sqlite:///./cms.db, relative to cwd
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+def boot_once(cwd: str) -> dict:
+    code = _BOOT.format(lazy=LAZY_MODULES)
+    return json.loads(_python(["-c", code], cwd).stdout.strip().splitlines()[-1])
+
+
+def measure(label: str, runs: int, fresh_database: bool) -> dict:
+    workdir = tempfile.mkdtemp(prefix="cms_bench_")
+    if not fresh_database:
+        _python(["-m", "app.prepare"], workdir)
+    samples = []
+    for _ in range(runs):
+        cwd = tempfile.mkdtemp(prefix="cms_bench_") if fresh_database else workdir
+        samples.append(boot_once(cwd))
+    result = {"label": label, "runs": runs, "eager": sorted({name for s in samples for name in s["eager"]})}
+    for key in ("import_ms", "startup_ms", "total_ms"):
+        values = [sample[key] for sample in samples]
+        result[key] = {"p50": round(statistics.median(values), 1), "p95": round(percentile(values, 95), 1)}
+    return result
+
+
+def slowest_imports(count: int) -> list[tuple[int, str]]:
+    stderr = _python(["-X", "importtime", "-c", "import app.main"], tempfile.mkdtemp(prefix="cms_bench_")).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="print the N slowest imports")
+    args = parser.parse_args()
+
+    results = [
+        measure("prepared", args.runs, fresh_database=False),
+        measure("unprepared", args.runs, fresh_database=True),
+    ]
+    print(f"{'database':<12} {'import p50/p95 ms':>20} {'startup p50/p95 ms':>20} {'total p50/p95 ms':>20}")
+    for result in results:
+        cells = [f"{result[key]['p50']:.1f} / {result[key]['p95']:.1f}" for key in ("import_ms", "startup_ms", "total_ms")]
+        print(f"{result['label']:<12} {cells[0]:>20} {cells[1]:>20} {cells[2]:>20}")
+
+    if args.importtime:
+        print("\nSlowest imports (cumulative, one cold import):")
+        for microseconds, name in slowest_imports(args.importtime):
+            print(f"  {microseconds / 1000:8.1f} ms  {name.strip()}")
+
+    eager = results[0]["eager"]
+    if eager:
+        raise SystemExit(f"\nImported during a prepared boot, should be lazy: {', '.join(eager)}")
+
+
+if __name__ == "__main__":
+    main()
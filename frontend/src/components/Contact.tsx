@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Phone, Mail, MapPin, Send, Clock, Check, CreditCard, Upload, Building } from 'lucide-react';
 import { useAuth } from '../auth/useAuth';
 
@@ -88,15 +88,31 @@ const Contact = () => {
     }));
   };
 
-  const getAvailableTimeSlots = () => {
-    // Return standard appointment time slots
-    return [
-      '09:00', '09:30', '10:00', '10:30', '11:00', '11:30',
-      '12:00', '12:30', '13:00', '13:30', '14:00', '14:30',
-      '15:00', '15:30', '16:00', '16:30', '17:00', '17:30',
-      '18:00', '18:30', '19:00', '19:30', '20:00'
-    ];
-  };
+  // Free slots for the chosen clinic, service and date, from the backend's availability engine
+  const [timeSlots, setTimeSlots] = useState<string[]>([]);
+
+  useEffect(() => {
+    const { clinic, service_required, preferred_date } = formData;
+    if (!clinic || !service_required || !preferred_date) {
+      setTimeSlots([]);
+      return;
+    }
+    const params = new URLSearchParams({ clinic, service: service_required, from: preferred_date, to: preferred_date });
+    let cancelled = false;
+    fetch(`http://localhost:8000/api/v1/availability?${params}`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(data => {
+        if (!cancelled) {
+          setTimeSlots(data ? data.days[0].slots.map((slot: { time: string }) => slot.time) : []);
+        }
+      })
+      .catch(() => !cancelled && setTimeSlots([]));
+    return () => {
+      cancelled = true;
+    };
+  }, [formData.clinic, formData.service_required, formData.preferred_date]);
+
+  const getAvailableTimeSlots = () => timeSlots;
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -413,7 +429,11 @@ const Contact = () => {
                       required
                       className="w-full px-4 py-3 rounded-lg border border-gray-300 focus:ring-2 focus:ring-primary-500 focus:border-primary-500 transition-colors"
                     >
-                      <option value="">Select time</option>
+                      <option value="">
+                        {formData.clinic && formData.service_required && formData.preferred_date && timeSlots.length === 0
+                          ? 'No free slots on this date'
+                          : 'Select time'}
+                      </option>
                       {getAvailableTimeSlots().map((time) => (
                         <option key={time} value={time}>
                           {time}
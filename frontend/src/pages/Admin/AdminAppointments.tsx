@@ -23,9 +23,20 @@ interface Appointment {
 
 type AppointmentStatus = 'pending' | 'confirmed' | 'cancelled' | 'completed';
 
+// The list only fetches the columns the grid renders (?fields=); details are fetched on "View"
+const GRID_FIELDS = ['id', 'full_name', 'service_required', 'preferred_date', 'preferred_time', 'status', 'created_at', 'created_by_user_id'] as const;
+type AppointmentRow = Pick<Appointment, typeof GRID_FIELDS[number]>;
+
+// Paginated list response (keyset pagination)
+interface AppointmentPage {
+  items: AppointmentRow[];
+  next_cursor: string | null;
+}
+
 export default function AdminAppointments() {
   const { token } = useAuth();
-  const [appointments, setAppointments] = useState<Appointment[]>([]);
+  const [appointments, setAppointments] = useState<AppointmentRow[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [, setError] = useState('');
   const [selectedAppointment, setSelectedAppointment] = useState<Appointment | null>(null);
@@ -41,12 +52,83 @@ export default function AdminAppointments() {
     fetchAppointments();
   }, []);
 
-  const fetchAppointments = async () => {
+  // Apply one change pushed by the server (or returned by our own update)
+  const applyChange = (kind: string, appointment: Appointment | { id: number }) => {
+    if (kind === 'created') {
+      setAppointments(prev => (prev.some(a => a.id === appointment.id) ? prev : [appointment as Appointment, ...prev]));
+    } else if (kind === 'updated') {
+      setAppointments(prev => prev.map(a => (a.id === appointment.id ? { ...a, ...appointment } : a)));
+      setSelectedAppointment(prev => (prev && prev.id === appointment.id ? { ...prev, ...appointment } : prev));
+    } else if (kind === 'deleted') {
+      setAppointments(prev => prev.filter(a => a.id !== appointment.id));
+    }
+  };
+
+  // Live updates over Server-Sent Events, instead of re-fetching the list.
+  // fetch() rather than EventSource so the Authorization header can be sent;
+  // reconnects resume from the last event id, and "reset" means reload.
+  useEffect(() => {
+    if (!token) return;
+    const controller = new AbortController();
+    let lastEventId = '';
+
+    const listen = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const response = await fetch('http://localhost:8000/api/v1/appointments/events', {
+            headers: {
+              'Authorization': `Bearer ${token}`,
+              ...(lastEventId ? { 'Last-Event-ID': lastEventId } : {})
+            },
+            signal: controller.signal
+          });
+          if (!response.ok || !response.body) {
+            throw new Error(`Event stream failed (${response.status})`);
+          }
+
+          const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+          let buffer = '';
+          for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += value;
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+              const block = buffer.slice(0, end);
+              buffer = buffer.slice(end + 2);
+              let kind = 'message';
+              let data = '';
+              for (const line of block.split('\n')) {
+                if (line.startsWith('id: ')) lastEventId = line.slice(4);
+                else if (line.startsWith('event: ')) kind = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+              }
+              if (kind === 'reset') fetchAppointments();
+              else if (data) applyChange(kind, JSON.parse(data));
+            }
+          }
+        } catch (err) {
+          if (controller.signal.aborted) return;
+          console.error('Appointment event stream error:', err);
+        }
+        await new Promise(resolve => setTimeout(resolve, 3000));
+      }
+    };
+
+    listen();
+    return () => controller.abort();
+  }, [token]);
+
+  const fetchAppointments = async (cursor: string | null = null) => {
     try {
       setLoading(true);
       setError('');
       
-      const response = await fetch('http://localhost:8000/api/v1/appointments', {
+      const fields = `fields=${GRID_FIELDS.join(',')}`;
+      const url = cursor
+        ? `http://localhost:8000/api/v1/appointments?${fields}&cursor=${encodeURIComponent(cursor)}`
+        : `http://localhost:8000/api/v1/appointments?${fields}`;
+      const response = await fetch(url, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
@@ -57,8 +139,9 @@ export default function AdminAppointments() {
         throw new Error('Failed to fetch appointments');
       }
 
-      const data = await response.json();
-      setAppointments(data);
+      const data: AppointmentPage = await response.json();
+      setAppointments(prev => (cursor ? [...prev, ...data.items] : data.items));
+      setNextCursor(data.next_cursor);
     } catch (err: any) {
       setError(err.message || 'Failed to load appointments');
       console.error('Error fetching appointments:', err);
@@ -67,6 +150,26 @@ export default function AdminAppointments() {
     }
   };
 
+  // Load the full appointment for the details modal
+  const openDetails = async (appointmentId: number) => {
+    try {
+      const response = await fetch(`http://localhost:8000/api/v1/appointments/${appointmentId}`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        }
+      });
+
+      if (!response.ok) {
+        throw new Error('Failed to load appointment details');
+      }
+
+      setSelectedAppointment(await response.json());
+    } catch (err: any) {
+      setError(err.message || 'Failed to load appointment details');
+      console.error('Error loading appointment:', err);
+    }
+  };
+
   // Update appointment status
   const updateAppointmentStatus = async (appointmentId: number, newStatus: AppointmentStatus) => {
     try {
@@ -83,8 +186,8 @@ export default function AdminAppointments() {
         throw new Error('Failed to update appointment status');
       }
 
-      // Refresh appointments
-      fetchAppointments();
+      // Apply the change in place (other admins get it from the event stream)
+      applyChange('updated', await response.json());
     } catch (err: any) {
       setError(err.message || 'Failed to update appointment');
       console.error('Error updating appointment:', err);
@@ -165,7 +268,7 @@ export default function AdminAppointments() {
               <p className="mt-1 text-gray-600">Manage and track all appointment requests</p>
             </div>
             <button
-              onClick={fetchAppointments}
+              onClick={() => fetchAppointments()}
               disabled={loading}
               className="inline-flex items-center gap-2 px-4 py-2 bg-[color:var(--color-primary-600)] text-white rounded-lg hover:bg-[color:var(--color-primary-700)] transition-colors disabled:opacity-50"
             >
@@ -296,7 +399,7 @@ export default function AdminAppointments() {
                                     <option value="cancelled">Cancelled</option>
                                   </select>
                                   <button
-                                    onClick={() => setSelectedAppointment(appointment)}
+                                    onClick={() => openDetails(appointment.id)}
                                     className="bg-[color:var(--color-primary-50)] text-[color:var(--color-primary-700)] px-2 py-1 text-xs rounded font-medium inline-flex items-center justify-center gap-1 transition-all duration-200 hover:bg-[color:var(--color-primary-100)] hover:text-[color:var(--color-primary-800)]"
                                   >
                                     <Eye className="h-3 w-3" />
@@ -453,7 +556,7 @@ export default function AdminAppointments() {
                             </td>
                             <td className="px-6 py-4 whitespace-nowrap">
                               <button
-                                onClick={() => setSelectedAppointment(appointment)}
+                                onClick={() => openDetails(appointment.id)}
                                 className="bg-[color:var(--color-primary-50)] text-[color:var(--color-primary-700)] px-3 py-1 text-xs rounded-md font-medium inline-flex items-center gap-1 transition-all duration-200 hover:bg-[color:var(--color-primary-100)] hover:text-[color:var(--color-primary-800)]"
                               >
                                 <Eye className="h-3 w-3" />
@@ -464,6 +567,16 @@ export default function AdminAppointments() {
                         ))}
                       </tbody>
                     </table>
+                    {nextCursor && (
+                      <div className="flex justify-center py-4">
+                        <button
+                          onClick={() => fetchAppointments(nextCursor)}
+                          className="bg-[color:var(--color-primary-50)] text-[color:var(--color-primary-700)] px-4 py-2 text-sm rounded-md font-medium transition-all duration-200 hover:bg-[color:var(--color-primary-100)]"
+                        >
+                          Load more
+                        </button>
+                      </div>
+                    )}
                   </div>
                 )}
               </div>
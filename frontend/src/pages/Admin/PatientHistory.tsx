@@ -22,6 +22,11 @@ interface Appointment {
   updated_at: string;
 }
 
+interface AppointmentStats {
+  total: number;
+  by_status: Record<Appointment['status'], number>;
+}
+
 interface Patient {
   id: number;
   full_name: string;
@@ -36,6 +41,7 @@ export default function PatientHistory() {
   
   const [patient, setPatient] = useState<Patient | null>(null);
   const [appointments, setAppointments] = useState<Appointment[]>([]);
+  const [stats, setStats] = useState<AppointmentStats | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -43,6 +49,7 @@ export default function PatientHistory() {
     if (patientId) {
       fetchPatientData();
       fetchPatientAppointments();
+      fetchAppointmentStats();
     }
   }, [patientId]);
 
@@ -88,7 +95,7 @@ export default function PatientHistory() {
       }
 
       const data = await response.json();
-      setAppointments(data);
+      setAppointments(data.items);
     } catch (err: any) {
       setError(err.message || 'Failed to load patient appointments');
     } finally {
@@ -96,6 +103,23 @@ export default function PatientHistory() {
     }
   };
 
+  // Counts come from the server so they cover the whole history, not just the loaded page
+  const fetchAppointmentStats = async () => {
+    try {
+      const response = await fetch(`http://localhost:8000/api/v1/appointments/stats?user_id=${patientId}`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+          'Content-Type': 'application/json'
+        }
+      });
+      if (response.ok) {
+        setStats(await response.json());
+      }
+    } catch (err) {
+      console.error('Failed to load appointment statistics:', err);
+    }
+  };
+
   const getStatusColor = (status: string) => {
     const colors = {
       'pending': 'bg-amber-100 text-amber-800',
@@ -158,7 +182,7 @@ export default function PatientHistory() {
                 </div>
                 <div className="flex items-center gap-1">
                   <FileText className="h-4 w-4" />
-                  <span>{appointments.length} appointments</span>
+                  <span>{stats ? stats.total : appointments.length} appointments</span>
                 </div>
               </div>
             </div>
@@ -174,29 +198,29 @@ export default function PatientHistory() {
       )}
 
       {/* Appointment Statistics */}
-      {appointments.length > 0 && (
+      {stats && stats.total > 0 && (
         <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
           <div className="bg-white p-4 rounded-lg shadow">
             <div className="text-2xl font-bold text-blue-600">
-              {appointments.filter(a => a.status === 'completed').length}
+              {stats.by_status.completed}
             </div>
             <div className="text-sm text-gray-500">Completed</div>
           </div>
           <div className="bg-white p-4 rounded-lg shadow">
             <div className="text-2xl font-bold text-amber-600">
-              {appointments.filter(a => a.status === 'pending').length}
+              {stats.by_status.pending}
             </div>
             <div className="text-sm text-gray-500">Pending</div>
           </div>
           <div className="bg-white p-4 rounded-lg shadow">
             <div className="text-2xl font-bold text-green-600">
-              {appointments.filter(a => a.status === 'confirmed').length}
+              {stats.by_status.confirmed}
             </div>
             <div className="text-sm text-gray-500">Confirmed</div>
           </div>
           <div className="bg-white p-4 rounded-lg shadow">
             <div className="text-2xl font-bold text-red-600">
-              {appointments.filter(a => a.status === 'cancelled').length}
+              {stats.by_status.cancelled}
             </div>
             <div className="text-sm text-gray-500">Cancelled</div>
           </div>
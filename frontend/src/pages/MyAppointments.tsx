@@ -23,6 +23,11 @@ interface Appointment {
   updated_at: string;
 }
 
+interface AppointmentPage {
+  items: Appointment[];
+  next_cursor: string | null;
+}
+
 export default function MyAppointments() {
   const { user, token } = useAuth();
   const navigate = useNavigate();
@@ -59,8 +64,9 @@ export default function MyAppointments() {
       try {
         setLoading(true);
         setError(null);
-        const data = await get<Appointment[]>('/my-appointments', token);
-        setAppointments(data);
+        // The page filters client-side, so fetch the user's history in one (max-size) page
+        const data = await get<AppointmentPage>('/my-appointments?limit=500', token);
+        setAppointments(data.items);
       } catch (err) {
         console.error('Failed to fetch appointments:', err);
         setError('Failed to load appointments. Please try again.');